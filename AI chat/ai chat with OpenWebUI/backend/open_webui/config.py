@@ -1,3 +1,4 @@
+import asyncio
 import json
 import logging
 import os
@@ -7,6 +8,7 @@ import redis
 
 from datetime import datetime
 from pathlib import Path
+from types import MappingProxyType
 from typing import Generic, Optional, TypeVar
 from urllib.parse import urlparse
 
@@ -30,7 +32,7 @@ from open_webui.env import (
     log,
 )
 from open_webui.internal.db import Base, get_db
-from open_webui.utils.redis import get_redis_connection
+from open_webui.utils.redis import get_async_redis_connection, get_redis_connection
 
 
 class EndpointFilter(logging.Filter):
@@ -134,6 +136,7 @@ def get_config_value(config_path: str):
 
 
 PERSISTENT_CONFIG_REGISTRY = []
+APP_CONFIG_REGISTRY = []
 
 
 def save_config(config):
@@ -146,6 +149,8 @@ def save_config(config):
         # Trigger updates on all registered PersistentConfig entries
         for config_item in PERSISTENT_CONFIG_REGISTRY:
             config_item.update()
+        for app_config in APP_CONFIG_REGISTRY:
+            app_config.refresh()
     except Exception as e:
         log.exception(e)
         return False
@@ -208,53 +213,181 @@ class PersistentConfig(Generic[T]):
         self.config_value = self.value
 
 
+CONFIG_CHANNEL = "open-webui:config"
+CONFIG_VERSION_KEY = "open-webui:config:version"
+
+# Seconds without a pub/sub message after which the shared config version is
+# checked, to catch up on messages missed during a disconnect
+CONFIG_SYNC_INTERVAL = 30
+
+
 class AppConfig:
+    """
+    Application settings, read from an in-memory snapshot.
+
+    Reads are plain lookups in an immutable snapshot that is replaced, and its
+    `version` bumped, on every change. With Redis, a change is also stored
+    under `open-webui:config:<key>`, increments a shared version counter and
+    is published on CONFIG_CHANNEL; `listen` applies the changes made by other
+    workers and resyncs every key when it falls behind the shared version.
+    """
+
     _state: dict[str, PersistentConfig]
+    _snapshot: MappingProxyType
+    _version: int = 0
     _redis: Optional[redis.Redis] = None
+    _redis_version: int = 0
 
     def __init__(
         self, redis_url: Optional[str] = None, redis_sentinels: Optional[list] = []
     ):
         super().__setattr__("_state", {})
+        super().__setattr__("_snapshot", MappingProxyType({}))
+        super().__setattr__("_redis_url", redis_url)
+        super().__setattr__("_redis_sentinels", redis_sentinels)
         if redis_url:
             super().__setattr__(
                 "_redis",
                 get_redis_connection(redis_url, redis_sentinels, decode_responses=True),
             )
 
+        APP_CONFIG_REGISTRY.append(self)
+
+    @property
+    def version(self) -> int:
+        return self._version
+
+    def _apply(self, values: dict):
+        for key, value in values.items():
+            self._state[key].value = value
+
+        super().__setattr__("_snapshot", MappingProxyType({**self._snapshot, **values}))
+        super().__setattr__("_version", self._version + 1)
+
     def __setattr__(self, key, value):
         if isinstance(value, PersistentConfig):
             self._state[key] = value
+
+            # Start from the value other workers agreed on
+            if self._redis:
+                redis_value = self._redis.get(f"open-webui:config:{key}")
+                if redis_value is not None:
+                    try:
+                        value.value = json.loads(redis_value)
+                    except json.JSONDecodeError:
+                        log.error(
+                            f"Invalid JSON format in Redis for {key}: {redis_value}"
+                        )
+
+            self._apply({key: value.value})
         else:
             self._state[key].value = value
             self._state[key].save()
+            self._apply({key: self._state[key].value})
 
             if self._redis:
-                redis_key = f"open-webui:config:{key}"
-                self._redis.set(redis_key, json.dumps(self._state[key].value))
+                value = self._state[key].value
+                pipe = self._redis.pipeline()
+                pipe.set(f"open-webui:config:{key}", json.dumps(value))
+                pipe.incr(CONFIG_VERSION_KEY)
+                version = pipe.execute()[1]
+
+                self._redis.publish(
+                    CONFIG_CHANNEL,
+                    json.dumps({"key": key, "value": value, "version": version}),
+                )
 
     def __getattr__(self, key):
-        if key not in self._state:
+        try:
+            return self._snapshot[key]
+        except KeyError:
             raise AttributeError(f"Config key '{key}' not found")
 
-        # If Redis is available, check for an updated value
-        if self._redis:
-            redis_key = f"open-webui:config:{key}"
-            redis_value = self._redis.get(redis_key)
-
-            if redis_value is not None:
-                try:
-                    decoded_value = json.loads(redis_value)
+    def refresh(self):
+        """Pick up values updated on the PersistentConfig entries themselves."""
+        self._apply({key: config.value for key, config in self._state.items()})
 
-                    # Update the in-memory value if different
-                    if self._state[key].value != decoded_value:
-                        self._state[key].value = decoded_value
-                        log.info(f"Updated {key} from Redis: {decoded_value}")
+        if self._redis:
+            pipe = self._redis.pipeline()
+            for key, value in self._snapshot.items():
+                pipe.set(f"open-webui:config:{key}", json.dumps(value))
+            pipe.incr(CONFIG_VERSION_KEY)
+            version = pipe.execute()[-1]
+
+            # Without a key, other workers read every key again
+            self._redis.publish(CONFIG_CHANNEL, json.dumps({"version": version}))
+
+    def sync(self):
+        """Read every key from Redis, along with the version they belong to."""
+        version = int(self._redis.get(CONFIG_VERSION_KEY) or 0)
+
+        keys = list(self._state.keys())
+        updated = {}
+        for key, redis_value in zip(
+            keys, self._redis.mget([f"open-webui:config:{key}" for key in keys])
+        ):
+            if redis_value is None:
+                continue
+
+            try:
+                value = json.loads(redis_value)
+                if self._snapshot.get(key) != value:
+                    updated[key] = value
+            except json.JSONDecodeError:
+                log.error(f"Invalid JSON format in Redis for {key}: {redis_value}")
+
+        if updated:
+            self._apply(updated)
+            log.info(f"Updated {', '.join(updated)} from Redis")
+        super().__setattr__("_redis_version", version)
+
+    async def listen(self):
+        """Apply the config changes published by other workers."""
+        if not self._redis_url:
+            return
+
+        redis = get_async_redis_connection(self._redis_url, self._redis_sentinels)
+        pubsub = redis.pubsub()
+        await pubsub.subscribe(CONFIG_CHANNEL)
 
-                except json.JSONDecodeError:
-                    log.error(f"Invalid JSON format in Redis for {key}: {redis_value}")
+        try:
+            # Changes made before the subscription are not published again
+            await asyncio.to_thread(self.sync)
 
-        return self._state[key].value
+            while True:
+                try:
+                    message = await pubsub.get_message(
+                        ignore_subscribe_messages=True, timeout=CONFIG_SYNC_INTERVAL
+                    )
+
+                    if message is None:
+                        version = int(await redis.get(CONFIG_VERSION_KEY) or 0)
+                        if version != self._redis_version:
+                            await asyncio.to_thread(self.sync)
+                        continue
+
+                    data = json.loads(message["data"])
+                    if data["version"] <= self._redis_version:
+                        continue
+
+                    if (
+                        data["version"] == self._redis_version + 1
+                        and data.get("key") in self._state
+                    ):
+                        if self._snapshot.get(data["key"]) != data["value"]:
+                            self._apply({data["key"]: data["value"]})
+                            log.info(f"Updated {data['key']} from Redis")
+                        super().__setattr__("_redis_version", data["version"])
+                    else:
+                        # A change was missed
+                        await asyncio.to_thread(self.sync)
+                except asyncio.CancelledError:
+                    raise
+                except Exception as e:
+                    log.warning(f"Failed to apply config update: {e}")
+                    await asyncio.sleep(1)
+        finally:
+            await pubsub.close()
 
 
 ####################################
@@ -734,6 +867,14 @@ AZURE_STORAGE_ENDPOINT = os.environ.get("AZURE_STORAGE_ENDPOINT", None)
 AZURE_STORAGE_CONTAINER_NAME = os.environ.get("AZURE_STORAGE_CONTAINER_NAME", None)
 AZURE_STORAGE_KEY = os.environ.get("AZURE_STORAGE_KEY", None)
 
+# Size bound of the local copies kept of remote (S3, GCS, Azure) objects, 0 for none
+STORAGE_CACHE_MAX_SIZE_MB = os.environ.get("STORAGE_CACHE_MAX_SIZE_MB", "10240")
+
+try:
+    STORAGE_CACHE_MAX_SIZE_MB = int(STORAGE_CACHE_MAX_SIZE_MB)
+except Exception:
+    STORAGE_CACHE_MAX_SIZE_MB = 10240
+
 ####################################
 # File Upload DIR
 ####################################
@@ -1708,6 +1849,19 @@ Ensure that the tools are effectively utilized to achieve the highest-quality an
 
 VECTOR_DB = os.environ.get("VECTOR_DB", "chroma")
 
+# Sparse (BM25) index used by hybrid search, one file per collection
+BM25_INDEX_DIR = os.environ.get("BM25_INDEX_DIR", f"{DATA_DIR}/bm25")
+
+# Other replicas write to the vector DB too, so an index is checked against the
+# item count of its collection before use and rebuilt when they differ. For
+# backends that cannot count, it is rebuilt once it is older than this (seconds).
+BM25_INDEX_MAX_AGE = os.environ.get("BM25_INDEX_MAX_AGE", "300")
+
+try:
+    BM25_INDEX_MAX_AGE = int(BM25_INDEX_MAX_AGE)
+except Exception:
+    BM25_INDEX_MAX_AGE = 300
+
 # Chroma
 CHROMA_DATA_PATH = f"{DATA_DIR}/vector_db"
 
@@ -2068,6 +2222,22 @@ RAG_EMBEDDING_BATCH_SIZE = PersistentConfig(
     ),
 )
 
+# Number of embedding batches sent concurrently while ingesting documents
+RAG_EMBEDDING_CONCURRENCY = os.environ.get("RAG_EMBEDDING_CONCURRENCY", "4")
+
+try:
+    RAG_EMBEDDING_CONCURRENCY = int(RAG_EMBEDDING_CONCURRENCY)
+except Exception:
+    RAG_EMBEDDING_CONCURRENCY = 4
+
+# Attempts per embedding batch after the first one, with exponential backoff
+RAG_EMBEDDING_MAX_RETRIES = os.environ.get("RAG_EMBEDDING_MAX_RETRIES", "3")
+
+try:
+    RAG_EMBEDDING_MAX_RETRIES = int(RAG_EMBEDDING_MAX_RETRIES)
+except Exception:
+    RAG_EMBEDDING_MAX_RETRIES = 3
+
 RAG_EMBEDDING_QUERY_PREFIX = os.environ.get("RAG_EMBEDDING_QUERY_PREFIX", None)
 
 RAG_EMBEDDING_CONTENT_PREFIX = os.environ.get("RAG_EMBEDDING_CONTENT_PREFIX", None)
@@ -2776,6 +2946,26 @@ WHISPER_VAD_FILTER = PersistentConfig(
 
 WHISPER_LANGUAGE = os.getenv("WHISPER_LANGUAGE", "").lower() or None
 
+# Long recordings are cut on silences into chunks of at most this many seconds,
+# of which up to TRANSCRIPTION_CONCURRENCY are transcribed at once
+TRANSCRIPTION_CHUNK_DURATION = os.getenv("TRANSCRIPTION_CHUNK_DURATION", "300")
+
+try:
+    TRANSCRIPTION_CHUNK_DURATION = int(TRANSCRIPTION_CHUNK_DURATION)
+except Exception:
+    TRANSCRIPTION_CHUNK_DURATION = 300
+
+# Recordings are split on chunk boundaries, so the duration must be positive
+if TRANSCRIPTION_CHUNK_DURATION <= 0:
+    TRANSCRIPTION_CHUNK_DURATION = 300
+
+TRANSCRIPTION_CONCURRENCY = os.getenv("TRANSCRIPTION_CONCURRENCY", "4")
+
+try:
+    TRANSCRIPTION_CONCURRENCY = int(TRANSCRIPTION_CONCURRENCY)
+except Exception:
+    TRANSCRIPTION_CONCURRENCY = 4
+
 # Add Deepgram configuration
 DEEPGRAM_API_KEY = PersistentConfig(
     "DEEPGRAM_API_KEY",
@@ -61,6 +61,7 @@ class ERROR_MESSAGES(str, Enum):
     FILE_NOT_SUPPORTED = "Oops! It seems like the file format you're trying to upload is not supported. Please upload a file with a supported format and try again."
 
     NOT_FOUND = "We could not find what you're looking for :/"
+    INVALID_CURSOR = "The cursor is not an item of this list. Please load the list again from its first page."
     USER_NOT_FOUND = "We could not find what you're looking for :/"
     API_KEY_NOT_FOUND = "Oops! It looks like there's a hiccup. The API key is missing. Please make sure to provide a valid API key to access this feature."
     API_KEY_NOT_ALLOWED = "Use of API key is not enabled in the environment."
@@ -318,6 +318,23 @@ ENABLE_REALTIME_CHAT_SAVE = (
     os.environ.get("ENABLE_REALTIME_CHAT_SAVE", "False").lower() == "true"
 )
 
+# With ENABLE_REALTIME_CHAT_SAVE, a streamed message is written at most every
+# REALTIME_CHAT_SAVE_INTERVAL seconds or once REALTIME_CHAT_SAVE_MAX_CHARS new
+# characters are pending, whichever comes first.
+REALTIME_CHAT_SAVE_INTERVAL = os.environ.get("REALTIME_CHAT_SAVE_INTERVAL", "1")
+
+try:
+    REALTIME_CHAT_SAVE_INTERVAL = float(REALTIME_CHAT_SAVE_INTERVAL)
+except Exception:
+    REALTIME_CHAT_SAVE_INTERVAL = 1.0
+
+REALTIME_CHAT_SAVE_MAX_CHARS = os.environ.get("REALTIME_CHAT_SAVE_MAX_CHARS", "2048")
+
+try:
+    REALTIME_CHAT_SAVE_MAX_CHARS = int(REALTIME_CHAT_SAVE_MAX_CHARS)
+except Exception:
+    REALTIME_CHAT_SAVE_MAX_CHARS = 2048
+
 ####################################
 # REDIS
 ####################################
@@ -407,6 +424,16 @@ WEBSOCKET_SENTINEL_HOSTS = os.environ.get("WEBSOCKET_SENTINEL_HOSTS", "")
 
 WEBSOCKET_SENTINEL_PORT = os.environ.get("WEBSOCKET_SENTINEL_PORT", "26379")
 
+# Content updates of a message being generated are sent to the clients at most
+# every CHAT_EVENT_EMIT_INTERVAL seconds, as the text appended since the last
+# one; 0 sends every update.
+CHAT_EVENT_EMIT_INTERVAL = os.environ.get("CHAT_EVENT_EMIT_INTERVAL", "0.04")
+
+try:
+    CHAT_EVENT_EMIT_INTERVAL = float(CHAT_EVENT_EMIT_INTERVAL)
+except Exception:
+    CHAT_EVENT_EMIT_INTERVAL = 0.04
+
 AIOHTTP_CLIENT_TIMEOUT = os.environ.get("AIOHTTP_CLIENT_TIMEOUT", "")
 
 if AIOHTTP_CLIENT_TIMEOUT == "":
@@ -436,6 +463,171 @@ else:
         AIOHTTP_CLIENT_TIMEOUT_MODEL_LIST = 10
 
 
+AIOHTTP_CLIENT_POOL_LIMIT = os.environ.get("AIOHTTP_CLIENT_POOL_LIMIT", "100")
+
+try:
+    AIOHTTP_CLIENT_POOL_LIMIT = int(AIOHTTP_CLIENT_POOL_LIMIT)
+except Exception:
+    AIOHTTP_CLIENT_POOL_LIMIT = 100
+
+AIOHTTP_CLIENT_POOL_LIMIT_PER_HOST = os.environ.get(
+    "AIOHTTP_CLIENT_POOL_LIMIT_PER_HOST", "0"
+)
+
+try:
+    AIOHTTP_CLIENT_POOL_LIMIT_PER_HOST = int(AIOHTTP_CLIENT_POOL_LIMIT_PER_HOST)
+except Exception:
+    AIOHTTP_CLIENT_POOL_LIMIT_PER_HOST = 0
+
+AIOHTTP_CLIENT_DNS_CACHE_TTL = os.environ.get("AIOHTTP_CLIENT_DNS_CACHE_TTL", "300")
+
+try:
+    AIOHTTP_CLIENT_DNS_CACHE_TTL = int(AIOHTTP_CLIENT_DNS_CACHE_TTL)
+except Exception:
+    AIOHTTP_CLIENT_DNS_CACHE_TTL = 300
+
+AIOHTTP_CLIENT_KEEPALIVE_TIMEOUT = os.environ.get(
+    "AIOHTTP_CLIENT_KEEPALIVE_TIMEOUT", "30"
+)
+
+try:
+    AIOHTTP_CLIENT_KEEPALIVE_TIMEOUT = float(AIOHTTP_CLIENT_KEEPALIVE_TIMEOUT)
+except Exception:
+    AIOHTTP_CLIENT_KEEPALIVE_TIMEOUT = 30.0
+
+
+####################################
+# SPEECH CACHE
+####################################
+
+# Size of the text-to-speech cache directory; the least recently played audio
+# is evicted beyond it. 0 keeps everything.
+SPEECH_CACHE_MAX_SIZE_MB = os.environ.get("SPEECH_CACHE_MAX_SIZE_MB", "1024")
+
+try:
+    SPEECH_CACHE_MAX_SIZE_MB = int(SPEECH_CACHE_MAX_SIZE_MB)
+except Exception:
+    SPEECH_CACHE_MAX_SIZE_MB = 1024
+
+####################################
+# AUTHENTICATED USER CACHE
+####################################
+
+# Seconds an authenticated user is served from memory before it is read from
+# the database again; 0 disables the cache.
+AUTH_USER_CACHE_TTL = os.environ.get("AUTH_USER_CACHE_TTL", "5")
+
+try:
+    AUTH_USER_CACHE_TTL = float(AUTH_USER_CACHE_TTL)
+except Exception:
+    AUTH_USER_CACHE_TTL = 5.0
+
+# Share cached users between workers through REDIS_URL
+ENABLE_AUTH_USER_CACHE_REDIS = (
+    os.environ.get("ENABLE_AUTH_USER_CACHE_REDIS", "False").lower() == "true"
+)
+
+# A user's last_active_at is written at most once per interval (in seconds)
+USER_LAST_ACTIVE_UPDATE_INTERVAL = os.environ.get(
+    "USER_LAST_ACTIVE_UPDATE_INTERVAL", "60"
+)
+
+try:
+    USER_LAST_ACTIVE_UPDATE_INTERVAL = float(USER_LAST_ACTIVE_UPDATE_INTERVAL)
+except Exception:
+    USER_LAST_ACTIVE_UPDATE_INTERVAL = 60.0
+
+####################################
+# FILE INGESTION QUEUE
+####################################
+
+# Number of background ingestion jobs (extraction, transcription, embedding)
+# each node runs at once; 0 leaves the jobs to other nodes.
+FILE_INGESTION_WORKERS = os.environ.get("FILE_INGESTION_WORKERS", "2")
+
+try:
+    FILE_INGESTION_WORKERS = int(FILE_INGESTION_WORKERS)
+except Exception:
+    FILE_INGESTION_WORKERS = 2
+
+# Attempts made at an ingestion job before it is marked as failed
+FILE_INGESTION_MAX_ATTEMPTS = os.environ.get("FILE_INGESTION_MAX_ATTEMPTS", "3")
+
+try:
+    FILE_INGESTION_MAX_ATTEMPTS = max(int(FILE_INGESTION_MAX_ATTEMPTS), 1)
+except Exception:
+    FILE_INGESTION_MAX_ATTEMPTS = 3
+
+####################################
+# MODEL CATALOG
+####################################
+
+# Seconds a fetched upstream model list is served before it is refreshed in
+# the background; 0 fetches on every request.
+MODEL_CATALOG_REFRESH_INTERVAL = os.environ.get("MODEL_CATALOG_REFRESH_INTERVAL", "10")
+
+try:
+    MODEL_CATALOG_REFRESH_INTERVAL = float(MODEL_CATALOG_REFRESH_INTERVAL)
+except Exception:
+    MODEL_CATALOG_REFRESH_INTERVAL = 10.0
+
+####################################
+# OLLAMA ROUTING
+####################################
+
+# random | least_outstanding | ewma_latency | loaded_model | consistent_hash
+OLLAMA_ROUTING_STRATEGY = os.environ.get("OLLAMA_ROUTING_STRATEGY", "random").lower()
+
+OLLAMA_ROUTING_FAILURE_THRESHOLD = os.environ.get(
+    "OLLAMA_ROUTING_FAILURE_THRESHOLD", "3"
+)
+
+try:
+    OLLAMA_ROUTING_FAILURE_THRESHOLD = int(OLLAMA_ROUTING_FAILURE_THRESHOLD)
+except Exception:
+    OLLAMA_ROUTING_FAILURE_THRESHOLD = 3
+
+OLLAMA_ROUTING_COOLDOWN = os.environ.get("OLLAMA_ROUTING_COOLDOWN", "30")
+
+try:
+    OLLAMA_ROUTING_COOLDOWN = float(OLLAMA_ROUTING_COOLDOWN)
+except Exception:
+    OLLAMA_ROUTING_COOLDOWN = 30.0
+
+# How long a node counts as having a model loaded after it was routed a
+# request for it (Ollama unloads idle models after 5 minutes by default)
+OLLAMA_ROUTING_LOADED_TTL = os.environ.get("OLLAMA_ROUTING_LOADED_TTL", "300")
+
+try:
+    OLLAMA_ROUTING_LOADED_TTL = float(OLLAMA_ROUTING_LOADED_TTL)
+except Exception:
+    OLLAMA_ROUTING_LOADED_TTL = 300.0
+
+####################################
+# RAG EMBEDDING CACHE
+####################################
+
+# Number of embeddings kept in memory per worker; 0 disables the cache
+RAG_EMBEDDING_CACHE_SIZE = os.environ.get("RAG_EMBEDDING_CACHE_SIZE", "10000")
+
+try:
+    RAG_EMBEDDING_CACHE_SIZE = int(RAG_EMBEDDING_CACHE_SIZE)
+except Exception:
+    RAG_EMBEDDING_CACHE_SIZE = 10000
+
+# Share cached embeddings between workers through REDIS_URL
+ENABLE_RAG_EMBEDDING_CACHE_REDIS = (
+    os.environ.get("ENABLE_RAG_EMBEDDING_CACHE_REDIS", "False").lower() == "true"
+)
+
+RAG_EMBEDDING_CACHE_REDIS_TTL = os.environ.get("RAG_EMBEDDING_CACHE_REDIS_TTL", "86400")
+
+try:
+    RAG_EMBEDDING_CACHE_REDIS_TTL = int(RAG_EMBEDDING_CACHE_REDIS_TTL)
+except Exception:
+    RAG_EMBEDDING_CACHE_REDIS_TTL = 86400
+
+
 AIOHTTP_CLIENT_TIMEOUT_TOOL_SERVER_DATA = os.environ.get(
     "AIOHTTP_CLIENT_TIMEOUT_TOOL_SERVER_DATA", "10"
 )
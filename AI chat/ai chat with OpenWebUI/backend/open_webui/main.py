@@ -54,6 +54,7 @@ from open_webui.utils.logger import start_logger
 from open_webui.socket.main import (
     app as socket_app,
     periodic_usage_pool_cleanup,
+    periodic_socket_state_heartbeat,
 )
 from open_webui.routers import (
     audio,
@@ -94,6 +95,7 @@ from open_webui.models.functions import Functions
 from open_webui.models.models import Models
 from open_webui.models.users import UserModel, Users
 from open_webui.models.chats import Chats
+from open_webui.models.groups import Groups
 
 from open_webui.config import (
     LICENSE_KEY,
@@ -412,7 +414,7 @@ from open_webui.utils.chat import (
     chat_action as chat_action_handler,
 )
 from open_webui.utils.middleware import process_chat_payload, process_chat_response
-from open_webui.utils.access_control import has_access
+from open_webui.utils.access_control import has_access, get_accessible_model_ids
 
 from open_webui.utils.auth import (
     get_license_data,
@@ -432,6 +434,17 @@ from open_webui.tasks import (
 )  # Import from tasks.py
 
 from open_webui.utils.redis import get_sentinels_from_env
+from open_webui.utils.session_pool import close_upstream_sessions
+from open_webui.utils.message_buffer import flush_message_buffers
+from open_webui.utils.user_activity import (
+    LAST_ACTIVE_WRITER,
+    periodic_last_active_flush,
+)
+from open_webui.utils.ingestion import INGESTION_QUEUE
+from open_webui.utils.model_catalog import (
+    listen_model_catalog_updates,
+    periodic_model_catalog_refresh,
+)
 
 
 if SAFE_MODE:
@@ -494,9 +507,19 @@ async def lifespan(app: FastAPI):
         limiter.total_tokens = THREAD_POOL_SIZE
 
     asyncio.create_task(periodic_usage_pool_cleanup())
+    asyncio.create_task(periodic_socket_state_heartbeat())
+    asyncio.create_task(periodic_model_catalog_refresh(app))
+    asyncio.create_task(listen_model_catalog_updates(app))
+    asyncio.create_task(app.state.config.listen())
+    asyncio.create_task(periodic_last_active_flush())
+    asyncio.create_task(INGESTION_QUEUE.run(app))
 
     yield
 
+    flush_message_buffers()
+    LAST_ACTIVE_WRITER.flush()
+    await close_upstream_sessions()
+
 
 app = FastAPI(
     title="Open WebUI",
@@ -1127,6 +1150,11 @@ if audit_level != AuditLevel.NONE:
 @app.get("/api/models")
 async def get_models(request: Request, user=Depends(get_verified_user)):
     def get_filtered_models(models, user):
+        user_group_ids = Groups.get_group_ids_by_member_id(user.id)
+        accessible_model_ids = get_accessible_model_ids(
+            user.id, [model["id"] for model in models if not model.get("arena")]
+        )
+
         filtered_models = []
         for model in models:
             if model.get("arena"):
@@ -1136,16 +1164,13 @@ async def get_models(request: Request, user=Depends(get_verified_user)):
                     access_control=model.get("info", {})
                     .get("meta", {})
                     .get("access_control", {}),
+                    user_group_ids=user_group_ids,
                 ):
                     filtered_models.append(model)
                 continue
 
-            model_info = Models.get_model_by_id(model["id"])
-            if model_info:
-                if user.id == model_info.user_id or has_access(
-                    user.id, type="read", access_control=model_info.access_control
-                ):
-                    filtered_models.append(model)
+            if model["id"] in accessible_model_ids:
+                filtered_models.append(model)
 
         return filtered_models
 
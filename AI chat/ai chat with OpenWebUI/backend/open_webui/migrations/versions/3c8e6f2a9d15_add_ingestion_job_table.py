@@ -0,0 +1,42 @@
+"""Add ingestion_job table
+
+Revision ID: 3c8e6f2a9d15
+Revises: 7d3f5a1c9b24
+Create Date: 2025-05-26 03:00:00.000000
+
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = "3c8e6f2a9d15"
+down_revision = "7d3f5a1c9b24"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        "ingestion_job",
+        sa.Column("id", sa.Text(), nullable=False, primary_key=True, unique=True),
+        sa.Column("file_id", sa.Text()),
+        sa.Column("user_id", sa.Text()),
+        sa.Column("status", sa.String()),
+        sa.Column("stage", sa.Text(), nullable=True),
+        sa.Column("error", sa.Text(), nullable=True),
+        sa.Column("attempts", sa.Integer(), default=0),
+        sa.Column("params", sa.JSON(), nullable=True),
+        sa.Column("run_at", sa.BigInteger()),
+        sa.Column("created_at", sa.BigInteger()),
+        sa.Column("updated_at", sa.BigInteger()),
+    )
+    op.create_index("ingestion_job_file_id_idx", "ingestion_job", ["file_id"])
+    op.create_index(
+        "ingestion_job_status_run_at_idx", "ingestion_job", ["status", "run_at"]
+    )
+
+
+def downgrade():
+    op.drop_index("ingestion_job_status_run_at_idx", table_name="ingestion_job")
+    op.drop_index("ingestion_job_file_id_idx", table_name="ingestion_job")
+    op.drop_table("ingestion_job")
@@ -0,0 +1,153 @@
+"""Add chat_message table
+
+Revision ID: 4e99d33b9d85
+Revises: 9f0c9cd09105
+Create Date: 2025-05-20 03:00:00.000000
+
+"""
+
+import json
+import time
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.sql import table, column
+
+revision = "4e99d33b9d85"
+down_revision = "9f0c9cd09105"
+branch_labels = None
+depends_on = None
+
+BATCH_SIZE = 100
+
+chat = table(
+    "chat",
+    column("id", sa.String()),
+    column("chat", sa.JSON()),
+)
+
+chat_message = table(
+    "chat_message",
+    column("chat_id", sa.String()),
+    column("id", sa.String()),
+    column("parent_id", sa.Text()),
+    column("role", sa.Text()),
+    column("content", sa.Text()),
+    column("data", sa.JSON()),
+    column("created_at", sa.BigInteger()),
+    column("updated_at", sa.BigInteger()),
+)
+
+
+def iter_chats(conn):
+    # Keyset pagination so that large instances are never loaded at once
+    last_id = ""
+    while True:
+        rows = conn.execute(
+            sa.select(chat.c.id, chat.c.chat)
+            .where(chat.c.id > last_id)
+            .order_by(chat.c.id)
+            .limit(BATCH_SIZE)
+        ).fetchall()
+        if not rows:
+            break
+
+        for row in rows:
+            data = row.chat
+            if isinstance(data, str):
+                data = json.loads(data)
+            yield row.id, data or {}
+
+        last_id = rows[-1].id
+
+
+def upgrade():
+    op.create_table(
+        "chat_message",
+        sa.Column("chat_id", sa.String(), nullable=False),
+        sa.Column("id", sa.String(), nullable=False),
+        sa.Column("parent_id", sa.Text(), nullable=True),
+        sa.Column("role", sa.Text(), nullable=True),
+        sa.Column("content", sa.Text(), nullable=True),
+        sa.Column("data", sa.JSON(), nullable=True),
+        sa.Column("created_at", sa.BigInteger(), nullable=True),
+        sa.Column("updated_at", sa.BigInteger(), nullable=True),
+        sa.PrimaryKeyConstraint("chat_id", "id"),
+    )
+
+    # Backfill: move `history.messages` out of every chat object
+    conn = op.get_bind()
+    now = int(time.time())
+
+    for chat_id, data in iter_chats(conn):
+        history = data.get("history")
+        if not isinstance(history, dict):
+            continue
+
+        messages = history.get("messages") or {}
+        if isinstance(messages, list):
+            messages = {
+                message["id"]: message
+                for message in messages
+                if isinstance(message, dict) and "id" in message
+            }
+
+        rows = [
+            {
+                "chat_id": chat_id,
+                "id": message_id,
+                "parent_id": message.get("parentId"),
+                "role": message.get("role"),
+                "content": (
+                    message.get("content")
+                    if isinstance(message.get("content"), str)
+                    else None
+                ),
+                "data": message,
+                "created_at": int(message.get("timestamp") or now),
+                "updated_at": now,
+            }
+            for message_id, message in messages.items()
+            if isinstance(message, dict)
+        ]
+        if rows:
+            conn.execute(sa.insert(chat_message), rows)
+
+        data = {
+            **{key: value for key, value in data.items() if key != "messages"},
+            "history": {
+                key: value for key, value in history.items() if key != "messages"
+            },
+        }
+        conn.execute(sa.update(chat).where(chat.c.id == chat_id).values(chat=data))
+
+
+def downgrade():
+    # Put the messages back into the chat objects
+    conn = op.get_bind()
+
+    for chat_id, data in iter_chats(conn):
+        if "history" not in data:
+            continue
+
+        messages = {
+            row.id: row.data
+            for row in conn.execute(
+                sa.select(chat_message.c.id, chat_message.c.data)
+                .where(chat_message.c.chat_id == chat_id)
+                .order_by(chat_message.c.created_at)
+            )
+        }
+
+        history = {**(data["history"] or {}), "messages": messages}
+
+        message_list = []
+        message = messages.get(history.get("currentId"))
+        while message:
+            message_list.insert(0, message)
+            message = messages.get(message.get("parentId"))
+
+        data = {**data, "history": history, "messages": message_list}
+        conn.execute(sa.update(chat).where(chat.c.id == chat_id).values(chat=data))
+
+    op.drop_table("chat_message")
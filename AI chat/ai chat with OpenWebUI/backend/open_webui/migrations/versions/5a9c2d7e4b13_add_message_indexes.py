@@ -0,0 +1,34 @@
+"""Add message and message_reaction indexes
+
+Revision ID: 5a9c2d7e4b13
+Revises: 3c8e6f2a9d15
+Create Date: 2025-05-27 03:00:00.000000
+
+"""
+
+from alembic import op
+
+revision = "5a9c2d7e4b13"
+down_revision = "3c8e6f2a9d15"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_index(
+        "message_channel_id_parent_id_created_at_idx",
+        "message",
+        ["channel_id", "parent_id", "created_at"],
+    )
+    op.create_index(
+        "message_parent_id_created_at_idx", "message", ["parent_id", "created_at"]
+    )
+    op.create_index(
+        "message_reaction_message_id_idx", "message_reaction", ["message_id"]
+    )
+
+
+def downgrade():
+    op.drop_index("message_reaction_message_id_idx", table_name="message_reaction")
+    op.drop_index("message_parent_id_created_at_idx", table_name="message")
+    op.drop_index("message_channel_id_parent_id_created_at_idx", table_name="message")
@@ -0,0 +1,61 @@
+"""Add group_member table
+
+Revision ID: 7d3f5a1c9b24
+Revises: b8d2e5c41a7f
+Create Date: 2025-05-24 03:00:00.000000
+
+"""
+
+import json
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.sql import table, column
+
+revision = "7d3f5a1c9b24"
+down_revision = "b8d2e5c41a7f"
+branch_labels = None
+depends_on = None
+
+group = table(
+    "group",
+    column("id", sa.Text()),
+    column("user_ids", sa.JSON()),
+)
+
+group_member = table(
+    "group_member",
+    column("group_id", sa.Text()),
+    column("user_id", sa.Text()),
+)
+
+
+def upgrade():
+    op.create_table(
+        "group_member",
+        sa.Column("group_id", sa.Text(), nullable=False),
+        sa.Column("user_id", sa.Text(), nullable=False),
+        sa.PrimaryKeyConstraint("group_id", "user_id"),
+    )
+    op.create_index("group_member_user_id_idx", "group_member", ["user_id"])
+
+    # Backfill from the `user_ids` JSON column, which stays the source for
+    # group responses and is kept in sync with this table
+    conn = op.get_bind()
+    for row in conn.execute(sa.select(group.c.id, group.c.user_ids)).fetchall():
+        user_ids = row.user_ids
+        if isinstance(user_ids, str):
+            user_ids = json.loads(user_ids)
+
+        rows = [
+            {"group_id": row.id, "user_id": user_id}
+            for user_id in dict.fromkeys(user_ids or [])
+            if isinstance(user_id, str)
+        ]
+        if rows:
+            conn.execute(sa.insert(group_member), rows)
+
+
+def downgrade():
+    op.drop_index("group_member_user_id_idx", table_name="group_member")
+    op.drop_table("group_member")
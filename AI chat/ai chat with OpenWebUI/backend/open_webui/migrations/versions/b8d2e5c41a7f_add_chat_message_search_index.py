@@ -0,0 +1,148 @@
+"""Add chat_message search index
+
+Revision ID: b8d2e5c41a7f
+Revises: 4e99d33b9d85
+Create Date: 2025-05-22 03:00:00.000000
+
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = "b8d2e5c41a7f"
+down_revision = "4e99d33b9d85"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    conn = op.get_bind()
+
+    if conn.dialect.name == "sqlite":
+        # chat_message has a composite text primary key, so its implicit rowid
+        # is not stable (VACUUM may renumber it). Every indexed message gets an
+        # INTEGER PRIMARY KEY in chat_message_search_key instead, which is the
+        # rowid of its text in chat_message_fts.
+        try:
+            conn.execute(
+                sa.text(
+                    """
+                    CREATE VIRTUAL TABLE chat_message_fts USING fts5(
+                        content,
+                        tokenize='unicode61 remove_diacritics 2'
+                    )
+                    """
+                )
+            )
+        except Exception as e:
+            # Chat search falls back to LIKE when FTS5 is not compiled in
+            print(f"Skipping chat search index, FTS5 is not available: {e}")
+            return
+
+        conn.execute(
+            sa.text(
+                """
+                CREATE TABLE chat_message_search_key (
+                    id INTEGER PRIMARY KEY,
+                    chat_id TEXT NOT NULL,
+                    message_id TEXT NOT NULL,
+                    UNIQUE (chat_id, message_id)
+                )
+                """
+            )
+        )
+
+        conn.execute(
+            sa.text(
+                """
+                CREATE TRIGGER chat_message_fts_insert AFTER INSERT ON chat_message
+                BEGIN
+                    INSERT INTO chat_message_search_key(chat_id, message_id)
+                    VALUES (new.chat_id, new.id);
+                    INSERT INTO chat_message_fts(rowid, content)
+                    VALUES (last_insert_rowid(), new.content);
+                END
+                """
+            )
+        )
+        conn.execute(
+            sa.text(
+                """
+                CREATE TRIGGER chat_message_fts_delete AFTER DELETE ON chat_message
+                BEGIN
+                    DELETE FROM chat_message_fts WHERE rowid = (
+                        SELECT id FROM chat_message_search_key
+                        WHERE chat_id = old.chat_id AND message_id = old.id
+                    );
+                    DELETE FROM chat_message_search_key
+                    WHERE chat_id = old.chat_id AND message_id = old.id;
+                END
+                """
+            )
+        )
+        conn.execute(
+            sa.text(
+                """
+                CREATE TRIGGER chat_message_fts_update AFTER UPDATE OF content ON chat_message
+                BEGIN
+                    UPDATE chat_message_fts SET content = new.content WHERE rowid = (
+                        SELECT id FROM chat_message_search_key
+                        WHERE chat_id = new.chat_id AND message_id = new.id
+                    );
+                END
+                """
+            )
+        )
+
+        conn.execute(
+            sa.text(
+                """
+                INSERT INTO chat_message_search_key(chat_id, message_id)
+                SELECT chat_id, id FROM chat_message
+                """
+            )
+        )
+        conn.execute(
+            sa.text(
+                """
+                INSERT INTO chat_message_fts(rowid, content)
+                SELECT chat_message_search_key.id, chat_message.content
+                FROM chat_message_search_key
+                JOIN chat_message
+                    ON chat_message.chat_id = chat_message_search_key.chat_id
+                    AND chat_message.id = chat_message_search_key.message_id
+                """
+            )
+        )
+
+    elif conn.dialect.name == "postgresql":
+        # The 'simple' configuration does not stem, so it works for any language
+        conn.execute(
+            sa.text(
+                """
+                ALTER TABLE chat_message ADD COLUMN search_vector tsvector
+                GENERATED ALWAYS AS (to_tsvector('simple', coalesce(content, ''))) STORED
+                """
+            )
+        )
+        op.create_index(
+            "chat_message_search_idx",
+            "chat_message",
+            ["search_vector"],
+            postgresql_using="gin",
+        )
+
+
+def downgrade():
+    conn = op.get_bind()
+
+    if conn.dialect.name == "sqlite":
+        conn.execute(sa.text("DROP TRIGGER IF EXISTS chat_message_fts_insert"))
+        conn.execute(sa.text("DROP TRIGGER IF EXISTS chat_message_fts_delete"))
+        conn.execute(sa.text("DROP TRIGGER IF EXISTS chat_message_fts_update"))
+        conn.execute(sa.text("DROP TABLE IF EXISTS chat_message_fts"))
+        conn.execute(sa.text("DROP TABLE IF EXISTS chat_message_search_key"))
+
+    elif conn.dialect.name == "postgresql":
+        op.drop_index("chat_message_search_idx", table_name="chat_message")
+        op.drop_column("chat_message", "search_vector")
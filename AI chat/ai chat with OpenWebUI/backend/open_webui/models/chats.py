@@ -1,5 +1,6 @@
 import logging
 import json
+import re
 import time
 import uuid
 from typing import Optional
@@ -7,10 +8,11 @@ from typing import Optional
 from open_webui.internal.db import Base, get_db
 from open_webui.models.tags import TagModel, Tag, Tags
 from open_webui.env import SRC_LOG_LEVELS
+from open_webui.utils.misc import get_message_list
 
 from pydantic import BaseModel, ConfigDict
-from sqlalchemy import BigInteger, Boolean, Column, String, Text, JSON
-from sqlalchemy import or_, func, select, and_, text
+from sqlalchemy import BigInteger, Boolean, Column, Float, String, Text, JSON
+from sqlalchemy import or_, func, select, and_, text, case, inspect, literal
 from sqlalchemy.sql import exists
 
 ####################
@@ -40,6 +42,21 @@ class Chat(Base):
     folder_id = Column(Text, nullable=True)
 
 
+class ChatMessage(Base):
+    __tablename__ = "chat_message"
+
+    chat_id = Column(String, primary_key=True)
+    id = Column(String, primary_key=True)
+
+    parent_id = Column(Text, nullable=True)
+    role = Column(Text, nullable=True)
+    content = Column(Text, nullable=True)
+    data = Column(JSON)
+
+    created_at = Column(BigInteger)
+    updated_at = Column(BigInteger)
+
+
 class ChatModel(BaseModel):
     model_config = ConfigDict(from_attributes=True)
 
@@ -59,6 +76,89 @@ class ChatModel(BaseModel):
     folder_id: Optional[str] = None
 
 
+class ChatMessageModel(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
+    chat_id: str
+    id: str
+
+    parent_id: Optional[str] = None
+    role: Optional[str] = None
+    content: Optional[str] = None
+    data: dict
+
+    created_at: int  # timestamp in epoch
+    updated_at: int  # timestamp in epoch
+
+
+####################
+# Chat Messages
+####################
+
+# The messages of `chat["history"]["messages"]` live in the chat_message table,
+# one row per message, so that streaming into a single message does not
+# rewrite the whole chat. The chat row keeps the rest of the chat object and
+# the full object is only assembled when a chat is read.
+
+
+def split_chat_messages(chat: dict) -> tuple[dict, dict]:
+    """
+    Split a chat object into what is stored on the chat row and its messages.
+    The linear `messages` list is dropped; it is rebuilt from the history.
+    """
+    chat = {**chat}
+    chat.pop("messages", None)
+
+    if "history" not in chat:
+        return chat, {}
+
+    history = {**(chat["history"] or {})}
+    messages = history.pop("messages", None) or {}
+    chat["history"] = history
+
+    if isinstance(messages, list):
+        messages = {
+            message["id"]: message
+            for message in messages
+            if isinstance(message, dict) and "id" in message
+        }
+
+    return chat, {
+        message_id: message
+        for message_id, message in messages.items()
+        if isinstance(message, dict)
+    }
+
+
+def assemble_chat(chat: dict, messages: dict) -> dict:
+    if "history" not in chat:
+        return chat
+
+    history = chat["history"] or {}
+    # Rows win over anything still embedded in a chat written before the
+    # messages were moved out
+    messages = {**(history.get("messages") or {}), **messages}
+
+    return {
+        **chat,
+        "history": {**history, "messages": messages},
+        "messages": get_message_list(messages, history.get("currentId")),
+    }
+
+
+def get_message_row(chat_id: str, message_id: str, message: dict, now: int) -> dict:
+    content = message.get("content")
+    return {
+        "chat_id": chat_id,
+        "id": message_id,
+        "parent_id": message.get("parentId"),
+        "role": message.get("role"),
+        "content": content if isinstance(content, str) else None,
+        "data": message,
+        "updated_at": now,
+    }
+
+
 ####################
 # Forms
 ####################
@@ -105,6 +205,158 @@ class ChatTitleIdResponse(BaseModel):
 
 
 class ChatTable:
+    # Whether the full-text index of chat messages exists, detected on first use
+    _search_index: Optional[bool] = None
+
+    def _has_search_index(self, db) -> bool:
+        if self._search_index is None:
+            inspector = inspect(db.bind)
+            if db.bind.dialect.name == "sqlite":
+                self._search_index = inspector.has_table("chat_message_fts")
+            elif db.bind.dialect.name == "postgresql":
+                self._search_index = "search_vector" in [
+                    column["name"] for column in inspector.get_columns("chat_message")
+                ]
+            else:
+                self._search_index = False
+
+            if not self._search_index:
+                log.warning("Chat search index not found, searching messages with LIKE")
+
+        return self._search_index
+
+    def _get_message_matches(self, db, user_id: str, search_text: str):
+        """
+        Subquery of the chats of `user_id` with a message matching
+        `search_text` and the rank of their best match (lower is better).
+
+        Every word of the search text has to match the start of a word of the
+        message, so that results come up while the user is still typing.
+        """
+        words = re.findall(r"\w+", search_text)
+
+        if words and self._has_search_index(db):
+            if db.bind.dialect.name == "sqlite":
+                query = text(
+                    """
+                    SELECT search_key.chat_id AS chat_id, MIN(fts.rank) AS rank
+                    FROM chat_message_fts AS fts
+                    JOIN chat_message_search_key AS search_key ON search_key.id = fts.rowid
+                    JOIN chat ON chat.id = search_key.chat_id
+                    WHERE chat_message_fts MATCH :search_query
+                        AND chat.user_id = :user_id
+                    GROUP BY search_key.chat_id
+                    """
+                ).bindparams(
+                    search_query=" ".join(f'"{word}"*' for word in words),
+                    user_id=user_id,
+                )
+            else:
+                query = text(
+                    """
+                    SELECT chat_message.chat_id AS chat_id,
+                        -MAX(ts_rank(chat_message.search_vector, query)) AS rank
+                    FROM chat_message
+                    JOIN chat ON chat.id = chat_message.chat_id,
+                        to_tsquery('simple', :search_query) AS query
+                    WHERE chat_message.search_vector @@ query
+                        AND chat.user_id = :user_id
+                    GROUP BY chat_message.chat_id
+                    """
+                ).bindparams(
+                    search_query=" & ".join(f"{word}:*" for word in words),
+                    user_id=user_id,
+                )
+
+            return query.columns(chat_id=String, rank=Float).subquery("matches")
+
+        return (
+            select(ChatMessage.chat_id, literal(0.0).label("rank"))
+            .join(Chat, Chat.id == ChatMessage.chat_id)
+            .where(
+                Chat.user_id == user_id,
+                func.lower(ChatMessage.content).contains(search_text),
+            )
+            .distinct()
+            .subquery("matches")
+        )
+
+    def _get_messages_by_chat_ids(self, db, chat_ids: list[str]) -> dict[str, dict]:
+        messages = {}
+        # Chunked to stay below the bound parameter limit of SQLite
+        for i in range(0, len(chat_ids), 500):
+            rows = (
+                db.query(ChatMessage.chat_id, ChatMessage.id, ChatMessage.data)
+                .filter(ChatMessage.chat_id.in_(chat_ids[i : i + 500]))
+                .order_by(ChatMessage.created_at)
+            )
+            for chat_id, message_id, data in rows:
+                messages.setdefault(chat_id, {})[message_id] = data
+        return messages
+
+    def _to_chat_models(self, db, chats, messages: bool = True) -> list[ChatModel]:
+        """
+        Without `messages`, the chat objects are returned as stored, without
+        their messages; for lists that only need the other columns.
+        """
+        chats = [ChatModel.model_validate(chat) for chat in chats]
+        if not messages:
+            return chats
+
+        messages = self._get_messages_by_chat_ids(db, [chat.id for chat in chats])
+        for chat in chats:
+            chat.chat = assemble_chat(chat.chat, messages.get(chat.id, {}))
+        return chats
+
+    def _to_chat_model(self, db, chat: Chat) -> ChatModel:
+        return self._to_chat_models(db, [chat])[0]
+
+    def _set_messages(self, db, chat_id: str, messages: dict):
+        """
+        Make the stored messages of a chat match `messages`, only writing the
+        rows that were added, changed or removed.
+        """
+        existing = dict(
+            db.query(ChatMessage.id, ChatMessage.data).filter_by(chat_id=chat_id)
+        )
+        now = int(time.time())
+
+        for message_id, message in messages.items():
+            if message_id not in existing:
+                db.add(
+                    ChatMessage(
+                        **get_message_row(chat_id, message_id, message, now),
+                        created_at=int(message.get("timestamp") or now),
+                    )
+                )
+            elif existing[message_id] != message:
+                db.query(ChatMessage).filter_by(chat_id=chat_id, id=message_id).update(
+                    get_message_row(chat_id, message_id, message, now)
+                )
+
+        removed = [message_id for message_id in existing if message_id not in messages]
+        if removed:
+            db.query(ChatMessage).filter(
+                ChatMessage.chat_id == chat_id, ChatMessage.id.in_(removed)
+            ).delete(synchronize_session=False)
+
+    def _copy_messages(self, db, from_chat_id: str, to_chat_id: str):
+        db.query(ChatMessage).filter_by(chat_id=to_chat_id).delete()
+        for row in db.query(ChatMessage).filter_by(chat_id=from_chat_id).all():
+            db.add(
+                ChatMessage(
+                    **{
+                        **ChatMessageModel.model_validate(row).model_dump(),
+                        "chat_id": to_chat_id,
+                    }
+                )
+            )
+
+    def _delete_messages(self, db, *criteria):
+        db.query(ChatMessage).filter(
+            ChatMessage.chat_id.in_(select(Chat.id).where(*criteria))
+        ).delete(synchronize_session=False)
+
     def insert_new_chat(self, user_id: str, form_data: ChatForm) -> Optional[ChatModel]:
         with get_db() as db:
             id = str(uuid.uuid4())
@@ -123,11 +375,14 @@ class ChatTable:
                 }
             )
 
+            chat.chat, messages = split_chat_messages(chat.chat)
+
             result = Chat(**chat.model_dump())
             db.add(result)
+            self._set_messages(db, id, messages)
             db.commit()
             db.refresh(result)
-            return ChatModel.model_validate(result) if result else None
+            return self._to_chat_model(db, result) if result else None
 
     def import_chat(
         self, user_id: str, form_data: ChatImportForm
@@ -152,35 +407,45 @@ class ChatTable:
                 }
             )
 
+            chat.chat, messages = split_chat_messages(chat.chat)
+
             result = Chat(**chat.model_dump())
             db.add(result)
+            self._set_messages(db, id, messages)
             db.commit()
             db.refresh(result)
-            return ChatModel.model_validate(result) if result else None
+            return self._to_chat_model(db, result) if result else None
 
     def update_chat_by_id(self, id: str, chat: dict) -> Optional[ChatModel]:
         try:
             with get_db() as db:
                 chat_item = db.get(Chat, id)
-                chat_item.chat = chat
+                chat_item.chat, messages = split_chat_messages(chat)
                 chat_item.title = chat["title"] if "title" in chat else "New Chat"
                 chat_item.updated_at = int(time.time())
+                self._set_messages(db, id, messages)
                 db.commit()
                 db.refresh(chat_item)
 
-                return ChatModel.model_validate(chat_item)
+                chat = ChatModel.model_validate(chat_item)
+                chat.chat = assemble_chat(chat.chat, messages)
+                return chat
         except Exception:
             return None
 
     def update_chat_title_by_id(self, id: str, title: str) -> Optional[ChatModel]:
-        chat = self.get_chat_by_id(id)
-        if chat is None:
-            return None
-
-        chat = chat.chat
-        chat["title"] = title
+        try:
+            with get_db() as db:
+                chat = db.get(Chat, id)
+                chat.chat = {**chat.chat, "title": title}
+                chat.title = title
+                chat.updated_at = int(time.time())
+                db.commit()
+                db.refresh(chat)
 
-        return self.update_chat_by_id(id, chat)
+                return self._to_chat_model(db, chat)
+        except Exception:
+            return None
 
     def update_chat_tags_by_id(
         self, id: str, tags: list[str], user
@@ -203,68 +468,92 @@ class ChatTable:
         return self.get_chat_by_id(id)
 
     def get_chat_title_by_id(self, id: str) -> Optional[str]:
-        chat = self.get_chat_by_id(id)
-        if chat is None:
-            return None
+        with get_db() as db:
+            chat = db.get(Chat, id)
+            if chat is None:
+                return None
 
-        return chat.chat.get("title", "New Chat")
+            return chat.chat.get("title", "New Chat")
 
     def get_messages_by_chat_id(self, id: str) -> Optional[dict]:
-        chat = self.get_chat_by_id(id)
-        if chat is None:
-            return None
+        with get_db() as db:
+            if db.query(Chat.id).filter_by(id=id).first() is None:
+                return None
 
-        return chat.chat.get("history", {}).get("messages", {}) or {}
+            return self._get_messages_by_chat_ids(db, [id]).get(id, {})
 
     def get_message_by_id_and_message_id(
         self, id: str, message_id: str
     ) -> Optional[dict]:
-        chat = self.get_chat_by_id(id)
-        if chat is None:
-            return None
+        with get_db() as db:
+            message = db.get(ChatMessage, (id, message_id))
+            if message:
+                return message.data
 
-        return chat.chat.get("history", {}).get("messages", {}).get(message_id, {})
+            if db.query(Chat.id).filter_by(id=id).first() is None:
+                return None
+
+            return {}
 
     def upsert_message_to_chat_by_id_and_message_id(
         self, id: str, message_id: str, message: dict
-    ) -> Optional[ChatModel]:
-        chat = self.get_chat_by_id(id)
-        if chat is None:
-            return None
-
-        chat = chat.chat
-        history = chat.get("history", {})
-
-        if message_id in history.get("messages", {}):
-            history["messages"][message_id] = {
-                **history["messages"][message_id],
-                **message,
-            }
-        else:
-            history["messages"][message_id] = message
+    ) -> Optional[ChatMessageModel]:
+        try:
+            with get_db() as db:
+                chat = db.get(Chat, id)
+                if chat is None:
+                    return None
 
-        history["currentId"] = message_id
+                now = int(time.time())
+                row = db.get(ChatMessage, (id, message_id))
+                if row:
+                    for key, value in get_message_row(
+                        id, message_id, {**row.data, **message}, now
+                    ).items():
+                        setattr(row, key, value)
+                else:
+                    row = ChatMessage(
+                        **get_message_row(id, message_id, message, now),
+                        created_at=int(message.get("timestamp") or now),
+                    )
+                    db.add(row)
+
+                chat.chat = {
+                    **chat.chat,
+                    "history": {
+                        **chat.chat.get("history", {}),
+                        "currentId": message_id,
+                    },
+                }
+                chat.updated_at = now
 
-        chat["history"] = history
-        return self.update_chat_by_id(id, chat)
+                db.commit()
+                db.refresh(row)
+                return ChatMessageModel.model_validate(row)
+        except Exception as e:
+            log.exception(f"Error saving message {message_id} of chat {id}: {e}")
+            return None
 
     def add_message_status_to_chat_by_id_and_message_id(
         self, id: str, message_id: str, status: dict
-    ) -> Optional[ChatModel]:
-        chat = self.get_chat_by_id(id)
-        if chat is None:
-            return None
-
-        chat = chat.chat
-        history = chat.get("history", {})
+    ) -> Optional[ChatMessageModel]:
+        try:
+            with get_db() as db:
+                row = db.get(ChatMessage, (id, message_id))
+                if row is None:
+                    return None
 
-        if message_id in history.get("messages", {}):
-            status_history = history["messages"][message_id].get("statusHistory", [])
-            status_history.append(status)
-            history["messages"][message_id]["statusHistory"] = status_history
+                row.data = {
+                    **row.data,
+                    "statusHistory": [*row.data.get("statusHistory", []), status],
+                }
+                row.updated_at = int(time.time())
 
-        chat["history"] = history
-        return self.update_chat_by_id(id, chat)
+                db.commit()
+                db.refresh(row)
+                return ChatMessageModel.model_validate(row)
+        except Exception:
+            return None
 
     def insert_shared_chat_by_chat_id(self, chat_id: str) -> Optional[ChatModel]:
         with get_db() as db:
@@ -286,6 +575,7 @@ class ChatTable:
             )
             shared_result = Chat(**shared_chat.model_dump())
             db.add(shared_result)
+            self._copy_messages(db, chat_id, shared_chat.id)
             db.commit()
             db.refresh(shared_result)
 
@@ -296,7 +586,11 @@ class ChatTable:
                 .update({"share_id": shared_chat.id})
             )
             db.commit()
-            return shared_chat if (shared_result and result) else None
+            return (
+                self._to_chat_model(db, shared_result)
+                if (shared_result and result)
+                else None
+            )
 
     def update_shared_chat_by_chat_id(self, chat_id: str) -> Optional[ChatModel]:
         try:
@@ -311,18 +605,20 @@ class ChatTable:
 
                 shared_chat.title = chat.title
                 shared_chat.chat = chat.chat
+                self._copy_messages(db, chat_id, shared_chat.id)
 
                 shared_chat.updated_at = int(time.time())
                 db.commit()
                 db.refresh(shared_chat)
 
-                return ChatModel.model_validate(shared_chat)
+                return self._to_chat_model(db, shared_chat)
         except Exception:
             return None
 
     def delete_shared_chat_by_chat_id(self, chat_id: str) -> bool:
         try:
             with get_db() as db:
+                self._delete_messages(db, Chat.user_id == f"shared-{chat_id}")
                 db.query(Chat).filter_by(user_id=f"shared-{chat_id}").delete()
                 db.commit()
 
@@ -339,7 +635,7 @@ class ChatTable:
                 chat.share_id = share_id
                 db.commit()
                 db.refresh(chat)
-                return ChatModel.model_validate(chat)
+                return self._to_chat_model(db, chat)
         except Exception:
             return None
 
@@ -351,7 +647,7 @@ class ChatTable:
                 chat.updated_at = int(time.time())
                 db.commit()
                 db.refresh(chat)
-                return ChatModel.model_validate(chat)
+                return self._to_chat_model(db, chat)
         except Exception:
             return None
 
@@ -363,7 +659,7 @@ class ChatTable:
                 chat.updated_at = int(time.time())
                 db.commit()
                 db.refresh(chat)
-                return ChatModel.model_validate(chat)
+                return self._to_chat_model(db, chat)
         except Exception:
             return None
 
@@ -411,7 +707,7 @@ class ChatTable:
                 query = query.limit(limit)
 
             all_chats = query.all()
-            return [ChatModel.model_validate(chat) for chat in all_chats]
+            return self._to_chat_models(db, all_chats, messages=False)
 
     def get_chat_list_by_user_id(
         self,
@@ -450,7 +746,7 @@ class ChatTable:
                 query = query.limit(limit)
 
             all_chats = query.all()
-            return [ChatModel.model_validate(chat) for chat in all_chats]
+            return self._to_chat_models(db, all_chats, messages=False)
 
     def get_chat_title_id_list_by_user_id(
         self,
@@ -501,13 +797,13 @@ class ChatTable:
                 .order_by(Chat.updated_at.desc())
                 .all()
             )
-            return [ChatModel.model_validate(chat) for chat in all_chats]
+            return self._to_chat_models(db, all_chats, messages=False)
 
     def get_chat_by_id(self, id: str) -> Optional[ChatModel]:
         try:
             with get_db() as db:
                 chat = db.get(Chat, id)
-                return ChatModel.model_validate(chat)
+                return self._to_chat_model(db, chat)
         except Exception:
             return None
 
@@ -529,7 +825,7 @@ class ChatTable:
         try:
             with get_db() as db:
                 chat = db.query(Chat).filter_by(id=id, user_id=user_id).first()
-                return ChatModel.model_validate(chat)
+                return self._to_chat_model(db, chat)
         except Exception:
             return None
 
@@ -540,7 +836,7 @@ class ChatTable:
                 # .limit(limit).offset(skip)
                 .order_by(Chat.updated_at.desc())
             )
-            return [ChatModel.model_validate(chat) for chat in all_chats]
+            return self._to_chat_models(db, all_chats)
 
     def get_chats_by_user_id(self, user_id: str) -> list[ChatModel]:
         with get_db() as db:
@@ -549,7 +845,7 @@ class ChatTable:
                 .filter_by(user_id=user_id)
                 .order_by(Chat.updated_at.desc())
             )
-            return [ChatModel.model_validate(chat) for chat in all_chats]
+            return self._to_chat_models(db, all_chats)
 
     def get_pinned_chats_by_user_id(self, user_id: str) -> list[ChatModel]:
         with get_db() as db:
@@ -558,7 +854,7 @@ class ChatTable:
                 .filter_by(user_id=user_id, pinned=True, archived=False)
                 .order_by(Chat.updated_at.desc())
             )
-            return [ChatModel.model_validate(chat) for chat in all_chats]
+            return self._to_chat_models(db, all_chats, messages=False)
 
     def get_archived_chats_by_user_id(self, user_id: str) -> list[ChatModel]:
         with get_db() as db:
@@ -567,7 +863,7 @@ class ChatTable:
                 .filter_by(user_id=user_id, archived=True)
                 .order_by(Chat.updated_at.desc())
             )
-            return [ChatModel.model_validate(chat) for chat in all_chats]
+            return self._to_chat_models(db, all_chats)
 
     def get_chats_by_user_id_and_search_text(
         self,
@@ -578,7 +874,8 @@ class ChatTable:
         limit: int = 60,
     ) -> list[ChatModel]:
         """
-        Filters chats based on a search query using Python, allowing pagination using skip and limit.
+        Filters chats based on a search query using the full-text index of
+        their messages, allowing pagination using skip and limit.
         """
         search_text = search_text.lower().strip()
 
@@ -608,29 +905,27 @@ class ChatTable:
             if not include_archived:
                 query = query.filter(Chat.archived == False)
 
-            query = query.order_by(Chat.updated_at.desc())
+            if search_text:
+                matches = self._get_message_matches(db, user_id, search_text)
+                title_match = Chat.title.ilike(f"%{search_text}%")
+
+                query = (
+                    query.outerjoin(matches, matches.c.chat_id == Chat.id)
+                    .filter(title_match | (matches.c.chat_id != None))
+                    .order_by(
+                        # Title matches first, then by how well a message matched
+                        case((title_match, 0), else_=1),
+                        case((matches.c.rank == None, 1), else_=0),
+                        matches.c.rank,
+                        Chat.updated_at.desc(),
+                    )
+                )
+            else:
+                query = query.order_by(Chat.updated_at.desc())
 
             # Check if the database dialect is either 'sqlite' or 'postgresql'
             dialect_name = db.bind.dialect.name
             if dialect_name == "sqlite":
-                # SQLite case: using JSON1 extension for JSON searching
-                query = query.filter(
-                    (
-                        Chat.title.ilike(
-                            f"%{search_text}%"
-                        )  # Case-insensitive search in title
-                        | text(
-                            """
-                            EXISTS (
-                                SELECT 1 
-                                FROM json_each(Chat.chat, '$.messages') AS message 
-                                WHERE LOWER(message.value->>'content') LIKE '%' || :search_text || '%'
-                            )
-                            """
-                        )
-                    ).params(search_text=search_text)
-                )
-
                 # Check if there are any tags to filter, it should have all the tags
                 if "none" in tag_ids:
                     query = query.filter(
@@ -662,24 +957,6 @@ class ChatTable:
                     )
 
             elif dialect_name == "postgresql":
-                # PostgreSQL relies on proper JSON query for search
-                query = query.filter(
-                    (
-                        Chat.title.ilike(
-                            f"%{search_text}%"
-                        )  # Case-insensitive search in title
-                        | text(
-                            """
-                            EXISTS (
-                                SELECT 1
-                                FROM json_array_elements(Chat.chat->'messages') AS message
-                                WHERE LOWER(message->>'content') LIKE '%' || :search_text || '%'
-                            )
-                            """
-                        )
-                    ).params(search_text=search_text)
-                )
-
                 # Check if there are any tags to filter, it should have all the tags
                 if "none" in tag_ids:
                     query = query.filter(
@@ -720,7 +997,7 @@ class ChatTable:
             log.info(f"The number of chats: {len(all_chats)}")
 
             # Validate and return chats
-            return [ChatModel.model_validate(chat) for chat in all_chats]
+            return self._to_chat_models(db, all_chats, messages=False)
 
     def get_chats_by_folder_id_and_user_id(
         self, folder_id: str, user_id: str
@@ -733,7 +1010,7 @@ class ChatTable:
             query = query.order_by(Chat.updated_at.desc())
 
             all_chats = query.all()
-            return [ChatModel.model_validate(chat) for chat in all_chats]
+            return self._to_chat_models(db, all_chats, messages=False)
 
     def get_chats_by_folder_ids_and_user_id(
         self, folder_ids: list[str], user_id: str
@@ -748,7 +1025,7 @@ class ChatTable:
             query = query.order_by(Chat.updated_at.desc())
 
             all_chats = query.all()
-            return [ChatModel.model_validate(chat) for chat in all_chats]
+            return self._to_chat_models(db, all_chats)
 
     def update_chat_folder_id_by_id_and_user_id(
         self, id: str, user_id: str, folder_id: str
@@ -761,7 +1038,7 @@ class ChatTable:
                 chat.pinned = False
                 db.commit()
                 db.refresh(chat)
-                return ChatModel.model_validate(chat)
+                return self._to_chat_model(db, chat)
         except Exception:
             return None
 
@@ -800,7 +1077,7 @@ class ChatTable:
 
             all_chats = query.all()
             log.debug(f"all_chats: {all_chats}")
-            return [ChatModel.model_validate(chat) for chat in all_chats]
+            return self._to_chat_models(db, all_chats, messages=False)
 
     def add_chat_tag_by_id_and_user_id_and_tag_name(
         self, id: str, user_id: str, tag_name: str
@@ -821,7 +1098,7 @@ class ChatTable:
 
                 db.commit()
                 db.refresh(chat)
-                return ChatModel.model_validate(chat)
+                return self._to_chat_model(db, chat)
         except Exception:
             return None
 
@@ -897,6 +1174,7 @@ class ChatTable:
     def delete_chat_by_id(self, id: str) -> bool:
         try:
             with get_db() as db:
+                self._delete_messages(db, Chat.id == id)
                 db.query(Chat).filter_by(id=id).delete()
                 db.commit()
 
@@ -907,6 +1185,7 @@ class ChatTable:
     def delete_chat_by_id_and_user_id(self, id: str, user_id: str) -> bool:
         try:
             with get_db() as db:
+                self._delete_messages(db, Chat.id == id, Chat.user_id == user_id)
                 db.query(Chat).filter_by(id=id, user_id=user_id).delete()
                 db.commit()
 
@@ -919,6 +1198,7 @@ class ChatTable:
             with get_db() as db:
                 self.delete_shared_chats_by_user_id(user_id)
 
+                self._delete_messages(db, Chat.user_id == user_id)
                 db.query(Chat).filter_by(user_id=user_id).delete()
                 db.commit()
 
@@ -931,6 +1211,9 @@ class ChatTable:
     ) -> bool:
         try:
             with get_db() as db:
+                self._delete_messages(
+                    db, Chat.user_id == user_id, Chat.folder_id == folder_id
+                )
                 db.query(Chat).filter_by(user_id=user_id, folder_id=folder_id).delete()
                 db.commit()
 
@@ -944,6 +1227,7 @@ class ChatTable:
                 chats_by_user = db.query(Chat).filter_by(user_id=user_id).all()
                 shared_chat_ids = [f"shared-{chat.id}" for chat in chats_by_user]
 
+                self._delete_messages(db, Chat.user_id.in_(shared_chat_ids))
                 db.query(Chat).filter(Chat.user_id.in_(shared_chat_ids)).delete()
                 db.commit()
 
@@ -5,7 +5,7 @@ from typing import Optional
 from open_webui.internal.db import Base, JSONField, get_db
 from open_webui.env import SRC_LOG_LEVELS
 from pydantic import BaseModel, ConfigDict
-from sqlalchemy import BigInteger, Column, String, Text, JSON
+from sqlalchemy import BigInteger, Column, String, Text, JSON, and_, func, or_
 
 log = logging.getLogger(__name__)
 log.setLevel(SRC_LOG_LEVELS["MODELS"])
@@ -97,6 +97,13 @@ class FileForm(BaseModel):
     access_control: Optional[dict] = None
 
 
+def wildcard_to_like(pattern: str) -> str:
+    """Translate a `*` and `?` wildcard pattern into a LIKE pattern escaped with `\\`."""
+    for char in ("\\", "%", "_"):
+        pattern = pattern.replace(char, f"\\{char}")
+    return pattern.replace("*", "%").replace("?", "_")
+
+
 class FilesTable:
     def insert_new_file(self, user_id: str, form_data: FileForm) -> Optional[FileModel]:
         with get_db() as db:
@@ -147,6 +154,64 @@ class FilesTable:
         with get_db() as db:
             return [FileModel.model_validate(file) for file in db.query(File).all()]
 
+    def get_file_list(
+        self,
+        user_id: Optional[str] = None,
+        filename: Optional[str] = None,
+        content: bool = True,
+        cursor: Optional[str] = None,
+        limit: Optional[int] = None,
+    ) -> list[FileModel]:
+        """
+        Files (of `user_id`, when given) whose filename matches the wildcard
+        pattern `filename`, newest first. `data` is only read with `content`,
+        otherwise it is returned empty. Pages start after the file with id
+        `cursor`; ValueError is raised when there is no such file.
+        """
+        with get_db() as db:
+            columns = [
+                column
+                for column in File.__table__.columns
+                if content or column.name != "data"
+            ]
+            query = db.query(*columns)
+
+            if user_id:
+                query = query.filter(File.user_id == user_id)
+
+            if filename:
+                query = query.filter(
+                    func.lower(File.filename).like(
+                        wildcard_to_like(filename.lower()), escape="\\"
+                    )
+                )
+
+            if cursor:
+                last = db.query(File.created_at).filter_by(id=cursor).first()
+                if last is None:
+                    raise ValueError(f"Unknown cursor: {cursor}")
+
+                query = query.filter(
+                    or_(
+                        File.created_at < last.created_at,
+                        and_(
+                            File.created_at == last.created_at,
+                            File.id < cursor,
+                        ),
+                    )
+                )
+
+            query = query.order_by(File.created_at.desc(), File.id.desc())
+            if limit:
+                query = query.limit(limit)
+
+            return [
+                FileModel.model_validate(
+                    {**row._mapping, **({} if content else {"data": {}})}
+                )
+                for row in query.all()
+            ]
+
     def get_files_by_ids(self, ids: list[str]) -> list[FileModel]:
         with get_db() as db:
             return [
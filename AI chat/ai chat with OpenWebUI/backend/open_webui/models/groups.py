@@ -11,12 +11,19 @@ from open_webui.models.files import FileMetadataResponse
 
 
 from pydantic import BaseModel, ConfigDict
-from sqlalchemy import BigInteger, Column, String, Text, JSON, func
+from sqlalchemy import BigInteger, Column, Index, Text, JSON
 
 
 log = logging.getLogger(__name__)
 log.setLevel(SRC_LOG_LEVELS["MODELS"])
 
+# Seconds a user's group ids are reused by access checks. Local group changes
+# clear the cache immediately; this bounds staleness across workers.
+GROUP_MEMBER_CACHE_TTL = 5
+
+# user_id -> (cached_at, group ids)
+_group_ids_by_member_cache: dict[str, tuple[float, frozenset[str]]] = {}
+
 ####################
 # UserGroup DB Schema
 ####################
@@ -41,6 +48,20 @@ class Group(Base):
     updated_at = Column(BigInteger)
 
 
+class GroupMember(Base):
+    """
+    One row per (group, user) pair, mirroring `Group.user_ids` so that the
+    groups of a user are found through an index.
+    """
+
+    __tablename__ = "group_member"
+
+    group_id = Column(Text, primary_key=True)
+    user_id = Column(Text, primary_key=True)
+
+    __table_args__ = (Index("group_member_user_id_idx", "user_id"),)
+
+
 class GroupModel(BaseModel):
     model_config = ConfigDict(from_attributes=True)
     id: str
@@ -88,6 +109,15 @@ class GroupUpdateForm(GroupForm):
 
 
 class GroupTable:
+    def _set_members(self, db, group_id: str, user_ids: Optional[list[str]]):
+        # Called in the same transaction as every write of `Group.user_ids`
+        db.query(GroupMember).filter_by(group_id=group_id).delete()
+        if user_ids:
+            db.add_all(
+                GroupMember(group_id=group_id, user_id=user_id)
+                for user_id in dict.fromkeys(user_ids)
+            )
+
     def insert_new_group(
         self, user_id: str, form_data: GroupForm
     ) -> Optional[GroupModel]:
@@ -105,8 +135,10 @@ class GroupTable:
             try:
                 result = Group(**group.model_dump())
                 db.add(result)
+                self._set_members(db, group.id, group.user_ids)
                 db.commit()
                 db.refresh(result)
+                self.clear_member_cache()
                 if result:
                     return GroupModel.model_validate(result)
                 else:
@@ -127,16 +159,30 @@ class GroupTable:
             return [
                 GroupModel.model_validate(group)
                 for group in db.query(Group)
-                .filter(
-                    func.json_array_length(Group.user_ids) > 0
-                )  # Ensure array exists
-                .filter(
-                    Group.user_ids.cast(String).like(f'%"{user_id}"%')
-                )  # String-based check
+                .join(GroupMember, GroupMember.group_id == Group.id)
+                .filter(GroupMember.user_id == user_id)
                 .order_by(Group.updated_at.desc())
                 .all()
             ]
 
+    def get_group_ids_by_member_id(self, user_id: str) -> frozenset[str]:
+        cached = _group_ids_by_member_cache.get(user_id)
+        if cached and time.time() - cached[0] < GROUP_MEMBER_CACHE_TTL:
+            return cached[1]
+
+        with get_db() as db:
+            group_ids = frozenset(
+                group_id
+                for (group_id,) in db.query(GroupMember.group_id).filter_by(
+                    user_id=user_id
+                )
+            )
+        _group_ids_by_member_cache[user_id] = (time.time(), group_ids)
+        return group_ids
+
+    def clear_member_cache(self):
+        _group_ids_by_member_cache.clear()
+
     def get_group_by_id(self, id: str) -> Optional[GroupModel]:
         try:
             with get_db() as db:
@@ -163,7 +209,10 @@ class GroupTable:
                         "updated_at": int(time.time()),
                     }
                 )
+                if form_data.user_ids is not None:
+                    self._set_members(db, id, form_data.user_ids)
                 db.commit()
+                self.clear_member_cache()
                 return self.get_group_by_id(id=id)
         except Exception as e:
             log.exception(e)
@@ -173,7 +222,9 @@ class GroupTable:
         try:
             with get_db() as db:
                 db.query(Group).filter_by(id=id).delete()
+                db.query(GroupMember).filter_by(group_id=id).delete()
                 db.commit()
+                self.clear_member_cache()
                 return True
         except Exception:
             return False
@@ -182,7 +233,9 @@ class GroupTable:
         with get_db() as db:
             try:
                 db.query(Group).delete()
+                db.query(GroupMember).delete()
                 db.commit()
+                self.clear_member_cache()
 
                 return True
             except Exception:
@@ -194,15 +247,18 @@ class GroupTable:
                 groups = self.get_groups_by_member_id(user_id)
 
                 for group in groups:
-                    group.user_ids.remove(user_id)
+                    group.user_ids = [id for id in group.user_ids if id != user_id]
                     db.query(Group).filter_by(id=group.id).update(
                         {
                             "user_ids": group.user_ids,
                             "updated_at": int(time.time()),
                         }
                     )
-                    db.commit()
 
+                db.query(GroupMember).filter_by(user_id=user_id).delete()
+                db.commit()
+
+                self.clear_member_cache()
                 return True
             except Exception:
                 return False
@@ -220,26 +276,31 @@ class GroupTable:
 
                 for group in existing_groups:
                     if group.id not in group_ids:
-                        group.user_ids.remove(user_id)
+                        group.user_ids = [id for id in group.user_ids if id != user_id]
                         db.query(Group).filter_by(id=group.id).update(
                             {
                                 "user_ids": group.user_ids,
                                 "updated_at": int(time.time()),
                             }
                         )
+                        db.query(GroupMember).filter_by(
+                            group_id=group.id, user_id=user_id
+                        ).delete()
 
                 # Add user to new groups
                 for group in groups:
-                    if user_id not in group.user_ids:
-                        group.user_ids.append(user_id)
+                    if user_id not in (group.user_ids or []):
+                        group.user_ids = [*(group.user_ids or []), user_id]
                         db.query(Group).filter_by(id=group.id).update(
                             {
                                 "user_ids": group.user_ids,
                                 "updated_at": int(time.time()),
                             }
                         )
+                        db.add(GroupMember(group_id=group.id, user_id=user_id))
 
                 db.commit()
+                self.clear_member_cache()
                 return True
             except Exception as e:
                 log.exception(e)
@@ -0,0 +1,238 @@
+import logging
+import time
+import uuid
+from typing import Optional
+
+from open_webui.internal.db import Base, get_db
+from open_webui.env import SRC_LOG_LEVELS
+from pydantic import BaseModel, ConfigDict
+from sqlalchemy import BigInteger, Column, Index, Integer, String, Text, JSON
+
+log = logging.getLogger(__name__)
+log.setLevel(SRC_LOG_LEVELS["MODELS"])
+
+####################
+# Ingestion Jobs DB Schema
+####################
+
+
+class IngestionJob(Base):
+    __tablename__ = "ingestion_job"
+
+    id = Column(Text, unique=True, primary_key=True)
+    file_id = Column(Text)
+    user_id = Column(Text)
+
+    # pending, running, completed, failed or cancelled; a running job that is
+    # being cancelled is cancelling until its worker stops it
+    status = Column(String)
+    stage = Column(Text, nullable=True)
+    error = Column(Text, nullable=True)
+    attempts = Column(Integer, default=0)
+
+    params = Column(JSON, nullable=True)
+
+    # Pending jobs are not picked up before this timestamp
+    run_at = Column(BigInteger)
+    created_at = Column(BigInteger)
+    updated_at = Column(BigInteger)
+
+    __table_args__ = (
+        Index("ingestion_job_file_id_idx", "file_id"),
+        Index("ingestion_job_status_run_at_idx", "status", "run_at"),
+    )
+
+
+class IngestionJobModel(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
+    id: str
+    file_id: str
+    user_id: str
+
+    status: str
+    stage: Optional[str] = None
+    error: Optional[str] = None
+    attempts: int = 0
+
+    params: Optional[dict] = None
+
+    run_at: int  # timestamp in epoch
+    created_at: int  # timestamp in epoch
+    updated_at: int  # timestamp in epoch
+
+
+####################
+# Forms
+####################
+
+
+class IngestionJobResponse(BaseModel):
+    id: str
+    file_id: str
+
+    status: str
+    stage: Optional[str] = None
+    error: Optional[str] = None
+    attempts: int = 0
+
+    created_at: int  # timestamp in epoch
+    updated_at: int  # timestamp in epoch
+
+
+class IngestionJobsTable:
+    def insert_new_job(
+        self, file_id: str, user_id: str, params: Optional[dict] = None
+    ) -> Optional[IngestionJobModel]:
+        with get_db() as db:
+            now = int(time.time())
+            job = IngestionJobModel(
+                **{
+                    "id": str(uuid.uuid4()),
+                    "file_id": file_id,
+                    "user_id": user_id,
+                    "status": "pending",
+                    "params": params or {},
+                    "run_at": now,
+                    "created_at": now,
+                    "updated_at": now,
+                }
+            )
+
+            try:
+                result = IngestionJob(**job.model_dump())
+                db.add(result)
+                db.commit()
+                db.refresh(result)
+                return IngestionJobModel.model_validate(result)
+            except Exception as e:
+                log.exception(f"Error inserting a new ingestion job: {e}")
+                return None
+
+    def get_job_by_id(self, id: str) -> Optional[IngestionJobModel]:
+        with get_db() as db:
+            job = db.query(IngestionJob).filter_by(id=id).first()
+            return IngestionJobModel.model_validate(job) if job else None
+
+    def get_latest_job_by_file_id(self, file_id: str) -> Optional[IngestionJobModel]:
+        with get_db() as db:
+            job = (
+                db.query(IngestionJob)
+                .filter_by(file_id=file_id)
+                .order_by(IngestionJob.created_at.desc())
+                .first()
+            )
+            return IngestionJobModel.model_validate(job) if job else None
+
+    def claim_next_job(self) -> Optional[IngestionJobModel]:
+        """
+        Mark the oldest due pending job as running and return it. The status
+        is only changed if it is still pending, so a job is claimed by a
+        single worker across nodes.
+        """
+        with get_db() as db:
+            now = int(time.time())
+            candidates = (
+                db.query(IngestionJob.id)
+                .filter(IngestionJob.status == "pending", IngestionJob.run_at <= now)
+                .order_by(IngestionJob.run_at, IngestionJob.created_at)
+                .limit(10)
+                .all()
+            )
+
+            for (id,) in candidates:
+                claimed = (
+                    db.query(IngestionJob)
+                    .filter_by(id=id, status="pending")
+                    .update(
+                        {
+                            "status": "running",
+                            "attempts": IngestionJob.attempts + 1,
+                            "updated_at": now,
+                        },
+                        synchronize_session=False,
+                    )
+                )
+                db.commit()
+
+                if claimed:
+                    job = db.query(IngestionJob).filter_by(id=id).first()
+                    return IngestionJobModel.model_validate(job)
+
+            return None
+
+    def update_job_by_id(self, id: str, updated: dict) -> Optional[IngestionJobModel]:
+        """Update a job unless it was cancelled in the meantime."""
+        with get_db() as db:
+            db.query(IngestionJob).filter(
+                IngestionJob.id == id, IngestionJob.status != "cancelled"
+            ).update(
+                {**updated, "updated_at": int(time.time())},
+                synchronize_session=False,
+            )
+            db.commit()
+
+            job = db.query(IngestionJob).filter_by(id=id).first()
+            return IngestionJobModel.model_validate(job) if job else None
+
+    def cancel_job_by_id(self, id: str) -> Optional[IngestionJobModel]:
+        """
+        Cancel a pending job, or ask the worker of a running job to stop it,
+        which it does at the next stage of the job.
+        """
+        with get_db() as db:
+            now = int(time.time())
+            for status, cancelled_status in [
+                ("pending", "cancelled"),
+                ("running", "cancelling"),
+            ]:
+                db.query(IngestionJob).filter_by(id=id, status=status).update(
+                    {"status": cancelled_status, "updated_at": now},
+                    synchronize_session=False,
+                )
+            db.commit()
+
+            job = db.query(IngestionJob).filter_by(id=id).first()
+            return IngestionJobModel.model_validate(job) if job else None
+
+    def requeue_stale_jobs(self, timeout: int, max_attempts: int) -> int:
+        """
+        Return running jobs that were not updated for `timeout` seconds (their
+        worker went away) to the queue, or fail them once they were attempted
+        `max_attempts` times. Stale cancelling jobs are cancelled.
+        """
+        with get_db() as db:
+            now = int(time.time())
+            stale = IngestionJob.updated_at < now - timeout
+
+            db.query(IngestionJob).filter(
+                IngestionJob.status == "cancelling", stale
+            ).update(
+                {"status": "cancelled", "updated_at": now},
+                synchronize_session=False,
+            )
+            db.query(IngestionJob).filter(
+                IngestionJob.status == "running",
+                IngestionJob.attempts >= max_attempts,
+                stale,
+            ).update(
+                {
+                    "status": "failed",
+                    "error": "The job was interrupted too many times",
+                    "updated_at": now,
+                },
+                synchronize_session=False,
+            )
+            count = (
+                db.query(IngestionJob)
+                .filter(IngestionJob.status == "running", stale)
+                .update(
+                    {"status": "pending", "updated_at": now},
+                    synchronize_session=False,
+                )
+            )
+            db.commit()
+            return count
+
+
+IngestionJobs = IngestionJobsTable()
@@ -8,7 +8,7 @@ from open_webui.models.tags import TagModel, Tag, Tags
 
 
 from pydantic import BaseModel, ConfigDict
-from sqlalchemy import BigInteger, Boolean, Column, String, Text, JSON
+from sqlalchemy import BigInteger, Boolean, Column, Index, String, Text, JSON
 from sqlalchemy import or_, func, select, and_, text
 from sqlalchemy.sql import exists
 
@@ -25,6 +25,8 @@ class MessageReaction(Base):
     name = Column(Text)
     created_at = Column(BigInteger)
 
+    __table_args__ = (Index("message_reaction_message_id_idx", "message_id"),)
+
 
 class MessageReactionModel(BaseModel):
     model_config = ConfigDict(from_attributes=True)
@@ -52,6 +54,16 @@ class Message(Base):
     created_at = Column(BigInteger)  # time_ns
     updated_at = Column(BigInteger)  # time_ns
 
+    __table_args__ = (
+        Index(
+            "message_channel_id_parent_id_created_at_idx",
+            "channel_id",
+            "parent_id",
+            "created_at",
+        ),
+        Index("message_parent_id_created_at_idx", "parent_id", "created_at"),
+    )
+
 
 class MessageModel(BaseModel):
     model_config = ConfigDict(from_attributes=True)
@@ -128,17 +140,56 @@ class MessageTable:
             if not message:
                 return None
 
-            reactions = self.get_reactions_by_message_id(id)
-            replies = self.get_replies_by_message_id(id)
+            return self.get_message_responses([MessageModel.model_validate(message)])[0]
+
+    def get_message_responses(
+        self, messages: list[MessageModel], replies: bool = True
+    ) -> list[MessageResponse]:
+        """
+        `messages` with their reactions and, with `replies`, their reply count
+        and latest reply time, read in two queries for the whole list.
+        """
+        ids = [message.id for message in messages]
+        reactions = self.get_reactions_by_message_ids(ids)
+        reply_stats = self.get_reply_stats_by_message_ids(ids) if replies else {}
+
+        responses = []
+        for message in messages:
+            reply_count, latest_reply_at = reply_stats.get(message.id, (0, None))
+            responses.append(
+                MessageResponse(
+                    **{
+                        **message.model_dump(),
+                        "latest_reply_at": latest_reply_at,
+                        "reply_count": reply_count,
+                        "reactions": reactions.get(message.id, []),
+                    }
+                )
+            )
+        return responses
 
-            return MessageResponse(
-                **{
-                    **MessageModel.model_validate(message).model_dump(),
-                    "latest_reply_at": replies[0].created_at if replies else None,
-                    "reply_count": len(replies),
-                    "reactions": reactions,
-                }
+    def get_reply_stats_by_message_ids(
+        self, ids: list[str]
+    ) -> dict[str, tuple[int, Optional[int]]]:
+        """The number of replies and the time of the latest one, per message."""
+        if not ids:
+            return {}
+
+        with get_db() as db:
+            rows = (
+                db.query(
+                    Message.parent_id,
+                    func.count(Message.id),
+                    func.max(Message.created_at),
+                )
+                .filter(Message.parent_id.in_(ids))
+                .group_by(Message.parent_id)
+                .all()
             )
+            return {
+                parent_id: (count, latest_reply_at)
+                for parent_id, count, latest_reply_at in rows
+            }
 
     def get_replies_by_message_id(self, id: str) -> list[MessageModel]:
         with get_db() as db:
@@ -157,14 +208,41 @@ class MessageTable:
                 for message in db.query(Message).filter_by(parent_id=id).all()
             ]
 
+    def _after_cursor(self, db, query, cursor: Optional[str]):
+        """
+        Messages that come after the message with id `cursor`, newest first.
+        ValueError is raised when there is no such message.
+        """
+        if cursor:
+            last = db.query(Message.created_at).filter_by(id=cursor).first()
+            if last is None:
+                raise ValueError(f"Unknown cursor: {cursor}")
+
+            query = query.filter(
+                or_(
+                    Message.created_at < last.created_at,
+                    and_(
+                        Message.created_at == last.created_at,
+                        Message.id < cursor,
+                    ),
+                )
+            )
+        return query.order_by(Message.created_at.desc(), Message.id.desc())
+
     def get_messages_by_channel_id(
-        self, channel_id: str, skip: int = 0, limit: int = 50
+        self,
+        channel_id: str,
+        skip: int = 0,
+        limit: int = 50,
+        cursor: Optional[str] = None,
     ) -> list[MessageModel]:
         with get_db() as db:
             all_messages = (
-                db.query(Message)
-                .filter_by(channel_id=channel_id, parent_id=None)
-                .order_by(Message.created_at.desc())
+                self._after_cursor(
+                    db,
+                    db.query(Message).filter_by(channel_id=channel_id, parent_id=None),
+                    cursor,
+                )
                 .offset(skip)
                 .limit(limit)
                 .all()
@@ -172,7 +250,12 @@ class MessageTable:
             return [MessageModel.model_validate(message) for message in all_messages]
 
     def get_messages_by_parent_id(
-        self, channel_id: str, parent_id: str, skip: int = 0, limit: int = 50
+        self,
+        channel_id: str,
+        parent_id: str,
+        skip: int = 0,
+        limit: int = 50,
+        cursor: Optional[str] = None,
     ) -> list[MessageModel]:
         with get_db() as db:
             message = db.get(Message, parent_id)
@@ -181,9 +264,13 @@ class MessageTable:
                 return []
 
             all_messages = (
-                db.query(Message)
-                .filter_by(channel_id=channel_id, parent_id=parent_id)
-                .order_by(Message.created_at.desc())
+                self._after_cursor(
+                    db,
+                    db.query(Message).filter_by(
+                        channel_id=channel_id, parent_id=parent_id
+                    ),
+                    cursor,
+                )
                 .offset(skip)
                 .limit(limit)
                 .all()
@@ -227,21 +314,44 @@ class MessageTable:
             return MessageReactionModel.model_validate(result) if result else None
 
     def get_reactions_by_message_id(self, id: str) -> list[Reactions]:
+        return self.get_reactions_by_message_ids([id]).get(id, [])
+
+    def get_reactions_by_message_ids(
+        self, ids: list[str]
+    ) -> dict[str, list[Reactions]]:
+        if not ids:
+            return {}
+
         with get_db() as db:
-            all_reactions = db.query(MessageReaction).filter_by(message_id=id).all()
+            all_reactions = (
+                db.query(
+                    MessageReaction.message_id,
+                    MessageReaction.name,
+                    MessageReaction.user_id,
+                )
+                .filter(MessageReaction.message_id.in_(ids))
+                .order_by(MessageReaction.created_at)
+                .all()
+            )
 
             reactions = {}
-            for reaction in all_reactions:
-                if reaction.name not in reactions:
-                    reactions[reaction.name] = {
-                        "name": reaction.name,
+            for message_id, name, user_id in all_reactions:
+                message_reactions = reactions.setdefault(message_id, {})
+                if name not in message_reactions:
+                    message_reactions[name] = {
+                        "name": name,
                         "user_ids": [],
                         "count": 0,
                     }
-                reactions[reaction.name]["user_ids"].append(reaction.user_id)
-                reactions[reaction.name]["count"] += 1
-
-            return [Reactions(**reaction) for reaction in reactions.values()]
+                message_reactions[name]["user_ids"].append(user_id)
+                message_reactions[name]["count"] += 1
+
+            return {
+                message_id: [
+                    Reactions(**reaction) for reaction in message_reactions.values()
+                ]
+                for message_id, message_reactions in reactions.items()
+            }
 
     def remove_reaction_by_id_and_user_id_and_name(
         self, id: str, user_id: str, name: str
@@ -1,3 +1,4 @@
+import hashlib
 import time
 from typing import Optional
 
@@ -6,6 +7,7 @@ from open_webui.internal.db import Base, JSONField, get_db
 
 from open_webui.models.chats import Chats
 from open_webui.models.groups import Groups
+from open_webui.utils.user_cache import USER_CACHE
 
 
 from pydantic import BaseModel, ConfigDict
@@ -101,6 +103,10 @@ class UserUpdateForm(BaseModel):
     password: Optional[str] = None
 
 
+def get_api_key_cache_key(api_key: str) -> str:
+    return f"api_key:{hashlib.sha256(api_key.encode()).hexdigest()}"
+
+
 class UsersTable:
     def insert_new_user(
         self,
@@ -142,6 +148,47 @@ class UsersTable:
         except Exception:
             return None
 
+    def get_cached_user_by_id(self, id: str) -> Optional[UserModel]:
+        """
+        Like get_user_by_id, served from USER_CACHE when possible. The API key
+        is never cached, so it is None on the returned user.
+        """
+        data = USER_CACHE.get(f"id:{id}")
+        if data is not None:
+            return UserModel(**data)
+
+        user = self.get_user_by_id(id)
+        if user is not None:
+            user.api_key = None
+            USER_CACHE.set(f"id:{id}", user.model_dump())
+        return user
+
+    def get_cached_user_by_api_key(self, api_key: str) -> Optional[UserModel]:
+        """
+        Like get_user_by_api_key, served from USER_CACHE when possible. Only
+        the hash of the key and the id of its user are cached, and the entry is
+        invalidated when the key is changed or its user is deleted.
+        """
+        key = get_api_key_cache_key(api_key)
+
+        entry = USER_CACHE.get(key)
+        if entry is not None:
+            user = self.get_cached_user_by_id(entry["id"])
+            if user is not None:
+                return user
+
+        user = self.get_user_by_api_key(api_key)
+        if user is not None:
+            user.api_key = None
+            USER_CACHE.set(key, {"id": user.id})
+            USER_CACHE.set(f"id:{user.id}", user.model_dump())
+        return user
+
+    def invalidate_cached_user(self, id: str, api_key: Optional[str] = None):
+        USER_CACHE.invalidate(f"id:{id}")
+        if api_key:
+            USER_CACHE.invalidate(get_api_key_cache_key(api_key))
+
     def get_user_by_api_key(self, api_key: str) -> Optional[UserModel]:
         try:
             with get_db() as db:
@@ -274,6 +321,7 @@ class UsersTable:
             with get_db() as db:
                 db.query(User).filter_by(id=id).update({"role": role})
                 db.commit()
+                USER_CACHE.invalidate(f"id:{id}")
                 user = db.query(User).filter_by(id=id).first()
                 return UserModel.model_validate(user)
         except Exception:
@@ -288,6 +336,7 @@ class UsersTable:
                     {"profile_image_url": profile_image_url}
                 )
                 db.commit()
+                USER_CACHE.invalidate(f"id:{id}")
 
                 user = db.query(User).filter_by(id=id).first()
                 return UserModel.model_validate(user)
@@ -307,6 +356,16 @@ class UsersTable:
         except Exception:
             return None
 
+    def update_users_last_active_by_ids(self, ids: list[str], last_active_at: int):
+        try:
+            with get_db() as db:
+                db.query(User).filter(User.id.in_(ids)).update(
+                    {"last_active_at": last_active_at}, synchronize_session=False
+                )
+                db.commit()
+        except Exception:
+            pass
+
     def update_user_oauth_sub_by_id(
         self, id: str, oauth_sub: str
     ) -> Optional[UserModel]:
@@ -314,6 +373,7 @@ class UsersTable:
             with get_db() as db:
                 db.query(User).filter_by(id=id).update({"oauth_sub": oauth_sub})
                 db.commit()
+                USER_CACHE.invalidate(f"id:{id}")
 
                 user = db.query(User).filter_by(id=id).first()
                 return UserModel.model_validate(user)
@@ -325,6 +385,7 @@ class UsersTable:
             with get_db() as db:
                 db.query(User).filter_by(id=id).update(updated)
                 db.commit()
+                USER_CACHE.invalidate(f"id:{id}")
 
                 user = db.query(User).filter_by(id=id).first()
                 return UserModel.model_validate(user)
@@ -344,6 +405,7 @@ class UsersTable:
 
                 db.query(User).filter_by(id=id).update({"settings": user_settings})
                 db.commit()
+                USER_CACHE.invalidate(f"id:{id}")
 
                 user = db.query(User).filter_by(id=id).first()
                 return UserModel.model_validate(user)
@@ -358,10 +420,12 @@ class UsersTable:
             # Delete User Chats
             result = Chats.delete_chats_by_user_id(id)
             if result:
+                api_key = self.get_user_api_key_by_id(id)
                 with get_db() as db:
                     # Delete User
                     db.query(User).filter_by(id=id).delete()
                     db.commit()
+                self.invalidate_cached_user(id, api_key)
 
                 return True
             else:
@@ -371,9 +435,11 @@ class UsersTable:
 
     def update_user_api_key_by_id(self, id: str, api_key: str) -> str:
         try:
+            old_api_key = self.get_user_api_key_by_id(id)
             with get_db() as db:
                 result = db.query(User).filter_by(id=id).update({"api_key": api_key})
                 db.commit()
+                self.invalidate_cached_user(id, old_api_key)
                 return True if result == 1 else False
         except Exception:
             return False
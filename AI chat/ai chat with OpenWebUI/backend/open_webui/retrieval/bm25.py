@@ -0,0 +1,370 @@
+import hashlib
+import json
+import logging
+import math
+import os
+import re
+import sqlite3
+import threading
+import time
+import uuid
+from collections import Counter
+from contextlib import closing
+from typing import Callable, Optional
+
+import numpy as np
+
+from open_webui.config import BM25_INDEX_DIR, BM25_INDEX_MAX_AGE
+from open_webui.env import SRC_LOG_LEVELS
+from open_webui.retrieval.vector.main import GetResult
+
+log = logging.getLogger(__name__)
+log.setLevel(SRC_LOG_LEVELS["RAG"])
+
+
+# Same defaults as rank_bm25
+K1 = 1.5
+B = 0.75
+
+MMAP_SIZE = 256 * 1024 * 1024
+
+# Keeps the number of bound parameters below the limit of older SQLite builds
+CHUNK_SIZE = 500
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS documents (
+    rowid INTEGER PRIMARY KEY,
+    id TEXT UNIQUE,
+    text TEXT,
+    metadata TEXT,
+    length INTEGER
+);
+CREATE TABLE IF NOT EXISTS postings (
+    term TEXT,
+    doc INTEGER,
+    tf INTEGER,
+    length INTEGER,
+    PRIMARY KEY (term, doc)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS stats (
+    documents INTEGER,
+    total_length INTEGER
+);
+INSERT INTO stats SELECT 0, 0 WHERE NOT EXISTS (SELECT 1 FROM stats);
+"""
+
+
+def tokenize(text: str) -> list[str]:
+    return re.findall(r"\w+", text.lower())
+
+
+class BM25Index:
+    """
+    BM25 index of a single collection, persisted in its own SQLite file.
+
+    Postings are clustered by term (and carry the document length), so a
+    query only reads the postings of its own terms, from a memory-mapped
+    file. Documents are added and removed incrementally.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.path, timeout=30)
+        conn.execute(f"PRAGMA mmap_size={MMAP_SIZE}")
+        return conn
+
+    def create(self):
+        with closing(self._connect()) as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(SCHEMA)
+
+    def _delete_rows(self, conn: sqlite3.Connection, rows: list[tuple[int, str]]):
+        total_length = 0
+        for rowid, text in rows:
+            tokens = tokenize(text or "")
+            total_length += len(tokens)
+            conn.executemany(
+                "DELETE FROM postings WHERE term = ? AND doc = ?",
+                [(term, rowid) for term in set(tokens)],
+            )
+
+        for i in range(0, len(rows), CHUNK_SIZE):
+            rowids = [rowid for rowid, _ in rows[i : i + CHUNK_SIZE]]
+            conn.execute(
+                f"DELETE FROM documents WHERE rowid IN ({','.join('?' * len(rowids))})",
+                rowids,
+            )
+
+        conn.execute(
+            "UPDATE stats SET documents = documents - ?, total_length = total_length - ?",
+            (len(rows), total_length),
+        )
+
+    def add(self, items: list[dict]):
+        """Add (or replace) items with an `id`, a `text` and a `metadata` dict."""
+        with closing(self._connect()) as conn, conn:
+            ids = [item["id"] for item in items]
+            for i in range(0, len(ids), CHUNK_SIZE):
+                chunk = ids[i : i + CHUNK_SIZE]
+                self._delete_rows(
+                    conn,
+                    conn.execute(
+                        f"SELECT rowid, text FROM documents WHERE id IN ({','.join('?' * len(chunk))})",
+                        chunk,
+                    ).fetchall(),
+                )
+
+            total_length = 0
+            for item in items:
+                terms = Counter(tokenize(item["text"] or ""))
+                length = sum(terms.values())
+                total_length += length
+
+                rowid = conn.execute(
+                    "INSERT INTO documents (id, text, metadata, length) VALUES (?, ?, ?, ?)",
+                    (
+                        item["id"],
+                        item["text"],
+                        json.dumps(item.get("metadata") or {}),
+                        length,
+                    ),
+                ).lastrowid
+                conn.executemany(
+                    "INSERT INTO postings (term, doc, tf, length) VALUES (?, ?, ?, ?)",
+                    [(term, rowid, tf, length) for term, tf in terms.items()],
+                )
+
+            conn.execute(
+                "UPDATE stats SET documents = documents + ?, total_length = total_length + ?",
+                (len(items), total_length),
+            )
+
+    def count(self) -> int:
+        with closing(self._connect()) as conn:
+            (documents,) = conn.execute("SELECT documents FROM stats").fetchone()
+            return documents
+
+    def delete(self, ids: Optional[list[str]] = None, filter: Optional[dict] = None):
+        conditions, params = [], []
+        if ids:
+            conditions.append(f"id IN ({','.join('?' * len(ids))})")
+            params.extend(ids)
+        for key, value in (filter or {}).items():
+            conditions.append("json_extract(metadata, ?) = ?")
+            params.extend([f'$."{key}"', value])
+
+        if not conditions:
+            return
+
+        with closing(self._connect()) as conn, conn:
+            self._delete_rows(
+                conn,
+                conn.execute(
+                    f"SELECT rowid, text FROM documents WHERE {' AND '.join(conditions)}",
+                    params,
+                ).fetchall(),
+            )
+
+    def search(self, query: str, k: int) -> list[tuple[float, str, str, dict]]:
+        """Return the `k` best (score, id, text, metadata) matches for `query`."""
+        terms = set(tokenize(query))
+
+        with closing(self._connect()) as conn:
+            documents, total_length = conn.execute(
+                "SELECT documents, total_length FROM stats"
+            ).fetchone()
+            if not terms or not documents:
+                return []
+
+            avgdl = total_length / documents
+
+            docs, scores = [], []
+            for term in terms:
+                postings = np.array(
+                    conn.execute(
+                        "SELECT doc, tf, length FROM postings WHERE term = ?", (term,)
+                    ).fetchall(),
+                    dtype=np.float64,
+                )
+                if len(postings) == 0:
+                    continue
+
+                idf = math.log(
+                    1 + (documents - len(postings) + 0.5) / (len(postings) + 0.5)
+                )
+                tf, length = postings[:, 1], postings[:, 2]
+
+                docs.append(postings[:, 0].astype(np.int64))
+                scores.append(
+                    idf * tf * (K1 + 1) / (tf + K1 * (1 - B + B * length / avgdl))
+                )
+
+            if not docs:
+                return []
+
+            docs, inverse = np.unique(np.concatenate(docs), return_inverse=True)
+            scores = np.bincount(inverse, weights=np.concatenate(scores))
+
+            top = np.argsort(-scores)[:k]
+            rowids = [int(rowid) for rowid in docs[top]]
+
+            rows = {
+                rowid: (id, text, metadata)
+                for rowid, id, text, metadata in conn.execute(
+                    f"SELECT rowid, id, text, metadata FROM documents WHERE rowid IN ({','.join('?' * len(rowids))})",
+                    rowids,
+                )
+            }
+
+        return [
+            (
+                float(scores[idx]),
+                rows[rowid][0],
+                rows[rowid][1],
+                json.loads(rows[rowid][2]),
+            )
+            for idx, rowid in zip(top, rowids)
+            if rowid in rows
+        ]
+
+
+class BM25IndexStore:
+    """
+    Directory of per-collection BM25 indexes.
+
+    Indexes are created along with new collections; collections that predate
+    the index get theirs built from the vector DB on first use.
+
+    Writes made through other replicas sharing the vector DB do not reach the
+    local index, so it is only used while it holds as many documents as its
+    collection and is rebuilt otherwise. When the vector DB cannot count, it
+    is rebuilt once it was last built (by this process) `max_age` seconds ago.
+    """
+
+    def __init__(self, directory: str, max_age: int):
+        self.directory = directory
+        self.max_age = max_age
+        self._lock = threading.Lock()
+        self._built_at: dict[str, float] = {}
+
+    def _get_path(self, collection_name: str) -> str:
+        if re.fullmatch(r"[\w-]+", collection_name):
+            name = collection_name
+        else:
+            name = hashlib.sha256(collection_name.encode()).hexdigest()
+        return os.path.join(self.directory, f"{name}.db")
+
+    def get(self, collection_name: str) -> Optional[BM25Index]:
+        path = self._get_path(collection_name)
+        return BM25Index(path) if os.path.exists(path) else None
+
+    def _is_fresh(self, collection_name: str, index: BM25Index, count: Optional[int]):
+        try:
+            if count is not None:
+                return index.count() == count
+        except Exception as e:
+            log.warning(f"Failed to read BM25 index of {collection_name}: {e}")
+            return False
+
+        built_at = self._built_at.get(collection_name)
+        return built_at is not None and time.time() - built_at < self.max_age
+
+    def get_or_build(
+        self,
+        collection_name: str,
+        load: Callable[[], Optional[GetResult]],
+        count: Callable[[], Optional[int]] = lambda: None,
+    ) -> Optional[BM25Index]:
+        """
+        Return the index of a collection, (re)building it with `load` when it
+        is missing or out of date with the `count` of items of the collection.
+        """
+        expected = count()
+
+        index = self.get(collection_name)
+        if index is not None and self._is_fresh(collection_name, index, expected):
+            return index
+
+        with self._lock:
+            index = self.get(collection_name)
+            if index is not None and self._is_fresh(collection_name, index, expected):
+                return index
+
+            result = load()
+            if result is None:
+                return None
+
+            log.info(f"Building BM25 index for collection {collection_name}")
+
+            # Built under a temporary name so no reader sees a partial index
+            path = self._get_path(collection_name)
+            os.makedirs(self.directory, exist_ok=True)
+            index = BM25Index(f"{path}.{uuid.uuid4().hex}.tmp")
+            try:
+                index.create()
+                index.add(
+                    [
+                        {"id": id, "text": text, "metadata": metadata}
+                        for id, text, metadata in zip(
+                            result.ids[0], result.documents[0], result.metadatas[0]
+                        )
+                    ]
+                )
+                # A stale index is replaced along with its journal
+                self._remove_files(f"{path}-wal")
+                self._remove_files(f"{path}-shm")
+                os.replace(index.path, path)
+                self._built_at[collection_name] = time.time()
+            finally:
+                self._remove_files(index.path)
+
+            return BM25Index(path)
+
+    def add(self, collection_name: str, items: list[dict], create: bool = False):
+        """
+        Add items to the index of a collection. Pass `create` for a new
+        collection; existing collections without an index are left to be
+        built in full on first use.
+        """
+        index = self.get(collection_name)
+        if index is None:
+            if not create:
+                return
+
+            os.makedirs(self.directory, exist_ok=True)
+            index = BM25Index(self._get_path(collection_name))
+            index.create()
+            self._built_at[collection_name] = time.time()
+
+        index.add(items)
+
+    def delete(
+        self,
+        collection_name: str,
+        ids: Optional[list[str]] = None,
+        filter: Optional[dict] = None,
+    ):
+        index = self.get(collection_name)
+        if index is not None:
+            index.delete(ids=ids, filter=filter)
+
+    def _remove_files(self, path: str):
+        for file_path in [path, f"{path}-wal", f"{path}-shm"]:
+            if os.path.exists(file_path):
+                os.remove(file_path)
+
+    def delete_collection(self, collection_name: str):
+        self._built_at.pop(collection_name, None)
+        self._remove_files(self._get_path(collection_name))
+
+    def reset(self):
+        if not os.path.isdir(self.directory):
+            return
+
+        for file_name in os.listdir(self.directory):
+            os.remove(os.path.join(self.directory, file_name))
+
+
+BM25_INDEX = BM25IndexStore(BM25_INDEX_DIR, BM25_INDEX_MAX_AGE)
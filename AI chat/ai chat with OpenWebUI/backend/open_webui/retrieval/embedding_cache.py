@@ -0,0 +1,171 @@
+import hashlib
+import json
+import logging
+import threading
+from collections import OrderedDict
+from typing import Callable, Optional
+
+from open_webui.env import (
+    ENABLE_RAG_EMBEDDING_CACHE_REDIS,
+    RAG_EMBEDDING_CACHE_REDIS_TTL,
+    RAG_EMBEDDING_CACHE_SIZE,
+    REDIS_SENTINEL_HOSTS,
+    REDIS_SENTINEL_PORT,
+    REDIS_URL,
+    SRC_LOG_LEVELS,
+)
+from open_webui.utils.redis import get_redis_connection, get_sentinels_from_env
+
+log = logging.getLogger(__name__)
+log.setLevel(SRC_LOG_LEVELS["RAG"])
+
+
+REDIS_KEY_PREFIX = "open-webui:embedding:"
+
+
+class EmbeddingCache:
+    """
+    Content-addressed embedding cache.
+
+    Entries are keyed by a hash of (engine, model, endpoint, prefix, text),
+    where the endpoint is the API base URL (plus the api_version for Azure),
+    and kept in an in-process LRU of `max_size` entries, backed by Redis (when
+    given) so that workers share what any of them computed.
+    """
+
+    def __init__(self, max_size: int, redis=None, redis_ttl: int = 86400):
+        self.max_size = max_size
+        self.redis = redis
+        self.redis_ttl = redis_ttl
+
+        self.entries: OrderedDict[str, list[float]] = OrderedDict()
+        self.lock = threading.Lock()
+        self.stats = {"hits": 0, "redis_hits": 0, "misses": 0, "evictions": 0}
+
+    def get_key(
+        self,
+        engine: str,
+        model: str,
+        endpoint: Optional[str],
+        prefix: Optional[str],
+        text: str,
+    ):
+        return hashlib.sha256(
+            json.dumps([engine, model, endpoint, prefix, text]).encode()
+        ).hexdigest()
+
+    def _set_local(self, key: str, embedding: list[float]):
+        self.entries[key] = embedding
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.max_size:
+            self.entries.popitem(last=False)
+            self.stats["evictions"] += 1
+
+    def get_many(self, keys: list[str]) -> list[Optional[list[float]]]:
+        with self.lock:
+            embeddings = [self.entries.get(key) for key in keys]
+            for key, embedding in zip(keys, embeddings):
+                if embedding is not None:
+                    self.entries.move_to_end(key)
+            self.stats["hits"] += sum(e is not None for e in embeddings)
+
+        missing = [idx for idx, value in enumerate(embeddings) if value is None]
+        if missing and self.redis is not None:
+            try:
+                values = self.redis.mget(
+                    [f"{REDIS_KEY_PREFIX}{keys[idx]}" for idx in missing]
+                )
+            except Exception as e:
+                log.warning(f"Failed to read embeddings from Redis: {e}")
+                values = [None] * len(missing)
+
+            with self.lock:
+                for idx, value in zip(missing, values):
+                    if value is not None:
+                        embeddings[idx] = json.loads(value)
+                        self._set_local(keys[idx], embeddings[idx])
+                        self.stats["redis_hits"] += 1
+
+        with self.lock:
+            self.stats["misses"] += sum(e is None for e in embeddings)
+        return embeddings
+
+    def set_many(self, embeddings: dict[str, list[float]]):
+        with self.lock:
+            for key, embedding in embeddings.items():
+                self._set_local(key, embedding)
+
+        if self.redis is not None and embeddings:
+            try:
+                pipe = self.redis.pipeline(transaction=False)
+                for key, embedding in embeddings.items():
+                    pipe.set(
+                        f"{REDIS_KEY_PREFIX}{key}",
+                        json.dumps(embedding),
+                        ex=self.redis_ttl or None,
+                    )
+                pipe.execute()
+            except Exception as e:
+                log.warning(f"Failed to write embeddings to Redis: {e}")
+
+    def wrap(
+        self,
+        engine: str,
+        model: str,
+        func: Callable,
+        endpoint: Optional[str] = None,
+    ) -> Callable:
+        """
+        Wrap an embedding function (`func(query, prefix=None, user=None)`,
+        where `query` is a text or a list of texts) so that only the texts
+        missing from the cache are sent to it.
+        """
+        if self.max_size <= 0:
+            return func
+
+        def cached_func(query, prefix=None, user=None):
+            texts = query if isinstance(query, list) else [query]
+            keys = [
+                self.get_key(engine, model, endpoint, prefix, text) for text in texts
+            ]
+
+            embeddings = self.get_many(keys)
+            missing = [idx for idx, value in enumerate(embeddings) if value is None]
+            if missing:
+                computed = func(
+                    [texts[idx] for idx in missing], prefix=prefix, user=user
+                )
+                for idx, embedding in zip(missing, computed):
+                    embeddings[idx] = embedding
+                self.set_many({keys[idx]: embeddings[idx] for idx in missing})
+
+            return embeddings if isinstance(query, list) else embeddings[0]
+
+        return cached_func
+
+    def get_stats(self) -> dict:
+        with self.lock:
+            return {
+                **self.stats,
+                "size": len(self.entries),
+                "max_size": self.max_size,
+                "redis": self.redis is not None,
+            }
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+
+
+EMBEDDING_CACHE = EmbeddingCache(
+    RAG_EMBEDDING_CACHE_SIZE,
+    redis=(
+        get_redis_connection(
+            REDIS_URL,
+            get_sentinels_from_env(REDIS_SENTINEL_HOSTS, REDIS_SENTINEL_PORT),
+        )
+        if ENABLE_RAG_EMBEDDING_CACHE_REDIS and REDIS_URL
+        else None
+    ),
+    redis_ttl=RAG_EMBEDDING_CACHE_REDIS_TTL,
+)
@@ -1,25 +1,25 @@
 import logging
 import os
-from typing import Optional, Union
+from typing import Iterator, Optional, Union
 
+import numpy as np
 import requests
 import hashlib
-from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
 import time
 
 from huggingface_hub import snapshot_download
 from langchain.retrievers import ContextualCompressionRetriever, EnsembleRetriever
-from langchain_community.retrievers import BM25Retriever
 from langchain_core.documents import Document
 
 from open_webui.config import VECTOR_DB
 from open_webui.retrieval.vector.factory import VECTOR_DB_CLIENT
+from open_webui.retrieval.bm25 import BM25_INDEX, BM25Index
+from open_webui.retrieval.embedding_cache import EMBEDDING_CACHE
 
 from open_webui.models.users import UserModel
 from open_webui.models.files import Files
 
-from open_webui.retrieval.vector.main import GetResult
-
 
 from open_webui.env import (
     SRC_LOG_LEVELS,
@@ -27,6 +27,8 @@ from open_webui.env import (
     ENABLE_FORWARD_USER_INFO_HEADERS,
 )
 from open_webui.config import (
+    RAG_EMBEDDING_CONCURRENCY,
+    RAG_EMBEDDING_MAX_RETRIES,
     RAG_EMBEDDING_QUERY_PREFIX,
     RAG_EMBEDDING_CONTENT_PREFIX,
     RAG_EMBEDDING_PREFIX_FIELD_NAME,
@@ -67,6 +69,7 @@ class VectorSearchRetriever(BaseRetriever):
         for idx in range(len(ids)):
             results.append(
                 Document(
+                    id=ids[idx],
                     metadata=metadatas[idx],
                     page_content=documents[idx],
                 )
@@ -74,6 +77,32 @@ class VectorSearchRetriever(BaseRetriever):
         return results
 
 
+class BM25SearchRetriever(BaseRetriever):
+    index: Any
+    top_k: int
+
+    def _get_relevant_documents(
+        self,
+        query: str,
+        *,
+        run_manager: CallbackManagerForRetrieverRun,
+    ) -> list[Document]:
+        return [
+            Document(id=id, metadata=metadata, page_content=text)
+            for _, id, text, metadata in self.index.search(query, self.top_k)
+        ]
+
+
+def get_bm25_index(collection_name: str) -> Optional[BM25Index]:
+    # The index is maintained on insert and delete, and built from the vector
+    # DB when it is missing or no longer matches it (written by another node)
+    return BM25_INDEX.get_or_build(
+        collection_name,
+        lambda: VECTOR_DB_CLIENT.get(collection_name=collection_name),
+        lambda: VECTOR_DB_CLIENT.count(collection_name),
+    )
+
+
 def query_doc(
     collection_name: str, query_embedding: list[float], k: int, user: UserModel = None
 ):
@@ -110,7 +139,6 @@ def get_doc(collection_name: str, user: UserModel = None):
 
 def query_doc_with_hybrid_search(
     collection_name: str,
-    collection_result: GetResult,
     query: str,
     embedding_function,
     k: int,
@@ -121,11 +149,11 @@ def query_doc_with_hybrid_search(
 ) -> dict:
     try:
         log.debug(f"query_doc_with_hybrid_search:doc {collection_name}")
-        bm25_retriever = BM25Retriever.from_texts(
-            texts=collection_result.documents[0],
-            metadatas=collection_result.metadatas[0],
-        )
-        bm25_retriever.k = k
+        bm25_index = get_bm25_index(collection_name)
+        if bm25_index is None:
+            raise ValueError(f"Collection {collection_name} not found")
+
+        bm25_retriever = BM25SearchRetriever(index=bm25_index, top_k=k)
 
         vector_search_retriever = VectorSearchRetriever(
             collection_name=collection_name,
@@ -148,6 +176,7 @@ def query_doc_with_hybrid_search(
             )
 
         compressor = RerankCompressor(
+            collection_name=collection_name,
             embedding_function=embedding_function,
             top_n=k_reranker,
             reranking_function=reranking_function,
@@ -330,20 +359,18 @@ def query_collection_with_hybrid_search(
 ) -> dict:
     results = []
     error = False
-    # Fetch collection data once per collection sequentially
-    # Avoid fetching the same data multiple times later
-    collection_results = {}
+    # Make sure every collection has its BM25 index, sequentially, so that
+    # missing indexes are built once rather than by every query
+    bm25_indexes = {}
     for collection_name in collection_names:
         try:
             log.debug(
-                f"query_collection_with_hybrid_search:VECTOR_DB_CLIENT.get:collection {collection_name}"
-            )
-            collection_results[collection_name] = VECTOR_DB_CLIENT.get(
-                collection_name=collection_name
+                f"query_collection_with_hybrid_search:get_bm25_index:collection {collection_name}"
             )
+            bm25_indexes[collection_name] = get_bm25_index(collection_name)
         except Exception as e:
             log.exception(f"Failed to fetch collection {collection_name}: {e}")
-            collection_results[collection_name] = None
+            bm25_indexes[collection_name] = None
 
     log.info(
         f"Starting hybrid search for {len(queries)} queries in {len(collection_names)} collections..."
@@ -353,7 +380,6 @@ def query_collection_with_hybrid_search(
         try:
             result = query_doc_with_hybrid_search(
                 collection_name=collection_name,
-                collection_result=collection_results[collection_name],
                 query=query,
                 embedding_function=embedding_function,
                 k=k,
@@ -372,7 +398,7 @@ def query_collection_with_hybrid_search(
     tasks = [
         (cn, q)
         for cn in collection_names
-        if collection_results[cn] is not None
+        if bm25_indexes[cn] is not None
         for q in queries
     ]
 
@@ -402,11 +428,14 @@ def get_embedding_function(
     key,
     embedding_batch_size,
     azure_api_version=None,
+    enable_cache=True,
 ):
     if embedding_engine == "":
-        return lambda query, prefix=None, user=None: embedding_function.encode(
-            query, **({"prompt": prefix} if prefix else {})
-        ).tolist()
+        embedding_func = lambda query, prefix=None, user=None: (
+            embedding_function.encode(
+                query, **({"prompt": prefix} if prefix else {})
+            ).tolist()
+        )
     elif embedding_engine in ["ollama", "openai", "azure_openai"]:
         func = lambda query, prefix=None, user=None: generate_embeddings(
             engine=embedding_engine,
@@ -434,12 +463,89 @@ def get_embedding_function(
             else:
                 return func(query, prefix, user)
 
-        return lambda query, prefix=None, user=None: generate_multiple(
+        embedding_func = lambda query, prefix=None, user=None: generate_multiple(
             query, prefix, user, func
         )
     else:
         raise ValueError(f"Unknown embedding engine: {embedding_engine}")
 
+    if enable_cache:
+        endpoint = None
+        if embedding_engine:
+            endpoint = url.rstrip("/") if url else url
+            if embedding_engine == "azure_openai":
+                endpoint = f"{endpoint}?api-version={azure_api_version}"
+        return EMBEDDING_CACHE.wrap(
+            embedding_engine or "sentence_transformers",
+            embedding_model,
+            embedding_func,
+            endpoint=endpoint,
+        )
+    return embedding_func
+
+
+def generate_embeddings_in_batches(
+    embedding_function,
+    texts: list[str],
+    batch_size: int,
+    prefix: Optional[str] = None,
+    user=None,
+    max_in_flight: int = RAG_EMBEDDING_CONCURRENCY,
+    max_retries: int = RAG_EMBEDDING_MAX_RETRIES,
+) -> Iterator[tuple[int, list[list[float]]]]:
+    """
+    Embed `texts` in batches of `batch_size`, with up to `max_in_flight`
+    batches being embedded at once.
+
+    Yields `(offset, embeddings)` as soon as each batch completes, so batches
+    may come out of order. A failing batch is retried with exponential
+    backoff before the error is raised.
+    """
+    batch_size = max(batch_size, 1)
+
+    def embed_batch(batch: list[str]) -> list[list[float]]:
+        for attempt in range(max_retries + 1):
+            try:
+                embeddings = embedding_function(batch, prefix=prefix, user=user)
+                if embeddings is None or len(embeddings) != len(batch):
+                    raise ValueError(
+                        "The embedding engine returned an incomplete batch"
+                    )
+                return embeddings
+            except Exception as e:
+                if attempt >= max_retries:
+                    raise
+
+                delay = min(2**attempt, 30)
+                log.warning(f"Embedding batch failed ({e}), retrying in {delay}s")
+                time.sleep(delay)
+
+    batches = (
+        (offset, texts[offset : offset + batch_size])
+        for offset in range(0, len(texts), batch_size)
+    )
+
+    with ThreadPoolExecutor(max_workers=max(max_in_flight, 1)) as executor:
+        pending = {}
+
+        def submit_next():
+            batch = next(batches, None)
+            if batch is not None:
+                offset, batch_texts = batch
+                pending[executor.submit(embed_batch, batch_texts)] = offset
+
+        for _ in range(max(max_in_flight, 1)):
+            submit_next()
+
+        while pending:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                offset = pending.pop(future)
+                embeddings = future.result()
+                # Keep the window full while the caller handles this batch
+                submit_next()
+                yield offset, embeddings
+
 
 def get_sources_from_files(
     request,
@@ -855,7 +961,18 @@ from langchain_core.callbacks import Callbacks
 from langchain_core.documents import BaseDocumentCompressor, Document
 
 
+def cosine_similarities(query_embedding, document_embeddings) -> list[float]:
+    query = np.asarray(query_embedding, dtype=np.float32)
+    documents = np.asarray(document_embeddings, dtype=np.float32)
+    if documents.size == 0:
+        return []
+
+    norms = np.linalg.norm(documents, axis=1) * np.linalg.norm(query)
+    return (documents @ query / np.maximum(norms, 1e-12)).tolist()
+
+
 class RerankCompressor(BaseDocumentCompressor):
+    collection_name: Optional[str] = None
     embedding_function: Any
     top_n: int
     reranking_function: Any
@@ -878,13 +995,11 @@ class RerankCompressor(BaseDocumentCompressor):
                 [(query, doc.page_content) for doc in documents]
             )
         else:
-            from sentence_transformers import util
-
             query_embedding = self.embedding_function(query, RAG_EMBEDDING_QUERY_PREFIX)
-            document_embedding = self.embedding_function(
-                [doc.page_content for doc in documents], RAG_EMBEDDING_CONTENT_PREFIX
+            scores = cosine_similarities(
+                query_embedding,
+                self._get_document_embeddings(documents, len(query_embedding)),
             )
-            scores = util.cos_sim(query_embedding, document_embedding)[0]
 
         docs_with_scores = list(
             zip(documents, scores.tolist() if not isinstance(scores, list) else scores)
@@ -905,3 +1020,45 @@ class RerankCompressor(BaseDocumentCompressor):
             )
             final_results.append(doc)
         return final_results
+
+    def _get_document_embeddings(
+        self, documents: Sequence[Document], dimension: int
+    ) -> list[list[float]]:
+        # The candidates come from the collection, so their vectors are already
+        # stored; only the ones the vector DB can't return are embedded again.
+        ids = [doc.id for doc in documents if doc.id]
+        vectors = {}
+        if self.collection_name and ids:
+            vectors = (
+                VECTOR_DB_CLIENT.get_vectors(
+                    collection_name=self.collection_name, ids=ids
+                )
+                or {}
+            )
+
+        embeddings = []
+        for doc in documents:
+            vector = vectors.get(doc.id) if doc.id else None
+            # Some backends store vectors zero-padded to a fixed length
+            if vector is not None and len(vector) > dimension:
+                if any(vector[dimension:]):
+                    vector = None
+                else:
+                    vector = vector[:dimension]
+            embeddings.append(vector if vector and len(vector) == dimension else None)
+
+        missing = [idx for idx, embedding in enumerate(embeddings) if embedding is None]
+        if missing:
+            log.debug(
+                f"RerankCompressor: embedding {len(missing)}/{len(documents)} candidates"
+            )
+            for idx, embedding in zip(
+                missing,
+                self.embedding_function(
+                    [documents[idx].page_content for idx in missing],
+                    RAG_EMBEDDING_CONTENT_PREFIX,
+                ),
+            ):
+                embeddings[idx] = embedding
+
+        return embeddings
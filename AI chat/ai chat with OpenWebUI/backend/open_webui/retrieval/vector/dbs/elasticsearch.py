@@ -229,6 +229,39 @@ class ElasticsearchClient(VectorDBBase):
 
         return self._scan_result_to_get_result(results)
 
+    def count(self, collection_name: str) -> Optional[int]:
+        query_body = {
+            "query": {"bool": {"filter": [{"term": {"collection": collection_name}}]}}
+        }
+        try:
+            result = self.client.count(index=f"{self.index_prefix}*", body=query_body)
+            return result.body["count"]
+        except Exception:
+            return None
+
+    def get_vectors(
+        self, collection_name: str, ids: list[str]
+    ) -> Optional[dict[str, list[float]]]:
+        query = {
+            "query": {
+                "bool": {
+                    "filter": [
+                        {"term": {"collection": collection_name}},
+                        {"ids": {"values": ids}},
+                    ]
+                }
+            },
+            "_source": ["vector"],
+        }
+        try:
+            result = self.client.search(
+                index=f"{self.index_prefix}*", body=query, size=len(ids)
+            )
+        except Exception:
+            return None
+
+        return {hit["_id"]: hit["_source"]["vector"] for hit in result["hits"]["hits"]}
+
     # Status: works
     def insert(self, collection_name: str, items: list[VectorItem]):
         if not self._has_index(dimension=len(items[0]["vector"])):
@@ -281,6 +281,41 @@ class MilvusClient(VectorDBBase):
         # This will use the paginated query logic.
         return self.query(collection_name=collection_name, filter={}, limit=None)
 
+    def count(self, collection_name: str) -> Optional[int]:
+        collection_name = collection_name.replace("-", "_")
+        try:
+            result = self.client.query(
+                collection_name=f"{self.collection_prefix}_{collection_name}",
+                filter="",
+                output_fields=["count(*)"],
+            )
+            return result[0]["count(*)"]
+        except Exception as e:
+            log.debug(f"Failed to count items of {collection_name}: {e}")
+            return None
+
+    def get_vectors(
+        self, collection_name: str, ids: list[str]
+    ) -> Optional[dict[str, list[float]]]:
+        if not self.has_collection(collection_name):
+            return None
+        collection_name = collection_name.replace("-", "_")
+        try:
+            results = self.client.get(
+                collection_name=f"{self.collection_prefix}_{collection_name}",
+                ids=ids,
+                output_fields=["id", "vector"],
+            )
+            return {
+                item["id"]: [float(value) for value in item["vector"]]
+                for item in results
+            }
+        except Exception as e:
+            log.exception(
+                f"Error getting vectors from {self.collection_prefix}_{collection_name}: {e}"
+            )
+            return None
+
     def insert(self, collection_name: str, items: list[VectorItem]):
         # Insert the items into the collection, if the collection does not exist, it will be created.
         collection_name = collection_name.replace("-", "_")
@@ -186,6 +186,32 @@ class OpenSearchClient(VectorDBBase):
         )
         return self._result_to_get_result(result)
 
+    def count(self, collection_name: str) -> Optional[int]:
+        try:
+            return self.client.count(index=self._get_index_name(collection_name))[
+                "count"
+            ]
+        except Exception:
+            return None
+
+    def get_vectors(
+        self, collection_name: str, ids: list[str]
+    ) -> Optional[dict[str, list[float]]]:
+        try:
+            result = self.client.mget(
+                index=self._get_index_name(collection_name),
+                body={"ids": ids},
+                _source=["vector"],
+            )
+        except Exception:
+            return None
+
+        return {
+            doc["_id"]: doc["_source"]["vector"]
+            for doc in result["docs"]
+            if doc.get("found")
+        }
+
     def insert(self, collection_name: str, items: list[VectorItem]):
         self._create_index_if_not_exists(
             collection_name=collection_name, dimension=len(items[0]["vector"])
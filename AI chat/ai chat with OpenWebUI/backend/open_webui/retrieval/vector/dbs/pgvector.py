@@ -5,7 +5,10 @@ from sqlalchemy import (
     column,
     create_engine,
     Column,
+    func,
+    insert,
     Integer,
+    literal,
     MetaData,
     select,
     text,
@@ -351,6 +354,83 @@ class PgvectorClient(VectorDBBase):
             log.exception(f"Error during get: {e}")
             return None
 
+    def count(self, collection_name: str) -> Optional[int]:
+        try:
+            return (
+                self.session.query(func.count(DocumentChunk.id))
+                .filter(DocumentChunk.collection_name == collection_name)
+                .scalar()
+            )
+        except Exception as e:
+            log.exception(f"Error during count: {e}")
+            self.session.rollback()
+            return None
+
+    def get_vectors(
+        self, collection_name: str, ids: List[str]
+    ) -> Optional[Dict[str, List[float]]]:
+        try:
+            results = (
+                self.session.query(DocumentChunk.id, DocumentChunk.vector)
+                .filter(
+                    DocumentChunk.collection_name == collection_name,
+                    DocumentChunk.id.in_(ids),
+                )
+                .all()
+            )
+            # Vectors are stored zero-padded to VECTOR_LENGTH
+            return {id: [float(value) for value in vector] for id, vector in results}
+        except Exception as e:
+            log.exception(f"Error during get_vectors: {e}")
+            self.session.rollback()
+            return None
+
+    def copy(
+        self,
+        source_collection_name: str,
+        target_collection_name: str,
+        filter: Optional[Dict[str, Any]] = None,
+    ) -> Optional[GetResult]:
+        # Copied inside the database, the vectors never leave the server
+        try:
+            query = select(
+                cast(func.gen_random_uuid(), Text),
+                DocumentChunk.vector,
+                literal(target_collection_name, Text),
+                DocumentChunk.text,
+                DocumentChunk.vmetadata,
+            ).where(DocumentChunk.collection_name == source_collection_name)
+
+            for key, value in (filter or {}).items():
+                query = query.where(DocumentChunk.vmetadata[key].astext == str(value))
+
+            results = self.session.execute(
+                insert(DocumentChunk)
+                .from_select(
+                    ["id", "vector", "collection_name", "text", "vmetadata"], query
+                )
+                .returning(
+                    DocumentChunk.id, DocumentChunk.text, DocumentChunk.vmetadata
+                )
+            ).all()
+            self.session.commit()
+
+            if not results:
+                return None
+
+            log.info(
+                f"Copied {len(results)} items from '{source_collection_name}' to '{target_collection_name}'."
+            )
+            return GetResult(
+                ids=[[result.id for result in results]],
+                documents=[[result.text for result in results]],
+                metadatas=[[result.vmetadata for result in results]],
+            )
+        except Exception as e:
+            self.session.rollback()
+            log.exception(f"Error during copy: {e}")
+            return None
+
     def delete(
         self,
         collection_name: str,
@@ -412,6 +412,26 @@ class PineconeClient(VectorDBBase):
             log.error(f"Error querying collection '{collection_name}': {e}")
             return None
 
+    def get_vectors(
+        self, collection_name: str, ids: List[str]
+    ) -> Optional[Dict[str, List[float]]]:
+        """Fetch the stored vectors of the given IDs."""
+        collection_name_with_prefix = self._get_collection_name_with_prefix(
+            collection_name
+        )
+
+        try:
+            response = self.index.fetch(ids=ids)
+            return {
+                id: list(vector.values)
+                for id, vector in response.vectors.items()
+                if (vector.metadata or {}).get("collection_name")
+                == collection_name_with_prefix
+            }
+        except Exception as e:
+            log.error(f"Error fetching vectors from '{collection_name}': {e}")
+            return None
+
     def get(self, collection_name: str) -> Optional[GetResult]:
         """Get all vectors in a collection."""
         collection_name_with_prefix = self._get_collection_name_with_prefix(
@@ -169,6 +169,31 @@ class QdrantClient(VectorDBBase):
         )
         return self._result_to_get_result(points.points)
 
+    def count(self, collection_name: str) -> Optional[int]:
+        try:
+            return self.client.count(
+                collection_name=f"{self.collection_prefix}_{collection_name}",
+                exact=True,
+            ).count
+        except Exception as e:
+            log.debug(f"Failed to count items of {collection_name}: {e}")
+            return None
+
+    def get_vectors(
+        self, collection_name: str, ids: list[str]
+    ) -> Optional[dict[str, list[float]]]:
+        try:
+            points = self.client.retrieve(
+                collection_name=f"{self.collection_prefix}_{collection_name}",
+                ids=ids,
+                with_payload=False,
+                with_vectors=True,
+            )
+            return {str(point.id): point.vector for point in points}
+        except Exception as e:
+            log.exception(f"Error getting vectors from '{collection_name}': {e}")
+            return None
+
     def insert(self, collection_name: str, items: list[VectorItem]):
         # Insert the items into the collection, if the collection does not exist, it will be created.
         self._create_collection_if_not_exists(collection_name, len(items[0]["vector"]))
@@ -539,6 +539,33 @@ class QdrantClient(VectorDBBase):
             log.exception(f"Error getting collection '{collection_name}': {e}")
             return None
 
+    def get_vectors(
+        self, collection_name: str, ids: list[str]
+    ) -> Optional[dict[str, list[float]]]:
+        """
+        Get the stored vectors of the given IDs with tenant isolation.
+        """
+        if not self.client:
+            return None
+
+        mt_collection, tenant_id = self._get_collection_and_tenant_id(collection_name)
+
+        try:
+            points = self.client.retrieve(
+                collection_name=mt_collection,
+                ids=ids,
+                with_payload=["tenant_id"],
+                with_vectors=True,
+            )
+            return {
+                str(point.id): point.vector
+                for point in points
+                if (point.payload or {}).get("tenant_id") == tenant_id
+            }
+        except Exception as e:
+            log.exception(f"Error getting vectors from '{collection_name}': {e}")
+            return None
+
     def _handle_operation_with_error_retry(
         self, operation_name, mt_collection, points, dimension
     ):
@@ -1,3 +1,4 @@
+import uuid
 from pydantic import BaseModel
 from abc import ABC, abstractmethod
 from typing import Any, Dict, List, Optional, Union
@@ -70,6 +71,68 @@ class VectorDBBase(ABC):
         """Retrieve all vectors from a collection."""
         pass
 
+    def count(self, collection_name: str) -> Optional[int]:
+        """
+        Return the number of items in a collection, or None when the backend
+        cannot count them cheaply.
+        """
+        return None
+
+    def get_vectors(
+        self, collection_name: str, ids: List[str]
+    ) -> Optional[Dict[str, List[Union[float, int]]]]:
+        """
+        Retrieve the stored vectors of the given IDs, keyed by ID.
+
+        Returns None when the backend cannot return stored vectors, in which
+        case callers have to recompute them.
+        """
+        return None
+
+    def copy(
+        self,
+        source_collection_name: str,
+        target_collection_name: str,
+        filter: Optional[Dict] = None,
+    ) -> Optional[GetResult]:
+        """
+        Copy the items of a collection (or those matching a metadata filter)
+        into another collection along with their stored vectors, under new IDs.
+
+        Returns the copied items, or None when nothing could be copied. Backends
+        that can copy server-side override this bulk get + insert.
+        """
+        if filter:
+            result = self.query(collection_name=source_collection_name, filter=filter)
+        else:
+            result = self.get(collection_name=source_collection_name)
+
+        if result is None or not result.ids[0]:
+            return None
+
+        vectors = self.get_vectors(source_collection_name, result.ids[0])
+        if vectors is None or any(id not in vectors for id in result.ids[0]):
+            return None
+
+        items = [
+            {
+                "id": str(uuid.uuid4()),
+                "text": text,
+                "vector": vectors[id],
+                "metadata": metadata,
+            }
+            for id, text, metadata in zip(
+                result.ids[0], result.documents[0], result.metadatas[0]
+            )
+        ]
+        self.insert(collection_name=target_collection_name, items=items)
+
+        return GetResult(
+            ids=[[item["id"] for item in items]],
+            documents=[[item["text"] for item in items]],
+            metadatas=[[item["metadata"] for item in items]],
+        )
+
     @abstractmethod
     def delete(
         self,
@@ -1,18 +1,18 @@
-import hashlib
+import asyncio
 import json
 import logging
 import os
+import queue
+import threading
 import uuid
 from functools import lru_cache
 from pathlib import Path
 from pydub import AudioSegment
-from pydub.silence import split_on_silence
+from pydub.silence import detect_silence, split_on_silence
 from concurrent.futures import ThreadPoolExecutor
 from typing import Optional
 
 
-import aiohttp
-import aiofiles
 import requests
 import mimetypes
 
@@ -28,22 +28,26 @@ from fastapi import (
     APIRouter,
 )
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import FileResponse
+from fastapi.responses import FileResponse, StreamingResponse
+from starlette.background import BackgroundTask
 from pydantic import BaseModel
 
 
 from open_webui.utils.auth import get_admin_user, get_verified_user
+from open_webui.utils.session_pool import get_upstream_session, release_response
+from open_webui.utils.speech_cache import SPEECH_CACHE
 from open_webui.config import (
     WHISPER_MODEL_AUTO_UPDATE,
     WHISPER_MODEL_DIR,
     CACHE_DIR,
     WHISPER_LANGUAGE,
+    TRANSCRIPTION_CHUNK_DURATION,
+    TRANSCRIPTION_CONCURRENCY,
 )
 
 from open_webui.constants import ERROR_MESSAGES
 from open_webui.env import (
     AIOHTTP_CLIENT_SESSION_SSL,
-    AIOHTTP_CLIENT_TIMEOUT,
     ENV,
     SRC_LOG_LEVELS,
     DEVICE_TYPE,
@@ -62,8 +66,11 @@ AZURE_MAX_FILE_SIZE = AZURE_MAX_FILE_SIZE_MB * 1024 * 1024  # Convert MB to byte
 log = logging.getLogger(__name__)
 log.setLevel(SRC_LOG_LEVELS["AUDIO"])
 
-SPEECH_CACHE_DIR = CACHE_DIR / "audio" / "speech"
-SPEECH_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+# Size of the audio chunks relayed from the TTS engine to the client
+SPEECH_STREAM_CHUNK_SIZE = 16 * 1024
+
+# Chunks of a recording are transcribed in parallel, load the model once
+FASTER_WHISPER_MODEL_LOCK = threading.Lock()
 
 
 ##########################################
@@ -128,6 +135,8 @@ def set_faster_whisper_model(model: str, auto_update: bool = False):
             "model_size_or_path": model,
             "device": DEVICE_TYPE if DEVICE_TYPE and DEVICE_TYPE == "cuda" else "cpu",
             "compute_type": "int8",
+            # Lets the chunks of a recording be transcribed in parallel
+            "num_workers": max(TRANSCRIPTION_CONCURRENCY, 1),
             "download_root": WHISPER_MODEL_DIR,
             "local_files_only": not auto_update,
         }
@@ -298,19 +307,17 @@ def load_speech_pipeline(request):
 @router.post("/speech")
 async def speech(request: Request, user=Depends(get_verified_user)):
     body = await request.body()
-    name = hashlib.sha256(
-        body
-        + str(request.app.state.config.TTS_ENGINE).encode("utf-8")
-        + str(request.app.state.config.TTS_MODEL).encode("utf-8")
-    ).hexdigest()
-
-    file_path = SPEECH_CACHE_DIR.joinpath(f"{name}.mp3")
-    file_body_path = SPEECH_CACHE_DIR.joinpath(f"{name}.json")
+    name = SPEECH_CACHE.get_key(
+        body, request.app.state.config.TTS_ENGINE, request.app.state.config.TTS_MODEL
+    )
 
     # Check if the file already exists in the cache
-    if file_path.is_file():
+    file_path = await asyncio.to_thread(SPEECH_CACHE.get, name)
+    if file_path:
         return FileResponse(file_path)
 
+    file_path = SPEECH_CACHE.get_path(name)
+
     payload = None
     try:
         payload = json.loads(body.decode("utf-8"))
@@ -321,39 +328,39 @@ async def speech(request: Request, user=Depends(get_verified_user)):
     if request.app.state.config.TTS_ENGINE == "openai":
         payload["model"] = request.app.state.config.TTS_MODEL
 
+        r = None
         try:
-            timeout = aiohttp.ClientTimeout(total=AIOHTTP_CLIENT_TIMEOUT)
-            async with aiohttp.ClientSession(
-                timeout=timeout, trust_env=True
-            ) as session:
-                async with session.post(
-                    url=f"{request.app.state.config.TTS_OPENAI_API_BASE_URL}/audio/speech",
-                    json=payload,
-                    headers={
-                        "Content-Type": "application/json",
-                        "Authorization": f"Bearer {request.app.state.config.TTS_OPENAI_API_KEY}",
-                        **(
-                            {
-                                "X-OpenWebUI-User-Name": user.name,
-                                "X-OpenWebUI-User-Id": user.id,
-                                "X-OpenWebUI-User-Email": user.email,
-                                "X-OpenWebUI-User-Role": user.role,
-                            }
-                            if ENABLE_FORWARD_USER_INFO_HEADERS
-                            else {}
-                        ),
-                    },
-                    ssl=AIOHTTP_CLIENT_SESSION_SSL,
-                ) as r:
-                    r.raise_for_status()
-
-                    async with aiofiles.open(file_path, "wb") as f:
-                        await f.write(await r.read())
-
-                    async with aiofiles.open(file_body_path, "w") as f:
-                        await f.write(json.dumps(payload))
+            url = f"{request.app.state.config.TTS_OPENAI_API_BASE_URL}/audio/speech"
+            session = await get_upstream_session(url)
+            r = await session.post(
+                url=url,
+                json=payload,
+                headers={
+                    "Content-Type": "application/json",
+                    "Authorization": f"Bearer {request.app.state.config.TTS_OPENAI_API_KEY}",
+                    **(
+                        {
+                            "X-OpenWebUI-User-Name": user.name,
+                            "X-OpenWebUI-User-Id": user.id,
+                            "X-OpenWebUI-User-Email": user.email,
+                            "X-OpenWebUI-User-Role": user.role,
+                        }
+                        if ENABLE_FORWARD_USER_INFO_HEADERS
+                        else {}
+                    ),
+                },
+                ssl=AIOHTTP_CLIENT_SESSION_SSL,
+            )
+            r.raise_for_status()
 
-            return FileResponse(file_path)
+            # Relay the audio as it is synthesized, caching it along the way
+            return StreamingResponse(
+                SPEECH_CACHE.stream(
+                    name, payload, r.content.iter_chunked(SPEECH_STREAM_CHUNK_SIZE)
+                ),
+                media_type=r.headers.get("Content-Type", "audio/mpeg"),
+                background=BackgroundTask(release_response, response=r),
+            )
 
         except Exception as e:
             log.exception(e)
@@ -367,6 +374,8 @@ async def speech(request: Request, user=Depends(get_verified_user)):
                         detail = f"External: {res['error'].get('message', '')}"
             except Exception:
                 detail = f"External: {e}"
+            finally:
+                await release_response(r)
 
             raise HTTPException(
                 status_code=getattr(r, "status", 500) if r else 500,
@@ -382,34 +391,34 @@ async def speech(request: Request, user=Depends(get_verified_user)):
                 detail="Invalid voice id",
             )
 
+        r = None
         try:
-            timeout = aiohttp.ClientTimeout(total=AIOHTTP_CLIENT_TIMEOUT)
-            async with aiohttp.ClientSession(
-                timeout=timeout, trust_env=True
-            ) as session:
-                async with session.post(
-                    f"https://api.elevenlabs.io/v1/text-to-speech/{voice_id}",
-                    json={
-                        "text": payload["input"],
-                        "model_id": request.app.state.config.TTS_MODEL,
-                        "voice_settings": {"stability": 0.5, "similarity_boost": 0.5},
-                    },
-                    headers={
-                        "Accept": "audio/mpeg",
-                        "Content-Type": "application/json",
-                        "xi-api-key": request.app.state.config.TTS_API_KEY,
-                    },
-                    ssl=AIOHTTP_CLIENT_SESSION_SSL,
-                ) as r:
-                    r.raise_for_status()
-
-                    async with aiofiles.open(file_path, "wb") as f:
-                        await f.write(await r.read())
-
-                    async with aiofiles.open(file_body_path, "w") as f:
-                        await f.write(json.dumps(payload))
+            url = f"https://api.elevenlabs.io/v1/text-to-speech/{voice_id}"
+            session = await get_upstream_session(url)
+            r = await session.post(
+                url,
+                json={
+                    "text": payload["input"],
+                    "model_id": request.app.state.config.TTS_MODEL,
+                    "voice_settings": {"stability": 0.5, "similarity_boost": 0.5},
+                },
+                headers={
+                    "Accept": "audio/mpeg",
+                    "Content-Type": "application/json",
+                    "xi-api-key": request.app.state.config.TTS_API_KEY,
+                },
+                ssl=AIOHTTP_CLIENT_SESSION_SSL,
+            )
+            r.raise_for_status()
 
-            return FileResponse(file_path)
+            # Relay the audio as it is synthesized, caching it along the way
+            return StreamingResponse(
+                SPEECH_CACHE.stream(
+                    name, payload, r.content.iter_chunked(SPEECH_STREAM_CHUNK_SIZE)
+                ),
+                media_type=r.headers.get("Content-Type", "audio/mpeg"),
+                background=BackgroundTask(release_response, response=r),
+            )
 
         except Exception as e:
             log.exception(e)
@@ -422,6 +431,8 @@ async def speech(request: Request, user=Depends(get_verified_user)):
                         detail = f"External: {res['error'].get('message', '')}"
             except Exception:
                 detail = f"External: {e}"
+            finally:
+                await release_response(r)
 
             raise HTTPException(
                 status_code=getattr(r, "status", 500) if r else 500,
@@ -441,34 +452,35 @@ async def speech(request: Request, user=Depends(get_verified_user)):
         locale = "-".join(request.app.state.config.TTS_VOICE.split("-")[:1])
         output_format = request.app.state.config.TTS_AZURE_SPEECH_OUTPUT_FORMAT
 
+        r = None
         try:
             data = f"""<speak version="1.0" xmlns="http://www.w3.org/2001/10/synthesis" xml:lang="{locale}">
                 <voice name="{language}">{payload["input"]}</voice>
             </speak>"""
-            timeout = aiohttp.ClientTimeout(total=AIOHTTP_CLIENT_TIMEOUT)
-            async with aiohttp.ClientSession(
-                timeout=timeout, trust_env=True
-            ) as session:
-                async with session.post(
-                    (base_url or f"https://{region}.tts.speech.microsoft.com")
-                    + "/cognitiveservices/v1",
-                    headers={
-                        "Ocp-Apim-Subscription-Key": request.app.state.config.TTS_API_KEY,
-                        "Content-Type": "application/ssml+xml",
-                        "X-Microsoft-OutputFormat": output_format,
-                    },
-                    data=data,
-                    ssl=AIOHTTP_CLIENT_SESSION_SSL,
-                ) as r:
-                    r.raise_for_status()
-
-                    async with aiofiles.open(file_path, "wb") as f:
-                        await f.write(await r.read())
-
-                    async with aiofiles.open(file_body_path, "w") as f:
-                        await f.write(json.dumps(payload))
+            url = (
+                base_url or f"https://{region}.tts.speech.microsoft.com"
+            ) + "/cognitiveservices/v1"
+            session = await get_upstream_session(url)
+            r = await session.post(
+                url,
+                headers={
+                    "Ocp-Apim-Subscription-Key": request.app.state.config.TTS_API_KEY,
+                    "Content-Type": "application/ssml+xml",
+                    "X-Microsoft-OutputFormat": output_format,
+                },
+                data=data,
+                ssl=AIOHTTP_CLIENT_SESSION_SSL,
+            )
+            r.raise_for_status()
 
-                    return FileResponse(file_path)
+            # Relay the audio as it is synthesized, caching it along the way
+            return StreamingResponse(
+                SPEECH_CACHE.stream(
+                    name, payload, r.content.iter_chunked(SPEECH_STREAM_CHUNK_SIZE)
+                ),
+                media_type=r.headers.get("Content-Type", "audio/mpeg"),
+                background=BackgroundTask(release_response, response=r),
+            )
 
         except Exception as e:
             log.exception(e)
@@ -481,6 +493,8 @@ async def speech(request: Request, user=Depends(get_verified_user)):
                         detail = f"External: {res['error'].get('message', '')}"
             except Exception:
                 detail = f"External: {e}"
+            finally:
+                await release_response(r)
 
             raise HTTPException(
                 status_code=getattr(r, "status", 500) if r else 500,
@@ -520,13 +534,37 @@ async def speech(request: Request, user=Depends(get_verified_user)):
         )
 
         sf.write(file_path, speech["audio"], samplerate=speech["sampling_rate"])
-
-        async with aiofiles.open(file_body_path, "w") as f:
-            await f.write(json.dumps(payload))
+        await asyncio.to_thread(SPEECH_CACHE.add, name, payload)
 
         return FileResponse(file_path)
 
 
+def transcribe_with_faster_whisper(request, file_path, metadata):
+    """Yield the segments of `file_path` as the local model decodes them."""
+    metadata = metadata or {}
+
+    with FASTER_WHISPER_MODEL_LOCK:
+        if request.app.state.faster_whisper_model is None:
+            request.app.state.faster_whisper_model = set_faster_whisper_model(
+                request.app.state.config.WHISPER_MODEL
+            )
+
+    model = request.app.state.faster_whisper_model
+    segments, info = model.transcribe(
+        file_path,
+        beam_size=5,
+        vad_filter=request.app.state.config.WHISPER_VAD_FILTER,
+        language=metadata.get("language") or WHISPER_LANGUAGE,
+    )
+    log.info(
+        "Detected language '%s' with probability %f"
+        % (info.language, info.language_probability)
+    )
+
+    for segment in segments:
+        yield {"start": segment.start, "end": segment.end, "text": segment.text}
+
+
 def transcription_handler(request, file_path, metadata):
     filename = os.path.basename(file_path)
     file_dir = os.path.dirname(file_path)
@@ -535,25 +573,10 @@ def transcription_handler(request, file_path, metadata):
     metadata = metadata or {}
 
     if request.app.state.config.STT_ENGINE == "":
-        if request.app.state.faster_whisper_model is None:
-            request.app.state.faster_whisper_model = set_faster_whisper_model(
-                request.app.state.config.WHISPER_MODEL
-            )
+        segments = list(transcribe_with_faster_whisper(request, file_path, metadata))
 
-        model = request.app.state.faster_whisper_model
-        segments, info = model.transcribe(
-            file_path,
-            beam_size=5,
-            vad_filter=request.app.state.config.WHISPER_VAD_FILTER,
-            language=metadata.get("language") or WHISPER_LANGUAGE,
-        )
-        log.info(
-            "Detected language '%s' with probability %f"
-            % (info.language, info.language_probability)
-        )
-
-        transcript = "".join([segment.text for segment in list(segments)])
-        data = {"text": transcript.strip()}
+        transcript = "".join([segment["text"] for segment in segments])
+        data = {"text": transcript.strip(), "segments": segments}
 
         # save the transcript to a json file
         transcript_file = f"{file_dir}/{id}.json"
@@ -786,117 +809,186 @@ def transcription_handler(request, file_path, metadata):
             )
 
 
-def transcribe(request: Request, file_path: str, metadata: Optional[dict] = None):
-    log.info(f"transcribe: {file_path} {metadata}")
+def iter_transcription(
+    request: Request, file_path: str, metadata: Optional[dict] = None
+):
+    """
+    Transcribe `file_path`, yielding `(chunk index, segment)` in order as soon
+    as each segment is available.
 
-    if is_audio_conversion_required(file_path):
-        file_path = convert_audio_to_mp3(file_path)
+    Recordings longer than TRANSCRIPTION_CHUNK_DURATION, or too large to be
+    uploaded to an engine, are split once on silences and their chunks are
+    transcribed in parallel. Segment timestamps are relative to the whole
+    recording.
+    """
+    local = request.app.state.config.STT_ENGINE == ""
 
     try:
-        file_path = compress_audio(file_path)
+        duration = float(mediainfo(file_path).get("duration") or 0)
     except Exception as e:
-        log.exception(e)
+        log.warning(f"Error getting audio duration: {e}")
+        duration = 0
 
-    # Always produce a list of chunk paths (could be one entry if small)
-    try:
-        chunk_paths = split_audio(file_path, MAX_FILE_SIZE)
-        print(f"Chunk paths: {chunk_paths}")
-    except Exception as e:
-        log.exception(e)
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail=ERROR_MESSAGES.DEFAULT(e),
-        )
+    if (
+        duration > TRANSCRIPTION_CHUNK_DURATION
+        or os.path.getsize(file_path) > MAX_FILE_SIZE
+    ):
+        try:
+            chunks = split_audio(
+                file_path,
+                TRANSCRIPTION_CHUNK_DURATION * 1000,
+                # The local model reads wav without another lossy encoding
+                format="wav" if local else "mp3",
+            )
+        except Exception as e:
+            log.exception(e)
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=ERROR_MESSAGES.DEFAULT(e),
+            )
+    else:
+        if is_audio_conversion_required(file_path):
+            file_path = convert_audio_to_mp3(file_path)
+        chunks = [(0, file_path)]
+
+    log.debug(f"Transcribing {len(chunks)} chunks of {file_path}")
+
+    stop = threading.Event()
+    queues = [queue.Queue() for _ in chunks]
+
+    def transcribe_chunk(idx: int, offset: float, chunk_path: str):
+        try:
+            if local:
+                segments = transcribe_with_faster_whisper(request, chunk_path, metadata)
+            else:
+                data = transcription_handler(request, chunk_path, metadata)
+                segments = [{"start": 0.0, "end": None, "text": data["text"]}]
+
+            for segment in segments:
+                if stop.is_set():
+                    return
 
-    results = []
+                queues[idx].put(
+                    {
+                        "start": round(segment["start"] + offset, 3),
+                        "end": (
+                            round(segment["end"] + offset, 3)
+                            if segment["end"] is not None
+                            else None
+                        ),
+                        "text": segment["text"],
+                    }
+                )
+        except Exception as e:
+            queues[idx].put(e)
+        finally:
+            queues[idx].put(None)
+
+    executor = ThreadPoolExecutor(max_workers=max(TRANSCRIPTION_CONCURRENCY, 1))
     try:
-        with ThreadPoolExecutor() as executor:
-            # Submit tasks for each chunk_path
-            futures = [
-                executor.submit(transcription_handler, request, chunk_path, metadata)
-                for chunk_path in chunk_paths
-            ]
-            # Gather results as they complete
-            for future in futures:
-                try:
-                    results.append(future.result())
-                except Exception as transcribe_exc:
+        for idx, (offset_ms, chunk_path) in enumerate(chunks):
+            executor.submit(transcribe_chunk, idx, offset_ms / 1000, chunk_path)
+
+        for idx, chunk_queue in enumerate(queues):
+            while (item := chunk_queue.get()) is not None:
+                if isinstance(item, Exception):
                     raise HTTPException(
                         status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                        detail=f"Error transcribing chunk: {transcribe_exc}",
+                        detail=f"Error transcribing chunk: {item}",
                     )
+                yield idx, item
     finally:
+        # Also stops the chunks still running when the client went away
+        stop.set()
+        executor.shutdown(wait=True, cancel_futures=True)
+
         # Clean up only the temporary chunks, never the original file
-        for chunk_path in chunk_paths:
+        for _, chunk_path in chunks:
             if chunk_path != file_path and os.path.isfile(chunk_path):
                 try:
                     os.remove(chunk_path)
                 except Exception:
                     pass
 
-    return {
-        "text": " ".join([result["text"] for result in results]),
-    }
 
+def get_transcript(texts: dict[int, str]) -> str:
+    return " ".join([text.strip() for text in texts.values()])
 
-def compress_audio(file_path):
-    if os.path.getsize(file_path) > MAX_FILE_SIZE:
-        id = os.path.splitext(os.path.basename(file_path))[
-            0
-        ]  # Handles names with multiple dots
-        file_dir = os.path.dirname(file_path)
 
-        audio = AudioSegment.from_file(file_path)
-        audio = audio.set_frame_rate(16000).set_channels(1)  # Compress audio
+def transcribe(request: Request, file_path: str, metadata: Optional[dict] = None):
+    log.info(f"transcribe: {file_path} {metadata}")
 
-        compressed_path = os.path.join(file_dir, f"{id}_compressed.mp3")
-        audio.export(compressed_path, format="mp3", bitrate="32k")
-        # log.debug(f"Compressed audio to {compressed_path}")  # Uncomment if log is defined
+    texts = {}
+    segments = []
+    for idx, segment in iter_transcription(request, file_path, metadata):
+        texts[idx] = texts.get(idx, "") + segment["text"]
+        segments.append(segment)
 
-        return compressed_path
-    else:
-        return file_path
+    return {
+        "text": get_transcript(texts),
+        "segments": segments,
+    }
 
 
-def split_audio(file_path, max_bytes, format="mp3", bitrate="32k"):
+def stream_transcription(
+    request: Request, file_path: str, metadata: Optional[dict] = None
+):
     """
-    Splits audio into chunks not exceeding max_bytes.
-    Returns a list of chunk file paths. If audio fits, returns list with original path.
+    Server-sent events of the segments of `file_path` as they are transcribed,
+    followed by the whole transcript.
     """
-    file_size = os.path.getsize(file_path)
-    if file_size <= max_bytes:
-        return [file_path]  # Nothing to split
+    texts = {}
+    try:
+        for idx, segment in iter_transcription(request, file_path, metadata):
+            texts[idx] = texts.get(idx, "") + segment["text"]
+            yield f"data: {json.dumps({'type': 'segment', **segment})}\n\n"
+
+        done = {
+            "type": "done",
+            "text": get_transcript(texts),
+            "filename": os.path.basename(file_path),
+        }
+        yield f"data: {json.dumps(done)}\n\n"
+    except Exception as e:
+        log.exception(e)
+        detail = e.detail if isinstance(e, HTTPException) else str(e)
+        yield f"data: {json.dumps({'type': 'error', 'detail': detail})}\n\n"
+
 
-    audio = AudioSegment.from_file(file_path)
+def split_audio(file_path, max_duration_ms, format="mp3", bitrate="32k"):
+    """
+    Splits audio into chunks of at most max_duration_ms, cut in the middle of
+    the longest silence near the end of each chunk when there is one.
+    The audio is decoded once and each chunk exported once, as 16 kHz mono.
+    Returns the offset (in ms) and path of every chunk.
+    """
+    audio = AudioSegment.from_file(file_path).set_frame_rate(16000).set_channels(1)
     duration_ms = len(audio)
-    orig_size = file_size
+    silence_thresh = audio.dBFS - 16
 
-    approx_chunk_ms = max(int(duration_ms * (max_bytes / orig_size)) - 1000, 1000)
+    base, _ = os.path.splitext(file_path)
     chunks = []
     start = 0
-    i = 0
-
-    base, _ = os.path.splitext(file_path)
 
     while start < duration_ms:
-        end = min(start + approx_chunk_ms, duration_ms)
-        chunk = audio[start:end]
-        chunk_path = f"{base}_chunk_{i}.{format}"
-        chunk.export(chunk_path, format=format, bitrate=bitrate)
-
-        # Reduce chunk duration if still too large
-        while os.path.getsize(chunk_path) > max_bytes and (end - start) > 5000:
-            end = start + ((end - start) // 2)
-            chunk = audio[start:end]
-            chunk.export(chunk_path, format=format, bitrate=bitrate)
-
-        if os.path.getsize(chunk_path) > max_bytes:
-            os.remove(chunk_path)
-            raise Exception("Audio chunk cannot be reduced below max file size.")
-
-        chunks.append(chunk_path)
+        end = min(start + max_duration_ms, duration_ms)
+        if end < duration_ms:
+            # Look for a pause in the last tenth of the chunk
+            window_start = end - max(max_duration_ms // 10, 1)
+            silences = detect_silence(
+                audio[window_start:end],
+                min_silence_len=300,
+                silence_thresh=silence_thresh,
+                seek_step=10,
+            )
+            if silences:
+                silence_start, silence_end = max(silences, key=lambda s: s[1] - s[0])
+                end = window_start + (silence_start + silence_end) // 2
+
+        chunk_path = f"{base}_chunk_{len(chunks)}.{format}"
+        audio[start:end].export(chunk_path, format=format, bitrate=bitrate)
+        chunks.append((start, chunk_path))
         start = end
-        i += 1
 
     return chunks
 
@@ -906,6 +998,7 @@ def transcription(
     request: Request,
     file: UploadFile = File(...),
     language: Optional[str] = Form(None),
+    stream: bool = Form(False),
     user=Depends(get_verified_user),
 ):
     log.info(f"file.content_type: {file.content_type}")
@@ -940,6 +1033,12 @@ def transcription(
             if language:
                 metadata = {"language": language}
 
+            if stream:
+                return StreamingResponse(
+                    stream_transcription(request, file_path, metadata),
+                    media_type="text/event-stream",
+                )
+
             result = transcribe(request, file_path, metadata)
 
             return {
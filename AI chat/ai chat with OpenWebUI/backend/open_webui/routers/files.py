@@ -2,7 +2,6 @@ import logging
 import os
 import uuid
 import json
-from fnmatch import fnmatch
 from pathlib import Path
 from typing import Optional
 from urllib.parse import quote
@@ -30,12 +29,17 @@ from open_webui.models.files import (
     Files,
 )
 from open_webui.models.knowledge import Knowledges
+from open_webui.models.ingestion_jobs import (
+    IngestionJobModel,
+    IngestionJobResponse,
+    IngestionJobs,
+)
 
 from open_webui.routers.knowledge import get_knowledge, get_knowledge_list
 from open_webui.routers.retrieval import ProcessFileForm, process_file
-from open_webui.routers.audio import transcribe
 from open_webui.storage.provider import Storage
 from open_webui.utils.auth import get_admin_user, get_verified_user
+from open_webui.utils.ingestion import INGESTION_QUEUE, process_uploaded_file
 from pydantic import BaseModel
 
 log = logging.getLogger(__name__)
@@ -88,6 +92,7 @@ def upload_file(
     file: UploadFile = File(...),
     metadata: Optional[dict | str] = Form(None),
     process: bool = Query(True),
+    background: bool = Query(False),
     internal: bool = False,
     user=Depends(get_verified_user),
 ):
@@ -134,7 +139,7 @@ def upload_file(
             "OpenWebUI-User-Name": user.name,
             "OpenWebUI-File-Id": id,
         }
-        contents, file_path = Storage.upload_file(file.file, filename, tags)
+        size, sha256, file_path = Storage.upload_file_stream(file.file, filename, tags)
 
         file_item = Files.insert_new_file(
             user.id,
@@ -146,36 +151,29 @@ def upload_file(
                     "meta": {
                         "name": name,
                         "content_type": file.content_type,
-                        "size": len(contents),
+                        "size": size,
+                        "sha256": sha256,
                         "data": file_metadata,
                     },
                 }
             ),
         )
-        if process:
+        if process and background and INGESTION_QUEUE.workers > 0:
+            # Return right away, a worker processes the file and reports its
+            # progress through `file-events`
+            job = INGESTION_QUEUE.enqueue(id, user.id)
+            if job:
+                file_item = FileModelResponse(
+                    **{
+                        **file_item.model_dump(),
+                        "job": IngestionJobResponse(**job.model_dump()),
+                    }
+                )
+        elif process:
+            # Also used for background uploads when this node runs no
+            # ingestion workers, since nothing would pick the job up
             try:
-                if file.content_type:
-                    if file.content_type.startswith("audio/") or file.content_type in {
-                        "video/webm"
-                    }:
-                        file_path = Storage.get_file(file_path)
-                        result = transcribe(request, file_path, file_metadata)
-
-                        process_file(
-                            request,
-                            ProcessFileForm(file_id=id, content=result.get("text", "")),
-                            user=user,
-                        )
-                    elif (not file.content_type.startswith(("image/", "video/"))) or (
-                        request.app.state.config.CONTENT_EXTRACTION_ENGINE == "external"
-                    ):
-                        process_file(request, ProcessFileForm(file_id=id), user=user)
-                else:
-                    log.info(
-                        f"File type {file.content_type} is not provided, but trying to process anyway"
-                    )
-                    process_file(request, ProcessFileForm(file_id=id), user=user)
-
+                process_uploaded_file(request, file_item, user)
                 file_item = Files.get_file_by_id(id=id)
             except Exception as e:
                 log.exception(e)
@@ -209,18 +207,26 @@ def upload_file(
 
 
 @router.get("/", response_model=list[FileModelResponse])
-async def list_files(user=Depends(get_verified_user), content: bool = Query(True)):
-    if user.role == "admin":
-        files = Files.get_files()
-    else:
-        files = Files.get_files_by_user_id(user.id)
-
-    if not content:
-        for file in files:
-            if "content" in file.data:
-                del file.data["content"]
-
-    return files
+async def list_files(
+    user=Depends(get_verified_user),
+    content: bool = Query(True),
+    cursor: Optional[str] = Query(
+        None, description="Id of the last file of the previous page"
+    ),
+    limit: Optional[int] = Query(None, ge=1),
+):
+    try:
+        return Files.get_file_list(
+            user_id=None if user.role == "admin" else user.id,
+            content=content,
+            cursor=cursor,
+            limit=limit,
+        )
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=ERROR_MESSAGES.INVALID_CURSOR,
+        )
 
 
 ############################
@@ -235,21 +241,29 @@ async def search_files(
         description="Filename pattern to search for. Supports wildcards such as '*.txt'",
     ),
     content: bool = Query(True),
+    cursor: Optional[str] = Query(
+        None, description="Id of the last file of the previous page"
+    ),
+    limit: Optional[int] = Query(None, ge=1),
     user=Depends(get_verified_user),
 ):
     """
     Search for files by filename with support for wildcard patterns.
     """
-    # Get files according to user role
-    if user.role == "admin":
-        files = Files.get_files()
-    else:
-        files = Files.get_files_by_user_id(user.id)
-
-    # Get matching files
-    matching_files = [
-        file for file in files if fnmatch(file.filename.lower(), filename.lower())
-    ]
+    # Get matching files according to user role
+    try:
+        matching_files = Files.get_file_list(
+            user_id=None if user.role == "admin" else user.id,
+            filename=filename,
+            content=content,
+            cursor=cursor,
+            limit=limit,
+        )
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=ERROR_MESSAGES.INVALID_CURSOR,
+        )
 
     if not matching_files:
         raise HTTPException(
@@ -257,11 +271,6 @@ async def search_files(
             detail="No files found matching the pattern.",
         )
 
-    if not content:
-        for file in matching_files:
-            if "content" in file.data:
-                del file.data["content"]
-
     return matching_files
 
 
@@ -319,6 +328,48 @@ async def get_file_by_id(id: str, user=Depends(get_verified_user)):
         )
 
 
+############################
+# Get File Processing Job By Id
+############################
+
+
+def get_file_ingestion_job(id: str, user) -> IngestionJobModel:
+    file = Files.get_file_by_id(id)
+
+    if file and (
+        file.user_id == user.id
+        or user.role == "admin"
+        or has_access_to_file(id, "read", user)
+    ):
+        job = IngestionJobs.get_latest_job_by_file_id(id)
+        if job:
+            return job
+
+    raise HTTPException(
+        status_code=status.HTTP_404_NOT_FOUND,
+        detail=ERROR_MESSAGES.NOT_FOUND,
+    )
+
+
+@router.get("/{id}/process/status", response_model=IngestionJobResponse)
+async def get_file_process_status_by_id(id: str, user=Depends(get_verified_user)):
+    job = get_file_ingestion_job(id, user)
+    return IngestionJobResponse(**job.model_dump())
+
+
+@router.post("/{id}/process/cancel", response_model=IngestionJobResponse)
+async def cancel_file_process_by_id(id: str, user=Depends(get_verified_user)):
+    job = get_file_ingestion_job(id, user)
+    if job.user_id != user.id and user.role != "admin":
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail=ERROR_MESSAGES.UNAUTHORIZED,
+        )
+
+    job = IngestionJobs.cancel_job_by_id(job.id)
+    return IngestionJobResponse(**job.model_dump())
+
+
 ############################
 # Get File Data Content By Id
 ############################
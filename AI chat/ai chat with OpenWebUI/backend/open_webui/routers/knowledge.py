@@ -11,6 +11,7 @@ from open_webui.models.knowledge import (
 )
 from open_webui.models.files import Files, FileModel, FileMetadataResponse
 from open_webui.retrieval.vector.factory import VECTOR_DB_CLIENT
+from open_webui.retrieval.bm25 import BM25_INDEX
 from open_webui.routers.retrieval import (
     process_file,
     ProcessFileForm,
@@ -203,6 +204,7 @@ async def reindex_knowledge_files(request: Request, user=Depends(get_verified_us
                     VECTOR_DB_CLIENT.delete_collection(
                         collection_name=knowledge_base.id
                     )
+                BM25_INDEX.delete_collection(knowledge_base.id)
             except Exception as e:
                 log.error(f"Error deleting collection {knowledge_base.id}: {str(e)}")
                 continue  # Skip, don't raise
@@ -451,6 +453,7 @@ def update_file_from_knowledge_by_id(
     VECTOR_DB_CLIENT.delete(
         collection_name=knowledge.id, filter={"file_id": form_data.file_id}
     )
+    BM25_INDEX.delete(knowledge.id, filter={"file_id": form_data.file_id})
 
     # Add content to the vector database
     try:
@@ -522,6 +525,7 @@ def remove_file_from_knowledge_by_id(
         VECTOR_DB_CLIENT.delete(
             collection_name=knowledge.id, filter={"file_id": form_data.file_id}
         )
+        BM25_INDEX.delete(knowledge.id, filter={"file_id": form_data.file_id})
     except Exception as e:
         log.debug("This was most likely caused by bypassing embedding processing")
         log.debug(e)
@@ -532,6 +536,7 @@ def remove_file_from_knowledge_by_id(
         file_collection = f"file-{form_data.file_id}"
         if VECTOR_DB_CLIENT.has_collection(collection_name=file_collection):
             VECTOR_DB_CLIENT.delete_collection(collection_name=file_collection)
+        BM25_INDEX.delete_collection(file_collection)
     except Exception as e:
         log.debug("This was most likely caused by bypassing embedding processing")
         log.debug(e)
@@ -630,6 +635,7 @@ async def delete_knowledge_by_id(id: str, user=Depends(get_verified_user)):
     # Clean up vector DB
     try:
         VECTOR_DB_CLIENT.delete_collection(collection_name=id)
+        BM25_INDEX.delete_collection(id)
     except Exception as e:
         log.debug(e)
         pass
@@ -663,6 +669,7 @@ async def reset_knowledge_by_id(id: str, user=Depends(get_verified_user)):
 
     try:
         VECTOR_DB_CLIENT.delete_collection(collection_name=id)
+        BM25_INDEX.delete_collection(id)
     except Exception as e:
         log.debug(e)
         pass
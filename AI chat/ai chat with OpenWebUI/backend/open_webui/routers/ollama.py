@@ -1,12 +1,7 @@
-# TODO: Implement a more intelligent load balancing mechanism for distributing requests among multiple backend instances.
-# Current implementation uses a simple round-robin approach (random.choice). Consider incorporating algorithms like weighted round-robin,
-# least connections, or least response time for better resource utilization and performance optimization.
-
 import asyncio
 import json
 import logging
 import os
-import random
 import re
 import time
 from datetime import datetime
@@ -14,7 +9,6 @@ from datetime import datetime
 from typing import Optional, Union
 from urllib.parse import urlparse
 import aiohttp
-from aiocache import cached
 import requests
 from open_webui.models.users import UserModel
 
@@ -34,7 +28,7 @@ from fastapi import (
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import StreamingResponse
 from pydantic import BaseModel, ConfigDict, validator
-from starlette.background import BackgroundTask
+from starlette.background import BackgroundTask, BackgroundTasks
 
 
 from open_webui.models.models import Models
@@ -47,7 +41,10 @@ from open_webui.utils.payload import (
     apply_model_system_prompt_to_body,
 )
 from open_webui.utils.auth import get_admin_user, get_verified_user
-from open_webui.utils.access_control import has_access
+from open_webui.utils.access_control import has_access, get_accessible_model_ids
+from open_webui.utils.session_pool import get_upstream_session, release_response
+from open_webui.utils.load_balancer import OLLAMA_LOAD_BALANCER
+from open_webui.utils.model_catalog import ModelCatalog
 
 
 from open_webui.config import (
@@ -57,7 +54,6 @@ from open_webui.env import (
     ENV,
     SRC_LOG_LEVELS,
     AIOHTTP_CLIENT_SESSION_SSL,
-    AIOHTTP_CLIENT_TIMEOUT,
     AIOHTTP_CLIENT_TIMEOUT_MODEL_LIST,
     BYPASS_MODEL_ACCESS_CONTROL,
 )
@@ -77,26 +73,27 @@ log.setLevel(SRC_LOG_LEVELS["OLLAMA"])
 async def send_get_request(url, key=None, user: UserModel = None):
     timeout = aiohttp.ClientTimeout(total=AIOHTTP_CLIENT_TIMEOUT_MODEL_LIST)
     try:
-        async with aiohttp.ClientSession(timeout=timeout, trust_env=True) as session:
-            async with session.get(
-                url,
-                headers={
-                    "Content-Type": "application/json",
-                    **({"Authorization": f"Bearer {key}"} if key else {}),
-                    **(
-                        {
-                            "X-OpenWebUI-User-Name": user.name,
-                            "X-OpenWebUI-User-Id": user.id,
-                            "X-OpenWebUI-User-Email": user.email,
-                            "X-OpenWebUI-User-Role": user.role,
-                        }
-                        if ENABLE_FORWARD_USER_INFO_HEADERS and user
-                        else {}
-                    ),
-                },
-                ssl=AIOHTTP_CLIENT_SESSION_SSL,
-            ) as response:
-                return await response.json()
+        session = await get_upstream_session(url)
+        async with session.get(
+            url,
+            headers={
+                "Content-Type": "application/json",
+                **({"Authorization": f"Bearer {key}"} if key else {}),
+                **(
+                    {
+                        "X-OpenWebUI-User-Name": user.name,
+                        "X-OpenWebUI-User-Id": user.id,
+                        "X-OpenWebUI-User-Email": user.email,
+                        "X-OpenWebUI-User-Role": user.role,
+                    }
+                    if ENABLE_FORWARD_USER_INFO_HEADERS and user
+                    else {}
+                ),
+            },
+            timeout=timeout,
+            ssl=AIOHTTP_CLIENT_SESSION_SSL,
+        ) as response:
+            return await response.json()
     except Exception as e:
         # Handle connection error here
         log.error(f"Connection error: {e}")
@@ -105,12 +102,11 @@ async def send_get_request(url, key=None, user: UserModel = None):
 
 async def cleanup_response(
     response: Optional[aiohttp.ClientResponse],
-    session: Optional[aiohttp.ClientSession],
+    upstream_url: Optional[str] = None,
 ):
-    if response:
-        response.close()
-    if session:
-        await session.close()
+    await release_response(response)
+    if upstream_url:
+        OLLAMA_LOAD_BALANCER.release(upstream_url)
 
 
 async def send_post_request(
@@ -120,13 +116,20 @@ async def send_post_request(
     key: Optional[str] = None,
     content_type: Optional[str] = None,
     user: UserModel = None,
+    upstream_url: Optional[str] = None,
 ):
+    """
+    `upstream_url` is the Ollama base URL the request was routed to; when set,
+    the outcome is reported to the load balancer.
+    """
 
     r = None
+    start_time = time.monotonic()
+    if upstream_url:
+        OLLAMA_LOAD_BALANCER.acquire(upstream_url)
+
     try:
-        session = aiohttp.ClientSession(
-            trust_env=True, timeout=aiohttp.ClientTimeout(total=AIOHTTP_CLIENT_TIMEOUT)
-        )
+        session = await get_upstream_session(url)
 
         r = await session.post(
             url,
@@ -149,6 +152,11 @@ async def send_post_request(
         )
         r.raise_for_status()
 
+        if upstream_url:
+            OLLAMA_LOAD_BALANCER.record_success(
+                upstream_url, time.monotonic() - start_time
+            )
+
         if stream:
             response_headers = dict(r.headers)
 
@@ -160,17 +168,25 @@ async def send_post_request(
                 status_code=r.status,
                 headers=response_headers,
                 background=BackgroundTask(
-                    cleanup_response, response=r, session=session
+                    cleanup_response, response=r, upstream_url=upstream_url
                 ),
             )
         else:
             res = await r.json()
-            await cleanup_response(r, session)
+            await cleanup_response(r, upstream_url)
             return res
 
     except Exception as e:
         detail = None
 
+        if upstream_url:
+            # Only connection errors and server-side failures count against the
+            # node; a 4xx is the caller's problem.
+            if r is None or r.status >= 500:
+                OLLAMA_LOAD_BALANCER.record_failure(upstream_url)
+            if r is None:
+                OLLAMA_LOAD_BALANCER.release(upstream_url)
+
         if r is not None:
             try:
                 res = await r.json()
@@ -178,6 +194,8 @@ async def send_post_request(
                     detail = f"Ollama: {res.get('error', 'Unknown error')}"
             except Exception:
                 detail = f"Ollama: {e}"
+            finally:
+                await cleanup_response(r, upstream_url)
 
         raise HTTPException(
             status_code=r.status if r else 500,
@@ -220,47 +238,45 @@ async def verify_connection(
     url = form_data.url
     key = form_data.key
 
-    async with aiohttp.ClientSession(
-        trust_env=True,
-        timeout=aiohttp.ClientTimeout(total=AIOHTTP_CLIENT_TIMEOUT_MODEL_LIST),
-    ) as session:
-        try:
-            async with session.get(
-                f"{url}/api/version",
-                headers={
-                    **({"Authorization": f"Bearer {key}"} if key else {}),
-                    **(
-                        {
-                            "X-OpenWebUI-User-Name": user.name,
-                            "X-OpenWebUI-User-Id": user.id,
-                            "X-OpenWebUI-User-Email": user.email,
-                            "X-OpenWebUI-User-Role": user.role,
-                        }
-                        if ENABLE_FORWARD_USER_INFO_HEADERS and user
-                        else {}
-                    ),
-                },
-                ssl=AIOHTTP_CLIENT_SESSION_SSL,
-            ) as r:
-                if r.status != 200:
-                    detail = f"HTTP Error: {r.status}"
-                    res = await r.json()
+    try:
+        session = await get_upstream_session(url)
+        async with session.get(
+            f"{url}/api/version",
+            headers={
+                **({"Authorization": f"Bearer {key}"} if key else {}),
+                **(
+                    {
+                        "X-OpenWebUI-User-Name": user.name,
+                        "X-OpenWebUI-User-Id": user.id,
+                        "X-OpenWebUI-User-Email": user.email,
+                        "X-OpenWebUI-User-Role": user.role,
+                    }
+                    if ENABLE_FORWARD_USER_INFO_HEADERS and user
+                    else {}
+                ),
+            },
+            timeout=aiohttp.ClientTimeout(total=AIOHTTP_CLIENT_TIMEOUT_MODEL_LIST),
+            ssl=AIOHTTP_CLIENT_SESSION_SSL,
+        ) as r:
+            if r.status != 200:
+                detail = f"HTTP Error: {r.status}"
+                res = await r.json()
 
-                    if "error" in res:
-                        detail = f"External Error: {res['error']}"
-                    raise Exception(detail)
+                if "error" in res:
+                    detail = f"External Error: {res['error']}"
+                raise Exception(detail)
 
-                data = await r.json()
-                return data
-        except aiohttp.ClientError as e:
-            log.exception(f"Client error: {str(e)}")
-            raise HTTPException(
-                status_code=500, detail="Open WebUI: Server Connection Error"
-            )
-        except Exception as e:
-            log.exception(f"Unexpected error: {e}")
-            error_detail = f"Unexpected error: {str(e)}"
-            raise HTTPException(status_code=500, detail=error_detail)
+            data = await r.json()
+            return data
+    except aiohttp.ClientError as e:
+        log.exception(f"Client error: {str(e)}")
+        raise HTTPException(
+            status_code=500, detail="Open WebUI: Server Connection Error"
+        )
+    except Exception as e:
+        log.exception(f"Unexpected error: {e}")
+        error_detail = f"Unexpected error: {str(e)}"
+        raise HTTPException(status_code=500, detail=error_detail)
 
 
 @router.get("/config")
@@ -295,6 +311,8 @@ async def update_config(
         if key in keys
     }
 
+    await OLLAMA_MODEL_CATALOG.invalidate()
+
     return {
         "ENABLE_OLLAMA_API": request.app.state.config.ENABLE_OLLAMA_API,
         "OLLAMA_BASE_URLS": request.app.state.config.OLLAMA_BASE_URLS,
@@ -318,9 +336,8 @@ def merge_ollama_models_lists(model_lists):
     return list(merged_models.values())
 
 
-@cached(ttl=1)
-async def get_all_models(request: Request, user: UserModel = None):
-    log.info("get_all_models()")
+async def fetch_all_models(request: Request, user: UserModel = None):
+    log.info("fetch_all_models()")
     if request.app.state.config.ENABLE_OLLAMA_API:
         request_tasks = []
         for idx, url in enumerate(request.app.state.config.OLLAMA_BASE_URLS):
@@ -410,23 +427,49 @@ async def get_all_models(request: Request, user: UserModel = None):
     else:
         models = {"models": []}
 
-    request.app.state.OLLAMA_MODELS = {
-        model["model"]: model for model in models["models"]
-    }
     return models
 
 
+def apply_all_models(app: FastAPI, models: dict):
+    app.state.OLLAMA_MODELS = {model["model"]: model for model in models["models"]}
+
+
+OLLAMA_MODEL_CATALOG = ModelCatalog(
+    "ollama", fetch=fetch_all_models, apply=apply_all_models
+)
+
+
+async def get_all_models(request: Request, user: UserModel = None):
+    return await OLLAMA_MODEL_CATALOG.get(request, user=user)
+
+
+async def invalidate_models_after(response):
+    """
+    Invalidate the model catalog once `response`, of a request that adds a
+    model, is done; a streamed response is only done when its stream ends.
+    """
+    if isinstance(response, StreamingResponse):
+        response.background = BackgroundTasks(
+            tasks=[
+                *([response.background] if response.background else []),
+                BackgroundTask(OLLAMA_MODEL_CATALOG.invalidate),
+            ]
+        )
+    else:
+        await OLLAMA_MODEL_CATALOG.invalidate()
+    return response
+
+
 async def get_filtered_models(models, user):
     # Filter models based on user access control
-    filtered_models = []
-    for model in models.get("models", []):
-        model_info = Models.get_model_by_id(model["model"])
-        if model_info:
-            if user.id == model_info.user_id or has_access(
-                user.id, type="read", access_control=model_info.access_control
-            ):
-                filtered_models.append(model)
-    return filtered_models
+    accessible_model_ids = get_accessible_model_ids(
+        user.id, [model["model"] for model in models.get("models", [])]
+    )
+    return [
+        model
+        for model in models.get("models", [])
+        if model["model"] in accessible_model_ids
+    ]
 
 
 @router.get("/api/tags")
@@ -543,12 +586,30 @@ async def get_ollama_loaded_models(request: Request, user=Depends(get_admin_user
                 )
             )
         }
+
+        OLLAMA_LOAD_BALANCER.set_loaded_models(
+            {
+                model["model"]: {
+                    request.app.state.config.OLLAMA_BASE_URLS[idx]
+                    for idx in model["urls"]
+                }
+                for model in models["models"]
+            }
+        )
     else:
         models = {"models": []}
 
     return models
 
 
+@router.get("/routing")
+async def get_ollama_routing_stats(user=Depends(get_admin_user)):
+    """
+    Show the routing strategy and the load balancer's view of every node.
+    """
+    return OLLAMA_LOAD_BALANCER.get_stats()
+
+
 @router.get("/api/version")
 @router.get("/api/version/{url_idx}")
 async def get_ollama_versions(request: Request, url_idx: Optional[int] = None):
@@ -704,12 +765,13 @@ async def pull_model(
     # Admin should be able to pull models from any source
     payload = {**form_data.model_dump(exclude_none=True), "insecure": True}
 
-    return await send_post_request(
+    response = await send_post_request(
         url=f"{url}/api/pull",
         payload=json.dumps(payload),
         key=get_api_key(url_idx, url, request.app.state.config.OLLAMA_API_CONFIGS),
         user=user,
     )
+    return await invalidate_models_after(response)
 
 
 class PushModelForm(BaseModel):
@@ -768,12 +830,13 @@ async def create_model(
     log.debug(f"form_data: {form_data}")
     url = request.app.state.config.OLLAMA_BASE_URLS[url_idx]
 
-    return await send_post_request(
+    response = await send_post_request(
         url=f"{url}/api/create",
         payload=form_data.model_dump_json(exclude_none=True).encode(),
         key=get_api_key(url_idx, url, request.app.state.config.OLLAMA_API_CONFIGS),
         user=user,
     )
+    return await invalidate_models_after(response)
 
 
 class CopyModelForm(BaseModel):
@@ -827,6 +890,7 @@ async def copy_model(
         r.raise_for_status()
 
         log.debug(f"r.text: {r.text}")
+        await OLLAMA_MODEL_CATALOG.invalidate()
         return True
     except Exception as e:
         log.exception(e)
@@ -892,6 +956,7 @@ async def delete_model(
         r.raise_for_status()
 
         log.debug(f"r.text: {r.text}")
+        await OLLAMA_MODEL_CATALOG.invalidate()
         return True
     except Exception as e:
         log.exception(e)
@@ -924,7 +989,7 @@ async def show_model_info(
             detail=ERROR_MESSAGES.MODEL_NOT_FOUND(form_data.name),
         )
 
-    url_idx = random.choice(models[form_data.name]["urls"])
+    _, url_idx = await get_ollama_url(request, form_data.name)
 
     url = request.app.state.config.OLLAMA_BASE_URLS[url_idx]
     key = get_api_key(url_idx, url, request.app.state.config.OLLAMA_API_CONFIGS)
@@ -998,7 +1063,7 @@ async def embed(
             model = f"{model}:latest"
 
         if model in models:
-            url_idx = random.choice(models[model]["urls"])
+            _, url_idx = await get_ollama_url(request, model)
         else:
             raise HTTPException(
                 status_code=400,
@@ -1085,7 +1150,7 @@ async def embeddings(
             model = f"{model}:latest"
 
         if model in models:
-            url_idx = random.choice(models[model]["urls"])
+            _, url_idx = await get_ollama_url(request, model)
         else:
             raise HTTPException(
                 status_code=400,
@@ -1178,7 +1243,7 @@ async def generate_completion(
             model = f"{model}:latest"
 
         if model in models:
-            url_idx = random.choice(models[model]["urls"])
+            _, url_idx = await get_ollama_url(request, model)
         else:
             raise HTTPException(
                 status_code=400,
@@ -1200,6 +1265,7 @@ async def generate_completion(
         payload=form_data.model_dump_json(exclude_none=True).encode(),
         key=get_api_key(url_idx, url, request.app.state.config.OLLAMA_API_CONFIGS),
         user=user,
+        upstream_url=url,
     )
 
 
@@ -1234,7 +1300,12 @@ class GenerateChatCompletionForm(BaseModel):
     tools: Optional[list[dict]] = None
 
 
-async def get_ollama_url(request: Request, model: str, url_idx: Optional[int] = None):
+async def get_ollama_url(
+    request: Request,
+    model: str,
+    url_idx: Optional[int] = None,
+    routing_key: Optional[str] = None,
+):
     if url_idx is None:
         models = request.app.state.OLLAMA_MODELS
         if model not in models:
@@ -1242,7 +1313,14 @@ async def get_ollama_url(request: Request, model: str, url_idx: Optional[int] =
                 status_code=400,
                 detail=ERROR_MESSAGES.MODEL_NOT_FOUND(model),
             )
-        url_idx = random.choice(models[model].get("urls", []))
+
+        candidates = {
+            request.app.state.config.OLLAMA_BASE_URLS[idx]: idx
+            for idx in models[model].get("urls", [])
+        }
+        url = OLLAMA_LOAD_BALANCER.select(model, list(candidates), key=routing_key)
+        OLLAMA_LOAD_BALANCER.mark_loaded(model, url)
+        url_idx = candidates[url]
     url = request.app.state.config.OLLAMA_BASE_URLS[url_idx]
     return url, url_idx
 
@@ -1314,7 +1392,12 @@ async def generate_chat_completion(
     if ":" not in payload["model"]:
         payload["model"] = f"{payload['model']}:latest"
 
-    url, url_idx = await get_ollama_url(request, payload["model"], url_idx)
+    url, url_idx = await get_ollama_url(
+        request,
+        payload["model"],
+        url_idx,
+        routing_key=(metadata or {}).get("chat_id"),
+    )
     api_config = request.app.state.config.OLLAMA_API_CONFIGS.get(
         str(url_idx),
         request.app.state.config.OLLAMA_API_CONFIGS.get(url, {}),  # Legacy support
@@ -1331,6 +1414,7 @@ async def generate_chat_completion(
         key=get_api_key(url_idx, url, request.app.state.config.OLLAMA_API_CONFIGS),
         content_type="application/x-ndjson",
         user=user,
+        upstream_url=url,
     )
 
 
@@ -1434,6 +1518,7 @@ async def generate_openai_completion(
         stream=payload.get("stream", False),
         key=get_api_key(url_idx, url, request.app.state.config.OLLAMA_API_CONFIGS),
         user=user,
+        upstream_url=url,
     )
 
 
@@ -1499,7 +1584,12 @@ async def generate_openai_chat_completion(
     if ":" not in payload["model"]:
         payload["model"] = f"{payload['model']}:latest"
 
-    url, url_idx = await get_ollama_url(request, payload["model"], url_idx)
+    url, url_idx = await get_ollama_url(
+        request,
+        payload["model"],
+        url_idx,
+        routing_key=(metadata or {}).get("chat_id"),
+    )
     api_config = request.app.state.config.OLLAMA_API_CONFIGS.get(
         str(url_idx),
         request.app.state.config.OLLAMA_API_CONFIGS.get(url, {}),  # Legacy support
@@ -1515,6 +1605,7 @@ async def generate_openai_chat_completion(
         stream=payload.get("stream", False),
         key=get_api_key(url_idx, url, request.app.state.config.OLLAMA_API_CONFIGS),
         user=user,
+        upstream_url=url,
     )
 
 
@@ -1778,6 +1869,7 @@ async def upload_model(
 
                 if create_resp.ok:
                     log.info(f"API SUCCESS!")  # DEBUG
+                    await OLLAMA_MODEL_CATALOG.invalidate()
                     done_msg = {
                         "done": True,
                         "blob": f"sha256:{file_hash}",
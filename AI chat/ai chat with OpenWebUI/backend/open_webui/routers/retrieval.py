@@ -9,7 +9,7 @@ import asyncio
 import uuid
 from datetime import datetime
 from pathlib import Path
-from typing import Iterator, List, Optional, Sequence, Union
+from typing import Callable, Iterator, List, Optional, Sequence, Union
 
 from fastapi import (
     Depends,
@@ -37,6 +37,8 @@ from open_webui.storage.provider import Storage
 
 
 from open_webui.retrieval.vector.factory import VECTOR_DB_CLIENT
+from open_webui.retrieval.bm25 import BM25_INDEX
+from open_webui.retrieval.embedding_cache import EMBEDDING_CACHE
 
 # Document loaders
 from open_webui.retrieval.loaders.main import Loader
@@ -68,6 +70,7 @@ from open_webui.retrieval.web.firecrawl import search_firecrawl
 from open_webui.retrieval.web.external import search_external
 
 from open_webui.retrieval.utils import (
+    generate_embeddings_in_batches,
     get_embedding_function,
     get_model_path,
     query_collection,
@@ -106,6 +109,11 @@ from open_webui.constants import ERROR_MESSAGES
 log = logging.getLogger(__name__)
 log.setLevel(SRC_LOG_LEVELS["RAG"])
 
+# Chunks are written to the vector DB and the BM25 index in groups of this
+# size, whatever the embedding batch size is. A local model also embeds this
+# many chunks per call, since it batches internally.
+INSERT_BATCH_SIZE = 500
+
 ##########################################
 #
 # Utility functions
@@ -224,6 +232,11 @@ async def get_status(request: Request):
     }
 
 
+@router.get("/embedding/cache")
+async def get_embedding_cache_stats(user=Depends(get_admin_user)):
+    return EMBEDDING_CACHE.get_stats()
+
+
 @router.get("/embedding")
 async def get_embedding_config(request: Request, user=Depends(get_admin_user)):
     return {
@@ -1066,6 +1079,7 @@ def save_docs_to_vector_db(
     split: bool = True,
     add: bool = False,
     user=None,
+    on_progress: Optional[Callable[[int, int], None]] = None,
 ) -> bool:
     def _get_docs_info(docs: list[Document]) -> str:
         docs_info = set()
@@ -1154,11 +1168,15 @@ def save_docs_to_vector_db(
                 metadata[key] = str(value)
 
     try:
+        new_collection = True
         if VECTOR_DB_CLIENT.has_collection(collection_name=collection_name):
             log.info(f"collection {collection_name} already exists")
+            new_collection = False
 
             if overwrite:
                 VECTOR_DB_CLIENT.delete_collection(collection_name=collection_name)
+                BM25_INDEX.delete_collection(collection_name)
+                new_collection = True
                 log.info(f"deleting existing collection {collection_name}")
             elif add is False:
                 log.info(
@@ -1195,28 +1213,71 @@ def save_docs_to_vector_db(
                 if request.app.state.config.RAG_EMBEDDING_ENGINE == "azure_openai"
                 else None
             ),
+            # Document chunks are rarely embedded twice; keep them from
+            # evicting the cached query embeddings
+            enable_cache=False,
         )
 
-        embeddings = embedding_function(
-            list(map(lambda x: x.replace("\n", " "), texts)),
-            prefix=RAG_EMBEDDING_CONTENT_PREFIX,
-            user=user,
-        )
+        # Embedded batches are inserted as soon as a full group is ready, so
+        # the vector DB writes overlap with the embedding requests still in
+        # flight
+        inserted_ids = []
+        pending_items = []
 
-        items = [
-            {
-                "id": str(uuid.uuid4()),
-                "text": text,
-                "vector": embeddings[idx],
-                "metadata": metadatas[idx],
+        def insert_pending_items():
+            VECTOR_DB_CLIENT.insert(
+                collection_name=collection_name,
+                items=pending_items,
+            )
+            inserted_ids.extend(item["id"] for item in pending_items)
+            BM25_INDEX.add(collection_name, pending_items, create=new_collection)
+            pending_items.clear()
+
+            log.debug(
+                f"embedded {len(inserted_ids)}/{len(texts)} chunks into {collection_name}"
+            )
+            if on_progress:
+                on_progress(len(inserted_ids), len(texts))
+
+        if request.app.state.config.RAG_EMBEDDING_ENGINE == "":
+            # A local model batches internally and already uses the whole
+            # device for each call
+            batch_kwargs = {"batch_size": INSERT_BATCH_SIZE, "max_in_flight": 1}
+        else:
+            batch_kwargs = {
+                "batch_size": request.app.state.config.RAG_EMBEDDING_BATCH_SIZE
             }
-            for idx, text in enumerate(texts)
-        ]
 
-        VECTOR_DB_CLIENT.insert(
-            collection_name=collection_name,
-            items=items,
-        )
+        try:
+            for offset, embeddings in generate_embeddings_in_batches(
+                embedding_function,
+                list(map(lambda x: x.replace("\n", " "), texts)),
+                **batch_kwargs,
+                prefix=RAG_EMBEDDING_CONTENT_PREFIX,
+                user=user,
+            ):
+                pending_items.extend(
+                    {
+                        "id": str(uuid.uuid4()),
+                        "text": texts[offset + idx],
+                        "vector": embedding,
+                        "metadata": metadatas[offset + idx],
+                    }
+                    for idx, embedding in enumerate(embeddings)
+                )
+                if len(pending_items) >= INSERT_BATCH_SIZE:
+                    insert_pending_items()
+
+            if pending_items:
+                insert_pending_items()
+        except Exception:
+            # Don't leave a partially embedded document behind
+            if inserted_ids:
+                VECTOR_DB_CLIENT.delete(
+                    collection_name=collection_name, ids=inserted_ids
+                )
+                BM25_INDEX.delete(collection_name, ids=inserted_ids)
+            raise
 
         return True
     except Exception as e:
@@ -1224,6 +1285,71 @@ def save_docs_to_vector_db(
         raise e
 
 
+def copy_file_to_vector_db(
+    request: Request, file: FileModel, collection_name: str, hash: str
+) -> bool:
+    """
+    Copy the chunks of an already processed file, with their vectors, from
+    the file's own collection into `collection_name`.
+
+    Returns False when the file has to be embedded again instead: it has not
+    been processed yet, it was embedded with another model, or the vector DB
+    cannot return stored vectors.
+    """
+    source_collection_name = f"file-{file.id}"
+    if collection_name == source_collection_name:
+        return False
+
+    sample = VECTOR_DB_CLIENT.query(
+        collection_name=source_collection_name,
+        filter={"file_id": file.id},
+        limit=1,
+    )
+    if sample is None or not sample.ids[0]:
+        return False
+
+    embedding_config = json.dumps(
+        {
+            "engine": request.app.state.config.RAG_EMBEDDING_ENGINE,
+            "model": request.app.state.config.RAG_EMBEDDING_MODEL,
+        }
+    )
+    if (sample.metadatas[0][0] or {}).get("embedding_config") != embedding_config:
+        return False
+
+    result = VECTOR_DB_CLIENT.query(
+        collection_name=collection_name, filter={"hash": hash}
+    )
+    if result is not None and result.ids[0]:
+        log.info(f"Document with hash {hash} already exists")
+        raise ValueError(ERROR_MESSAGES.DUPLICATE_CONTENT)
+
+    new_collection = not VECTOR_DB_CLIENT.has_collection(
+        collection_name=collection_name
+    )
+    result = VECTOR_DB_CLIENT.copy(
+        source_collection_name, collection_name, filter={"file_id": file.id}
+    )
+    if result is None:
+        return False
+
+    BM25_INDEX.add(
+        collection_name,
+        [
+            {"id": id, "text": text, "metadata": metadata}
+            for id, text, metadata in zip(
+                result.ids[0], result.documents[0], result.metadatas[0]
+            )
+        ],
+        create=new_collection,
+    )
+
+    log.info(
+        f"copied {len(result.ids[0])} chunks of file {file.id} to {collection_name}"
+    )
+    return True
+
+
 class ProcessFileForm(BaseModel):
     file_id: str
     content: Optional[str] = None
@@ -1251,6 +1377,7 @@ def process_file(
             try:
                 # /files/{file_id}/data/content/update
                 VECTOR_DB_CLIENT.delete_collection(collection_name=f"file-{file.id}")
+                BM25_INDEX.delete_collection(f"file-{file.id}")
             except:
                 # Audio file upload pipeline
                 pass
@@ -1372,7 +1499,12 @@ def process_file(
 
         if not request.app.state.config.BYPASS_EMBEDDING_AND_RETRIEVAL:
             try:
-                result = save_docs_to_vector_db(
+                # Adding a processed file to a knowledge base reuses its vectors
+                result = (
+                    form_data.collection_name is not None
+                    and not form_data.content
+                    and copy_file_to_vector_db(request, file, collection_name, hash)
+                ) or save_docs_to_vector_db(
                     request,
                     docs=docs,
                     collection_name=collection_name,
@@ -1923,13 +2055,8 @@ def query_doc_handler(
 ):
     try:
         if request.app.state.config.ENABLE_RAG_HYBRID_SEARCH:
-            collection_results = {}
-            collection_results[form_data.collection_name] = VECTOR_DB_CLIENT.get(
-                collection_name=form_data.collection_name
-            )
             return query_doc_with_hybrid_search(
                 collection_name=form_data.collection_name,
-                collection_result=collection_results[form_data.collection_name],
                 query=form_data.query,
                 embedding_function=lambda query, prefix: request.app.state.EMBEDDING_FUNCTION(
                     query, prefix=prefix, user=user
@@ -2047,6 +2174,7 @@ def delete_entries_from_collection(form_data: DeleteForm, user=Depends(get_admin
                 collection_name=form_data.collection_name,
                 metadata={"hash": hash},
             )
+            BM25_INDEX.delete(form_data.collection_name, filter={"hash": hash})
             return {"status": True}
         else:
             return {"status": False}
@@ -2058,6 +2186,7 @@ def delete_entries_from_collection(form_data: DeleteForm, user=Depends(get_admin
 @router.post("/reset/db")
 def reset_vector_db(user=Depends(get_admin_user)):
     VECTOR_DB_CLIENT.reset()
+    BM25_INDEX.reset()
     Knowledges.delete_all_knowledge()
 
 
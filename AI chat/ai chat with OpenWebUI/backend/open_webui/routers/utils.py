@@ -14,6 +14,7 @@ from open_webui.utils.misc import get_gravatar_url
 from open_webui.utils.pdf_generator import PDFGenerator
 from open_webui.utils.auth import get_admin_user, get_verified_user
 from open_webui.utils.code_interpreter import execute_code_jupyter
+from open_webui.utils.session_pool import get_upstream_stats
 from open_webui.env import SRC_LOG_LEVELS
 
 
@@ -133,3 +134,8 @@ async def download_litellm_config_yaml(user=Depends(get_admin_user)):
         media_type="application/octet-stream",
         filename="config.yaml",
     )
+
+
+@router.get("/upstream/stats")
+async def get_upstream_connection_stats(user=Depends(get_admin_user)):
+    return get_upstream_stats()
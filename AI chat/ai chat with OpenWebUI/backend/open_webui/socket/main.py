@@ -2,7 +2,7 @@ import asyncio
 import socketio
 import logging
 import sys
-import time
+import weakref
 from redis import asyncio as aioredis
 
 from open_webui.models.users import Users, UserNameResponse
@@ -20,9 +20,15 @@ from open_webui.env import (
     WEBSOCKET_REDIS_LOCK_TIMEOUT,
     WEBSOCKET_SENTINEL_PORT,
     WEBSOCKET_SENTINEL_HOSTS,
+    CHAT_EVENT_EMIT_INTERVAL,
 )
 from open_webui.utils.auth import decode_token
-from open_webui.socket.utils import RedisDict, RedisLock
+from open_webui.socket.utils import (
+    MessageEventStream,
+    RedisLock,
+    RedisSocketState,
+    SocketState,
+)
 
 from open_webui.env import (
     GLOBAL_LOG_LEVEL,
@@ -65,26 +71,16 @@ else:
 # Timeout duration in seconds
 TIMEOUT_DURATION = 3
 
-# Dictionary to maintain the user pool
+# Sessions, connected users and model usage
 
 if WEBSOCKET_MANAGER == "redis":
     log.debug("Using Redis to manage websockets.")
     redis_sentinels = get_sentinels_from_env(
         WEBSOCKET_SENTINEL_HOSTS, WEBSOCKET_SENTINEL_PORT
     )
-    SESSION_POOL = RedisDict(
-        "open-webui:session_pool",
-        redis_url=WEBSOCKET_REDIS_URL,
-        redis_sentinels=redis_sentinels,
-    )
-    USER_POOL = RedisDict(
-        "open-webui:user_pool",
-        redis_url=WEBSOCKET_REDIS_URL,
-        redis_sentinels=redis_sentinels,
-    )
-    USAGE_POOL = RedisDict(
-        "open-webui:usage_pool",
-        redis_url=WEBSOCKET_REDIS_URL,
+    SOCKET_STATE = RedisSocketState(
+        WEBSOCKET_REDIS_URL,
+        usage_timeout=TIMEOUT_DURATION,
         redis_sentinels=redis_sentinels,
     )
 
@@ -98,51 +94,49 @@ if WEBSOCKET_MANAGER == "redis":
     renew_func = clean_up_lock.renew_lock
     release_func = clean_up_lock.release_lock
 else:
-    SESSION_POOL = {}
-    USER_POOL = {}
-    USAGE_POOL = {}
-    aquire_func = release_func = renew_func = lambda: True
+    SOCKET_STATE = SocketState(usage_timeout=TIMEOUT_DURATION)
+
+    async def aquire_func():
+        return True
+
+    release_func = renew_func = aquire_func
 
 
 async def periodic_usage_pool_cleanup():
-    if not aquire_func():
+    if not await aquire_func():
         log.debug("Usage pool cleanup lock already exists. Not running it.")
         return
     log.debug("Running periodic_usage_pool_cleanup")
     try:
+        models_in_use = []
         while True:
-            if not renew_func():
+            if not await renew_func():
                 log.error(f"Unable to renew cleanup lock. Exiting usage pool cleanup.")
                 raise Exception("Unable to renew usage pool cleanup lock.")
 
-            now = int(time.time())
-            send_usage = False
-            for model_id, connections in list(USAGE_POOL.items()):
-                # Creating a list of sids to remove if they have timed out
-                expired_sids = [
-                    sid
-                    for sid, details in connections.items()
-                    if now - details["updated_at"] > TIMEOUT_DURATION
-                ]
+            # Expired usage is dropped on read, clients only need to hear of it
+            models = sorted(await get_models_in_use())
+            if models != models_in_use:
+                await sio.emit("usage", {"models": models})
+                models_in_use = models
 
-                for sid in expired_sids:
-                    del connections[sid]
-
-                if not connections:
-                    log.debug(f"Cleaning up model {model_id} from usage pool")
-                    del USAGE_POOL[model_id]
-                else:
-                    USAGE_POOL[model_id] = connections
+            await asyncio.sleep(TIMEOUT_DURATION)
+    finally:
+        await release_func()
 
-                send_usage = True
 
-            if send_usage:
-                # Emit updated usage information after cleaning
-                await sio.emit("usage", {"models": get_models_in_use()})
+async def periodic_socket_state_heartbeat():
+    # Runs on every worker, so that the sessions of one that died are removed
+    while True:
+        try:
+            if await SOCKET_STATE.heartbeat():
+                await sio.emit(
+                    "user-list", {"user_ids": await SOCKET_STATE.get_user_ids()}
+                )
+        except Exception as e:
+            log.warning(f"Socket state heartbeat failed: {e}")
 
-            await asyncio.sleep(TIMEOUT_DURATION)
-    finally:
-        release_func()
+        await asyncio.sleep(SOCKET_STATE.heartbeat_interval)
 
 
 app = socketio.ASGIApp(
@@ -151,27 +145,19 @@ app = socketio.ASGIApp(
 )
 
 
-def get_models_in_use():
+async def get_models_in_use():
     # List models that are currently in use
-    models_in_use = list(USAGE_POOL.keys())
-    return models_in_use
+    return await SOCKET_STATE.get_models_in_use()
 
 
 @sio.on("usage")
 async def usage(sid, data):
-    if sid in SESSION_POOL:
-        model_id = data["model"]
+    if await SOCKET_STATE.get_session(sid):
         # Record the timestamp for the last update
-        current_time = int(time.time())
-
-        # Store the new usage data and task
-        USAGE_POOL[model_id] = {
-            **(USAGE_POOL[model_id] if model_id in USAGE_POOL else {}),
-            sid: {"updated_at": current_time},
-        }
+        await SOCKET_STATE.touch_usage(data["model"])
 
         # Broadcast the usage data to all clients
-        await sio.emit("usage", {"models": get_models_in_use()})
+        await sio.emit("usage", {"models": await get_models_in_use()})
 
 
 @sio.event
@@ -184,15 +170,13 @@ async def connect(sid, environ, auth):
             user = Users.get_user_by_id(data["id"])
 
         if user:
-            SESSION_POOL[sid] = user.model_dump()
-            if user.id in USER_POOL:
-                USER_POOL[user.id] = USER_POOL[user.id] + [sid]
-            else:
-                USER_POOL[user.id] = [sid]
+            await SOCKET_STATE.add_session(sid, user.model_dump())
+            # Events for the user are sent to this room, see get_event_emitter
+            await sio.enter_room(sid, f"user:{user.id}")
 
             # print(f"user {user.name}({user.id}) connected with session ID {sid}")
-            await sio.emit("user-list", {"user_ids": list(USER_POOL.keys())})
-            await sio.emit("usage", {"models": get_models_in_use()})
+            await sio.emit("user-list", {"user_ids": await SOCKET_STATE.get_user_ids()})
+            await sio.emit("usage", {"models": await get_models_in_use()})
 
 
 @sio.on("user-join")
@@ -210,11 +194,8 @@ async def user_join(sid, data):
     if not user:
         return
 
-    SESSION_POOL[sid] = user.model_dump()
-    if user.id in USER_POOL:
-        USER_POOL[user.id] = USER_POOL[user.id] + [sid]
-    else:
-        USER_POOL[user.id] = [sid]
+    await SOCKET_STATE.add_session(sid, user.model_dump())
+    await sio.enter_room(sid, f"user:{user.id}")
 
     # Join all the channels
     channels = Channels.get_channels_by_user_id(user.id)
@@ -224,7 +205,7 @@ async def user_join(sid, data):
 
     # print(f"user {user.name}({user.id}) connected with session ID {sid}")
 
-    await sio.emit("user-list", {"user_ids": list(USER_POOL.keys())})
+    await sio.emit("user-list", {"user_ids": await SOCKET_STATE.get_user_ids()})
     return {"id": user.id, "name": user.name}
 
 
@@ -271,7 +252,9 @@ async def channel_events(sid, data):
                 "channel_id": data["channel_id"],
                 "message_id": data.get("message_id", None),
                 "data": event_data,
-                "user": UserNameResponse(**SESSION_POOL[sid]).model_dump(),
+                "user": UserNameResponse(
+                    **(await SOCKET_STATE.get_session(sid))
+                ).model_dump(),
             },
             room=room,
         )
@@ -279,57 +262,76 @@ async def channel_events(sid, data):
 
 @sio.on("user-list")
 async def user_list(sid):
-    if sid in SESSION_POOL:
-        await sio.emit("user-list", {"user_ids": list(USER_POOL.keys())})
+    if await SOCKET_STATE.get_session(sid):
+        await sio.emit("user-list", {"user_ids": await SOCKET_STATE.get_user_ids()})
 
 
 @sio.event
 async def disconnect(sid):
-    if sid in SESSION_POOL:
-        user = SESSION_POOL[sid]
-        del SESSION_POOL[sid]
-
-        user_id = user["id"]
-        USER_POOL[user_id] = [_sid for _sid in USER_POOL[user_id] if _sid != sid]
-
-        if len(USER_POOL[user_id]) == 0:
-            del USER_POOL[user_id]
-
-        await sio.emit("user-list", {"user_ids": list(USER_POOL.keys())})
+    if await SOCKET_STATE.remove_session(sid):
+        await sio.emit("user-list", {"user_ids": await SOCKET_STATE.get_user_ids()})
     else:
         pass
         # print(f"Unknown session ID {sid} disconnected")
 
 
+# Event streams of the messages being generated, shared by all their emitters
+# and dropped with them
+MESSAGE_EVENT_STREAMS: weakref.WeakValueDictionary = weakref.WeakValueDictionary()
+
+
+def get_message_event_stream(request_info, emit) -> MessageEventStream:
+    chat_id = request_info.get("chat_id")
+    message_id = request_info.get("message_id")
+    if not chat_id or not message_id:
+        return MessageEventStream(emit, CHAT_EVENT_EMIT_INTERVAL)
+
+    stream = MESSAGE_EVENT_STREAMS.get((chat_id, message_id))
+    if stream is None:
+        stream = MessageEventStream(emit, CHAT_EVENT_EMIT_INTERVAL)
+        MESSAGE_EVENT_STREAMS[(chat_id, message_id)] = stream
+    return stream
+
+
 def get_event_emitter(request_info, update_db=True):
-    async def __event_emitter__(event_data):
+    stream = None
+
+    async def emit(event_data):
         user_id = request_info["user_id"]
 
-        session_ids = list(
-            set(
-                USER_POOL.get(user_id, [])
-                + (
-                    [request_info.get("session_id")]
-                    if request_info.get("session_id")
-                    else []
-                )
-            )
+        # Every session of the user is in its room, the manager sends the
+        # event once to each of them
+        await sio.emit(
+            "chat-events",
+            {
+                "chat_id": request_info.get("chat_id", None),
+                "message_id": request_info.get("message_id", None),
+                "data": event_data,
+            },
+            to=[f"user:{user_id}"]
+            + (
+                [request_info.get("session_id")]
+                if request_info.get("session_id")
+                else []
+            ),
         )
 
-        emit_tasks = [
-            sio.emit(
-                "chat-events",
-                {
-                    "chat_id": request_info.get("chat_id", None),
-                    "message_id": request_info.get("message_id", None),
-                    "data": event_data,
-                },
-                to=session_id,
-            )
-            for session_id in session_ids
-        ]
-
-        await asyncio.gather(*emit_tasks)
+    async def __event_emitter__(event_data):
+        nonlocal stream
+        if stream is None:
+            stream = get_message_event_stream(request_info, emit)
+
+        data = event_data.get("data")
+        if (
+            event_data.get("type") == "chat:completion"
+            and isinstance(data, dict)
+            and list(data.keys()) == ["content"]
+        ):
+            # Content updates of a streamed message are coalesced
+            await stream.update_content(data["content"])
+            return
+
+        await stream.emit(event_data)
 
         if update_db:
             if "type" in event_data and event_data["type"] == "status":
@@ -390,28 +392,25 @@ def get_event_call(request_info):
 get_event_caller = get_event_call
 
 
-def get_user_id_from_session_pool(sid):
-    user = SESSION_POOL.get(sid)
+async def get_user_id_from_session_pool(sid):
+    user = await SOCKET_STATE.get_session(sid)
     if user:
         return user["id"]
     return None
 
 
-def get_user_ids_from_room(room):
+async def get_user_ids_from_room(room):
     active_session_ids = sio.manager.get_participants(
         namespace="/",
         room=room,
     )
 
-    active_user_ids = list(
-        set(
-            [SESSION_POOL.get(session_id[0])["id"] for session_id in active_session_ids]
-        )
+    users = await SOCKET_STATE.get_sessions(
+        [session_id[0] for session_id in active_session_ids]
     )
+    active_user_ids = list(set([user["id"] for user in users if user]))
     return active_user_ids
 
 
-def get_active_status_by_user_id(user_id):
-    if user_id in USER_POOL:
-        return True
-    return False
+async def get_active_status_by_user_id(user_id):
+    return await SOCKET_STATE.is_user_active(user_id)
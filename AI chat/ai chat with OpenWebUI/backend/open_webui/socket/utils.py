@@ -1,6 +1,15 @@
+import asyncio
 import json
+import logging
+import time
 import uuid
-from open_webui.utils.redis import get_redis_connection
+from typing import Awaitable, Callable, Optional
+
+from open_webui.utils.redis import get_async_redis_connection
+from open_webui.env import SRC_LOG_LEVELS
+
+log = logging.getLogger(__name__)
+log.setLevel(SRC_LOG_LEVELS["SOCKET"])
 
 
 class RedisLock:
@@ -9,83 +18,357 @@ class RedisLock:
         self.lock_id = str(uuid.uuid4())
         self.timeout_secs = timeout_secs
         self.lock_obtained = False
-        self.redis = get_redis_connection(
+        self.redis = get_async_redis_connection(
             redis_url, redis_sentinels, decode_responses=True
         )
 
-    def aquire_lock(self):
+    async def aquire_lock(self):
         # nx=True will only set this key if it _hasn't_ already been set
-        self.lock_obtained = self.redis.set(
+        self.lock_obtained = await self.redis.set(
             self.lock_name, self.lock_id, nx=True, ex=self.timeout_secs
         )
         return self.lock_obtained
 
-    def renew_lock(self):
+    async def renew_lock(self):
         # xx=True will only set this key if it _has_ already been set
-        return self.redis.set(
+        return await self.redis.set(
             self.lock_name, self.lock_id, xx=True, ex=self.timeout_secs
         )
 
-    def release_lock(self):
-        lock_value = self.redis.get(self.lock_name)
+    async def release_lock(self):
+        lock_value = await self.redis.get(self.lock_name)
         if lock_value and lock_value == self.lock_id:
-            self.redis.delete(self.lock_name)
+            await self.redis.delete(self.lock_name)
+
+
+class SocketState:
+    """
+    Sessions, connected users and model usage of the socket server, kept in
+    memory for a single worker. RedisSocketState shares them between workers.
+
+    A model is in use while some session reported it in the last
+    `usage_timeout` seconds. `heartbeat` is called by every worker every
+    `heartbeat_interval` seconds.
+    """
+
+    def __init__(self, usage_timeout: float, heartbeat_interval: float = 10):
+        self.usage_timeout = usage_timeout
+        self.heartbeat_interval = heartbeat_interval
+
+        self.sessions: dict[str, dict] = {}
+        self.user_sessions: dict[str, set[str]] = {}
+        self.usage: dict[str, float] = {}
+
+    async def add_session(self, sid: str, user: dict):
+        self.sessions[sid] = user
+        self.user_sessions.setdefault(user["id"], set()).add(sid)
+
+    async def remove_session(self, sid: str) -> Optional[dict]:
+        user = self.sessions.pop(sid, None)
+        if user:
+            session_ids = self.user_sessions.get(user["id"], set())
+            session_ids.discard(sid)
+            if not session_ids:
+                self.user_sessions.pop(user["id"], None)
+        return user
+
+    async def get_session(self, sid: str) -> Optional[dict]:
+        return self.sessions.get(sid)
+
+    async def get_sessions(self, sids: list[str]) -> list[Optional[dict]]:
+        return [self.sessions.get(sid) for sid in sids]
+
+    async def get_user_ids(self) -> list[str]:
+        return list(self.user_sessions.keys())
+
+    async def is_user_active(self, user_id: str) -> bool:
+        return user_id in self.user_sessions
 
+    async def touch_usage(self, model_id: str):
+        self.usage[model_id] = time.time()
 
-class RedisDict:
-    def __init__(self, name, redis_url, redis_sentinels=[]):
-        self.name = name
-        self.redis = get_redis_connection(
+    async def heartbeat(self) -> int:
+        """Return the number of sessions of dead workers that were removed."""
+        return 0
+
+    async def get_models_in_use(self) -> list[str]:
+        expired_at = time.time() - self.usage_timeout
+        self.usage = {
+            model_id: used_at
+            for model_id, used_at in self.usage.items()
+            if used_at >= expired_at
+        }
+        return list(self.usage.keys())
+
+
+class RedisSocketState(SocketState):
+    """
+    Socket state shared by all workers through Redis, with one key or field
+    per item rather than whole JSON values:
+
+    - `<prefix>:sessions`, a hash of the user of each session,
+    - `<prefix>:user_sessions:<user id>`, the set of the sessions of a user,
+    - `<prefix>:users`, the set of the users with at least one session,
+    - `<prefix>:usage`, model ids sorted by their last use; entries older than
+      `usage_timeout` are dropped whenever it is written or read,
+    - `<prefix>:workers`, the set of the workers with sessions, and for each
+      `<prefix>:worker_sessions:<worker id>`, the set of its sessions, and
+      `<prefix>:worker:<worker id>`, which expires unless the worker keeps
+      calling `heartbeat`.
+
+    A worker that crashes cannot remove its sessions on disconnect; once its
+    heartbeat key expires, the next heartbeat of another worker removes them.
+
+    All calls are asynchronous and pipelined. The sessions of this worker,
+    which are the ones its handlers look up, are also kept in memory.
+    """
+
+    # Removes a session of a worker and, atomically, its user once it has
+    # none left
+    REMOVE_SESSION_SCRIPT = """
+    redis.call('HDEL', KEYS[1], ARGV[1])
+    redis.call('SREM', KEYS[2], ARGV[1])
+    redis.call('SREM', KEYS[4], ARGV[1])
+    if redis.call('SCARD', KEYS[2]) == 0 then
+        redis.call('SREM', KEYS[3], ARGV[2])
+    end
+    return 1
+    """
+
+    def __init__(
+        self,
+        redis_url: str,
+        usage_timeout: float,
+        redis_sentinels=[],
+        prefix: str = "open-webui:socket",
+        heartbeat_interval: float = 10,
+    ):
+        super().__init__(usage_timeout, heartbeat_interval)
+        self.redis = get_async_redis_connection(
             redis_url, redis_sentinels, decode_responses=True
         )
 
-    def __setitem__(self, key, value):
-        serialized_value = json.dumps(value)
-        self.redis.hset(self.name, key, serialized_value)
+        self.sessions_key = f"{prefix}:sessions"
+        self.user_sessions_prefix = f"{prefix}:user_sessions"
+        self.users_key = f"{prefix}:users"
+        self.usage_key = f"{prefix}:usage"
+
+        self.worker_id = str(uuid.uuid4())
+        self.workers_key = f"{prefix}:workers"
+        self.worker_prefix = f"{prefix}:worker"
+        self.worker_sessions_prefix = f"{prefix}:worker_sessions"
+        # A few missed heartbeats before the worker is considered dead
+        self.worker_timeout = max(int(heartbeat_interval * 3), 1)
+
+    def _touch_worker(self, pipe):
+        pipe.set(f"{self.worker_prefix}:{self.worker_id}", 1, ex=self.worker_timeout)
+        pipe.sadd(self.workers_key, self.worker_id)
 
-    def __getitem__(self, key):
-        value = self.redis.hget(self.name, key)
-        if value is None:
-            raise KeyError(key)
-        return json.loads(value)
+    async def add_session(self, sid: str, user: dict):
+        self.sessions[sid] = user
 
-    def __delitem__(self, key):
-        result = self.redis.hdel(self.name, key)
-        if result == 0:
-            raise KeyError(key)
+        pipe = self.redis.pipeline(transaction=True)
+        self._touch_worker(pipe)
+        pipe.hset(self.sessions_key, sid, json.dumps(user))
+        pipe.sadd(f"{self.user_sessions_prefix}:{user['id']}", sid)
+        pipe.sadd(self.users_key, user["id"])
+        pipe.sadd(f"{self.worker_sessions_prefix}:{self.worker_id}", sid)
+        await pipe.execute()
+
+    async def remove_session(self, sid: str) -> Optional[dict]:
+        user = self.sessions.pop(sid, None) or await self._get_remote_session(sid)
+        if user:
+            await self._remove_remote_session(sid, user["id"], self.worker_id)
+        return user
+
+    async def _remove_remote_session(self, sid: str, user_id: str, worker_id: str):
+        await self.redis.eval(
+            self.REMOVE_SESSION_SCRIPT,
+            4,
+            self.sessions_key,
+            f"{self.user_sessions_prefix}:{user_id}",
+            self.users_key,
+            f"{self.worker_sessions_prefix}:{worker_id}",
+            sid,
+            user_id,
+        )
 
-    def __contains__(self, key):
-        return self.redis.hexists(self.name, key)
+    async def heartbeat(self) -> int:
+        pipe = self.redis.pipeline(transaction=True)
+        self._touch_worker(pipe)
+        await pipe.execute()
 
-    def __len__(self):
-        return self.redis.hlen(self.name)
+        worker_ids = [
+            worker_id
+            for worker_id in await self.redis.smembers(self.workers_key)
+            if worker_id != self.worker_id
+        ]
+        if not worker_ids:
+            return 0
 
-    def keys(self):
-        return self.redis.hkeys(self.name)
+        pipe = self.redis.pipeline(transaction=False)
+        for worker_id in worker_ids:
+            pipe.exists(f"{self.worker_prefix}:{worker_id}")
+        alive = await pipe.execute()
 
-    def values(self):
-        return [json.loads(v) for v in self.redis.hvals(self.name)]
+        removed = 0
+        for worker_id, is_alive in zip(worker_ids, alive):
+            if not is_alive:
+                removed += await self._remove_worker(worker_id)
+        return removed
 
-    def items(self):
-        return [(k, json.loads(v)) for k, v in self.redis.hgetall(self.name).items()]
+    async def _remove_worker(self, worker_id: str) -> int:
+        worker_sessions_key = f"{self.worker_sessions_prefix}:{worker_id}"
+        sids = list(await self.redis.smembers(worker_sessions_key))
+        if sids:
+            users = await self.redis.hmget(self.sessions_key, sids)
+            for sid, user in zip(sids, users):
+                if user is not None:
+                    await self._remove_remote_session(
+                        sid, json.loads(user)["id"], worker_id
+                    )
 
-    def get(self, key, default=None):
+        pipe = self.redis.pipeline(transaction=True)
+        pipe.delete(worker_sessions_key)
+        pipe.srem(self.workers_key, worker_id)
+        await pipe.execute()
+
+        log.info(f"Removed {len(sids)} sessions of unresponsive worker {worker_id}")
+        return len(sids)
+
+    async def _get_remote_session(self, sid: str) -> Optional[dict]:
+        value = await self.redis.hget(self.sessions_key, sid)
+        return json.loads(value) if value is not None else None
+
+    async def get_session(self, sid: str) -> Optional[dict]:
+        if sid in self.sessions:
+            return self.sessions[sid]
+        return await self._get_remote_session(sid)
+
+    async def get_sessions(self, sids: list[str]) -> list[Optional[dict]]:
+        missing = [sid for sid in sids if sid not in self.sessions]
+        remote = {}
+        if missing:
+            values = await self.redis.hmget(self.sessions_key, missing)
+            remote = {
+                sid: json.loads(value)
+                for sid, value in zip(missing, values)
+                if value is not None
+            }
+        return [self.sessions.get(sid) or remote.get(sid) for sid in sids]
+
+    async def get_user_ids(self) -> list[str]:
+        return list(await self.redis.smembers(self.users_key))
+
+    async def is_user_active(self, user_id: str) -> bool:
+        return bool(await self.redis.sismember(self.users_key, user_id))
+
+    async def touch_usage(self, model_id: str):
+        now = time.time()
+        pipe = self.redis.pipeline(transaction=False)
+        pipe.zadd(self.usage_key, {model_id: now})
+        pipe.zremrangebyscore(self.usage_key, "-inf", now - self.usage_timeout)
+        await pipe.execute()
+
+    async def get_models_in_use(self) -> list[str]:
+        pipe = self.redis.pipeline(transaction=False)
+        pipe.zremrangebyscore(self.usage_key, "-inf", time.time() - self.usage_timeout)
+        pipe.zrange(self.usage_key, 0, -1)
+        _, models = await pipe.execute()
+        return list(models)
+
+
+class MessageEventStream:
+    """
+    Emits the events of a message in order, coalescing its content updates.
+
+    A content update (the whole serialized content of the message) is held
+    for `interval` seconds and only the latest one is sent, as a delta of the
+    text appended since the previous one when the content only grew. Any
+    other event sends the held update before it.
+
+    At most one event of the message is being emitted at a time: updates that
+    arrive meanwhile are merged, and the next one waits at least as long as
+    the last emit took, so a slow client or manager gets fewer, larger ones.
+    """
+
+    def __init__(self, emit: Callable[[dict], Awaitable], interval: float):
+        self.emit_func = emit
+        self.interval = interval
+        self.window = interval
+
+        self.lock = asyncio.Lock()
+        self.flush_task: Optional[asyncio.Task] = None
+
+        # Held content, and the content the clients have, if known
+        self.content: Optional[str] = None
+        self.sent_content: Optional[str] = None
+
+    async def update_content(self, content: str):
+        self.content = content
+        if self.interval <= 0:
+            await self.flush()
+        elif self.flush_task is None:
+            self.flush_task = asyncio.create_task(self._flush_later())
+
+    async def _flush_later(self):
         try:
-            return self[key]
-        except KeyError:
-            return default
-
-    def clear(self):
-        self.redis.delete(self.name)
-
-    def update(self, other=None, **kwargs):
-        if other is not None:
-            for k, v in other.items() if hasattr(other, "items") else other:
-                self[k] = v
-        for k, v in kwargs.items():
-            self[k] = v
-
-    def setdefault(self, key, default=None):
-        if key not in self:
-            self[key] = default
-        return self[key]
+            while self.content is not None:
+                await asyncio.sleep(self.window)
+                await self.flush()
+        except Exception as e:
+            log.warning(f"Failed to emit message content: {e}")
+        finally:
+            self.flush_task = None
+
+    async def flush(self):
+        async with self.lock:
+            content, self.content = self.content, None
+            if content is None or content == self.sent_content:
+                return
+
+            if self.sent_content and content.startswith(self.sent_content):
+                # Appended to the message by the clients, as a stream delta
+                data = {
+                    "choices": [
+                        {"delta": {"content": content[len(self.sent_content) :]}}
+                    ]
+                }
+            else:
+                data = {"content": content}
+
+            await self._emit({"type": "chat:completion", "data": data})
+            self.sent_content = content
+
+    async def emit(self, event: dict):
+        event_type = event.get("type")
+        data = event.get("data")
+        if not isinstance(data, dict):
+            data = {}
+
+        if event_type == "chat:completion" and data.get("content"):
+            # Replaces the content, the held update is outdated
+            self.content = None
+        else:
+            await self.flush()
+
+        async with self.lock:
+            await self._emit(event)
+
+            if event_type == "chat:completion":
+                if data.get("content"):
+                    self.sent_content = data["content"]
+                elif data.get("choices"):
+                    self.sent_content = None
+            elif event_type in (
+                "message",
+                "chat:message:delta",
+                "replace",
+                "chat:message",
+            ):
+                self.sent_content = None
+
+    async def _emit(self, event: dict):
+        started_at = time.monotonic()
+        await self.emit_func(event)
+        self.window = max(self.interval, time.monotonic() - started_at)
@@ -0,0 +1,191 @@
+import logging
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from contextlib import closing, contextmanager
+from pathlib import Path
+from typing import Callable, Optional
+
+from open_webui.config import CACHE_DIR, STORAGE_CACHE_MAX_SIZE_MB
+from open_webui.env import SRC_LOG_LEVELS
+
+log = logging.getLogger(__name__)
+log.setLevel(SRC_LOG_LEVELS["MAIN"])
+
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS entries (
+    path TEXT PRIMARY KEY,
+    validator TEXT,
+    size INTEGER,
+    accessed_at REAL
+);
+CREATE INDEX IF NOT EXISTS entries_accessed_at_idx ON entries (accessed_at);
+"""
+
+# Seconds after its last access during which a copy is not evicted, as the
+# caller of `get` may still be reading it
+EVICTION_GRACE_PERIOD = 60
+
+
+class StorageCache:
+    """
+    Local copies of remote storage objects, bounded to `max_size` bytes.
+
+    Each copy is recorded by path in a SQLite index (shared by all workers)
+    with the validator of the object it was made from (an ETag or a
+    generation).
+    `get` only downloads an object again when its validator changed or its
+    copy is gone; concurrent downloads of the same object within a worker
+    wait for the first one. Once the copies outgrow `max_size`, the least
+    recently used ones are removed, except those being downloaded or used in
+    the last EVICTION_GRACE_PERIOD seconds.
+    """
+
+    def __init__(self, index_path: Path, max_size: int):
+        self.index_path = index_path
+        self.max_size = max_size
+
+        self._lock = threading.Lock()
+        self._download_locks: dict[str, tuple[threading.Lock, int]] = {}
+
+        try:
+            self.index_path.parent.mkdir(parents=True, exist_ok=True)
+            with closing(self._connect()) as conn, conn:
+                conn.executescript(SCHEMA)
+        except Exception as e:
+            log.warning(f"Failed to open storage cache index: {e}")
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.index_path, timeout=30)
+        conn.execute("PRAGMA journal_mode=WAL")
+        return conn
+
+    @contextmanager
+    def _download_lock(self, path: str):
+        with self._lock:
+            lock, users = self._download_locks.get(path, (threading.Lock(), 0))
+            self._download_locks[path] = (lock, users + 1)
+
+        try:
+            with lock:
+                yield
+        finally:
+            with self._lock:
+                lock, users = self._download_locks[path]
+                if users > 1:
+                    self._download_locks[path] = (lock, users - 1)
+                else:
+                    del self._download_locks[path]
+
+    def get(
+        self,
+        path: str,
+        validator: Optional[str],
+        download: Callable[[str], None],
+    ) -> str:
+        """
+        Return `path`, calling `download(tmp_path)` to fetch the object into it
+        first when the copy is missing or was made from another `validator`.
+        An object without a validator is always downloaded.
+        """
+        with self._download_lock(path):
+            if validator is not None and self._is_fresh(path, validator):
+                return path
+
+            tmp_path = f"{path}.{uuid.uuid4().hex}.tmp"
+            try:
+                download(tmp_path)
+                os.replace(tmp_path, path)
+            finally:
+                if os.path.exists(tmp_path):
+                    os.remove(tmp_path)
+
+            self.add(path, validator)
+        return path
+
+    def _is_fresh(self, path: str, validator: str) -> bool:
+        try:
+            with closing(self._connect()) as conn, conn:
+                row = conn.execute(
+                    "SELECT validator FROM entries WHERE path = ?", (path,)
+                ).fetchone()
+                if row is None or row[0] != validator or not os.path.isfile(path):
+                    return False
+
+                conn.execute(
+                    "UPDATE entries SET accessed_at = ? WHERE path = ?",
+                    (time.time(), path),
+                )
+                return True
+        except Exception as e:
+            log.warning(f"Failed to read storage cache index: {e}")
+            return False
+
+    def add(self, path: str, validator: Optional[str]):
+        """Record the copy at `path` and evict what no longer fits."""
+        try:
+            with closing(self._connect()) as conn, conn:
+                conn.execute(
+                    "INSERT OR REPLACE INTO entries (path, validator, size, accessed_at) VALUES (?, ?, ?, ?)",
+                    (path, validator, os.path.getsize(path), time.time()),
+                )
+            self.evict(keep=path)
+        except Exception as e:
+            log.warning(f"Failed to update storage cache index: {e}")
+
+    def remove(self, path: Optional[str] = None):
+        """Forget the copy at `path`, or every copy when no path is given."""
+        try:
+            with closing(self._connect()) as conn, conn:
+                if path is None:
+                    conn.execute("DELETE FROM entries")
+                else:
+                    conn.execute("DELETE FROM entries WHERE path = ?", (path,))
+        except Exception as e:
+            log.warning(f"Failed to update storage cache index: {e}")
+
+    def evict(self, keep: Optional[str] = None):
+        if self.max_size <= 0:
+            return
+
+        with closing(self._connect()) as conn, conn:
+            (total,) = conn.execute(
+                "SELECT COALESCE(SUM(size), 0) FROM entries"
+            ).fetchone()
+            if total <= self.max_size:
+                return
+
+            with self._lock:
+                downloading = set(self._download_locks)
+
+            evicted = []
+            for path, size in conn.execute(
+                "SELECT path, size FROM entries WHERE accessed_at < ? ORDER BY accessed_at",
+                (time.time() - EVICTION_GRACE_PERIOD,),
+            ).fetchall():
+                if total <= self.max_size:
+                    break
+                if path == keep or path in downloading:
+                    continue
+
+                try:
+                    if os.path.isfile(path):
+                        os.remove(path)
+                except OSError as e:
+                    log.warning(f"Failed to remove {path} from the storage cache: {e}")
+                    continue
+
+                evicted.append((path,))
+                total -= size or 0
+
+            conn.executemany("DELETE FROM entries WHERE path = ?", evicted)
+            log.debug(f"Evicted {len(evicted)} objects from the storage cache")
+
+
+STORAGE_CACHE = StorageCache(
+    CACHE_DIR / "storage" / "index.db",
+    STORAGE_CACHE_MAX_SIZE_MB * 1024 * 1024,
+)
@@ -1,12 +1,14 @@
 import os
 import shutil
 import json
+import hashlib
 import logging
 import re
 from abc import ABC, abstractmethod
 from typing import BinaryIO, Tuple, Dict
 
 import boto3
+from boto3.s3.transfer import TransferConfig
 from botocore.config import Config
 from botocore.exceptions import ClientError
 from open_webui.config import (
@@ -30,6 +32,7 @@ from open_webui.config import (
 from google.cloud import storage
 from google.cloud.exceptions import GoogleCloudError, NotFound
 from open_webui.constants import ERROR_MESSAGES
+from open_webui.storage.cache import STORAGE_CACHE
 from azure.identity import DefaultAzureCredential
 from azure.storage.blob import BlobServiceClient
 from azure.core.exceptions import ResourceNotFoundError
@@ -39,6 +42,9 @@ from open_webui.env import SRC_LOG_LEVELS
 log = logging.getLogger(__name__)
 log.setLevel(SRC_LOG_LEVELS["MAIN"])
 
+# Uploads are read, hashed and sent to remote storage in parts of this size
+UPLOAD_CHUNK_SIZE = 8 * 1024 * 1024
+
 
 class StorageProvider(ABC):
     @abstractmethod
@@ -51,6 +57,18 @@ class StorageProvider(ABC):
     ) -> Tuple[bytes, str]:
         pass
 
+    def upload_file_stream(
+        self, file: BinaryIO, filename: str, tags: Dict[str, str]
+    ) -> Tuple[int, str, str]:
+        """
+        Upload a file without holding it in memory; returns its size, its
+        SHA-256 hex digest and its storage path.
+
+        Remote providers spool the file to local storage first (they keep a
+        local copy anyway) and upload it from there in parts.
+        """
+        return LocalStorageProvider.upload_file_stream(file, filename, tags)
+
     @abstractmethod
     def delete_all_files(self) -> None:
         pass
@@ -73,6 +91,25 @@ class LocalStorageProvider(StorageProvider):
             f.write(contents)
         return contents, file_path
 
+    @staticmethod
+    def upload_file_stream(
+        file: BinaryIO, filename: str, tags: Dict[str, str]
+    ) -> Tuple[int, str, str]:
+        file_path = f"{UPLOAD_DIR}/{filename}"
+        size = 0
+        sha256 = hashlib.sha256()
+
+        with open(file_path, "wb") as f:
+            while chunk := file.read(UPLOAD_CHUNK_SIZE):
+                f.write(chunk)
+                sha256.update(chunk)
+                size += len(chunk)
+
+        if not size:
+            os.remove(file_path)
+            raise ValueError(ERROR_MESSAGES.EMPTY_CONTENT)
+        return size, sha256.hexdigest(), file_path
+
     @staticmethod
     def get_file(file_path: str) -> str:
         """Handles downloading of the file from local storage."""
@@ -146,10 +183,31 @@ class S3StorageProvider(StorageProvider):
         self, file: BinaryIO, filename: str, tags: Dict[str, str]
     ) -> Tuple[bytes, str]:
         """Handles uploading of the file to S3 storage."""
-        _, file_path = LocalStorageProvider.upload_file(file, filename, tags)
+        contents, file_path = LocalStorageProvider.upload_file(file, filename, tags)
+        return contents, self._upload_to_s3(file_path, filename, tags)
+
+    def upload_file_stream(
+        self, file: BinaryIO, filename: str, tags: Dict[str, str]
+    ) -> Tuple[int, str, str]:
+        """Handles uploading of the file to S3 storage, in multipart chunks."""
+        size, sha256, file_path = LocalStorageProvider.upload_file_stream(
+            file, filename, tags
+        )
+        return size, sha256, self._upload_to_s3(file_path, filename, tags)
+
+    def _upload_to_s3(self, file_path: str, filename: str, tags: Dict[str, str]):
         s3_key = os.path.join(self.key_prefix, filename)
         try:
-            self.s3_client.upload_file(file_path, self.bucket_name, s3_key)
+            # Files larger than a chunk are sent as a multipart upload
+            self.s3_client.upload_file(
+                file_path,
+                self.bucket_name,
+                s3_key,
+                Config=TransferConfig(
+                    multipart_threshold=UPLOAD_CHUNK_SIZE,
+                    multipart_chunksize=UPLOAD_CHUNK_SIZE,
+                ),
+            )
             if S3_ENABLE_TAGGING and tags:
                 sanitized_tags = {
                     self.sanitize_tag_value(k): self.sanitize_tag_value(v)
@@ -165,10 +223,11 @@ class S3StorageProvider(StorageProvider):
                     Key=s3_key,
                     Tagging=tagging,
                 )
-            return (
-                open(file_path, "rb").read(),
-                f"s3://{self.bucket_name}/{s3_key}",
-            )
+
+            # The local copy is already current, don't download it on first read
+            head = self.s3_client.head_object(Bucket=self.bucket_name, Key=s3_key)
+            STORAGE_CACHE.add(file_path, head["ETag"])
+            return f"s3://{self.bucket_name}/{s3_key}"
         except ClientError as e:
             raise RuntimeError(f"Error uploading file to S3: {e}")
 
@@ -176,9 +235,14 @@ class S3StorageProvider(StorageProvider):
         """Handles downloading of the file from S3 storage."""
         try:
             s3_key = self._extract_s3_key(file_path)
-            local_file_path = self._get_local_file_path(s3_key)
-            self.s3_client.download_file(self.bucket_name, s3_key, local_file_path)
-            return local_file_path
+            head = self.s3_client.head_object(Bucket=self.bucket_name, Key=s3_key)
+            return STORAGE_CACHE.get(
+                self._get_local_file_path(s3_key),
+                head["ETag"],
+                lambda path: self.s3_client.download_file(
+                    self.bucket_name, s3_key, path
+                ),
+            )
         except ClientError as e:
             raise RuntimeError(f"Error downloading file from S3: {e}")
 
@@ -191,6 +255,7 @@ class S3StorageProvider(StorageProvider):
             raise RuntimeError(f"Error deleting file from S3: {e}")
 
         # Always delete from local storage
+        STORAGE_CACHE.remove(self._get_local_file_path(s3_key))
         LocalStorageProvider.delete_file(file_path)
 
     def delete_all_files(self) -> None:
@@ -210,6 +275,7 @@ class S3StorageProvider(StorageProvider):
             raise RuntimeError(f"Error deleting all files from S3: {e}")
 
         # Always delete from local storage
+        STORAGE_CACHE.remove()
         LocalStorageProvider.delete_all_files()
 
     # The s3 key is the name assigned to an object. It excludes the bucket name, but includes the internal path and the file name.
@@ -243,19 +309,39 @@ class GCSStorageProvider(StorageProvider):
         try:
             blob = self.bucket.blob(filename)
             blob.upload_from_filename(file_path)
+            STORAGE_CACHE.add(file_path, str(blob.generation))
             return contents, "gs://" + self.bucket_name + "/" + filename
         except GoogleCloudError as e:
             raise RuntimeError(f"Error uploading file to GCS: {e}")
 
+    def upload_file_stream(
+        self, file: BinaryIO, filename: str, tags: Dict[str, str]
+    ) -> Tuple[int, str, str]:
+        """Handles uploading of the file to GCS storage, as a resumable upload."""
+        size, sha256, file_path = LocalStorageProvider.upload_file_stream(
+            file, filename, tags
+        )
+        try:
+            # A chunk size makes the client send the file in resumable parts
+            blob = self.bucket.blob(filename, chunk_size=UPLOAD_CHUNK_SIZE)
+            blob.upload_from_filename(file_path)
+            STORAGE_CACHE.add(file_path, str(blob.generation))
+            return size, sha256, "gs://" + self.bucket_name + "/" + filename
+        except GoogleCloudError as e:
+            raise RuntimeError(f"Error uploading file to GCS: {e}")
+
     def get_file(self, file_path: str) -> str:
         """Handles downloading of the file from GCS storage."""
         try:
             filename = file_path.removeprefix("gs://").split("/")[1]
             local_file_path = f"{UPLOAD_DIR}/{filename}"
             blob = self.bucket.get_blob(filename)
-            blob.download_to_filename(local_file_path)
 
-            return local_file_path
+            return STORAGE_CACHE.get(
+                local_file_path,
+                str(blob.generation),
+                blob.download_to_filename,
+            )
         except NotFound as e:
             raise RuntimeError(f"Error downloading file from GCS: {e}")
 
@@ -269,6 +355,7 @@ class GCSStorageProvider(StorageProvider):
             raise RuntimeError(f"Error deleting file from GCS: {e}")
 
         # Always delete from local storage
+        STORAGE_CACHE.remove(f"{UPLOAD_DIR}/{filename}")
         LocalStorageProvider.delete_file(file_path)
 
     def delete_all_files(self) -> None:
@@ -283,6 +370,7 @@ class GCSStorageProvider(StorageProvider):
             raise RuntimeError(f"Error deleting all files from GCS: {e}")
 
         # Always delete from local storage
+        STORAGE_CACHE.remove()
         LocalStorageProvider.delete_all_files()
 
 
@@ -314,20 +402,44 @@ class AzureStorageProvider(StorageProvider):
         contents, file_path = LocalStorageProvider.upload_file(file, filename, tags)
         try:
             blob_client = self.container_client.get_blob_client(filename)
-            blob_client.upload_blob(contents, overwrite=True)
+            blob = blob_client.upload_blob(contents, overwrite=True)
+            STORAGE_CACHE.add(file_path, blob["etag"])
             return contents, f"{self.endpoint}/{self.container_name}/{filename}"
         except Exception as e:
             raise RuntimeError(f"Error uploading file to Azure Blob Storage: {e}")
 
+    def upload_file_stream(
+        self, file: BinaryIO, filename: str, tags: Dict[str, str]
+    ) -> Tuple[int, str, str]:
+        """Handles uploading of the file to Azure Blob Storage, in blocks."""
+        size, sha256, file_path = LocalStorageProvider.upload_file_stream(
+            file, filename, tags
+        )
+        try:
+            blob_client = self.container_client.get_blob_client(filename)
+            # Uploading from a stream stages it block by block
+            with open(file_path, "rb") as f:
+                blob = blob_client.upload_blob(
+                    f, length=size, overwrite=True, max_concurrency=4
+                )
+            STORAGE_CACHE.add(file_path, blob["etag"])
+            return size, sha256, f"{self.endpoint}/{self.container_name}/{filename}"
+        except Exception as e:
+            raise RuntimeError(f"Error uploading file to Azure Blob Storage: {e}")
+
     def get_file(self, file_path: str) -> str:
         """Handles downloading of the file from Azure Blob Storage."""
         try:
             filename = file_path.split("/")[-1]
             local_file_path = f"{UPLOAD_DIR}/{filename}"
             blob_client = self.container_client.get_blob_client(filename)
-            with open(local_file_path, "wb") as download_file:
-                download_file.write(blob_client.download_blob().readall())
-            return local_file_path
+            etag = blob_client.get_blob_properties().etag
+
+            def download(path: str):
+                with open(path, "wb") as download_file:
+                    download_file.write(blob_client.download_blob().readall())
+
+            return STORAGE_CACHE.get(local_file_path, etag, download)
         except ResourceNotFoundError as e:
             raise RuntimeError(f"Error downloading file from Azure Blob Storage: {e}")
 
@@ -341,6 +453,7 @@ class AzureStorageProvider(StorageProvider):
             raise RuntimeError(f"Error deleting file from Azure Blob Storage: {e}")
 
         # Always delete from local storage
+        STORAGE_CACHE.remove(f"{UPLOAD_DIR}/{filename}")
         LocalStorageProvider.delete_file(file_path)
 
     def delete_all_files(self) -> None:
@@ -353,6 +466,7 @@ class AzureStorageProvider(StorageProvider):
             raise RuntimeError(f"Error deleting all files from Azure Blob Storage: {e}")
 
         # Always delete from local storage
+        STORAGE_CACHE.remove()
         LocalStorageProvider.delete_all_files()
 
 
@@ -0,0 +1,41 @@
+from unittest.mock import MagicMock
+
+from open_webui.retrieval.vector.dbs import milvus
+
+
+def mock_milvus_client():
+    client = milvus.MilvusClient.__new__(milvus.MilvusClient)
+    client.collection_prefix = "open_webui"
+    client.client = MagicMock()
+    return client
+
+
+def test_get_vectors_hyphenated_collection_name():
+    client = mock_milvus_client()
+    client.client.has_collection.return_value = True
+    client.client.get.return_value = [
+        {"id": "a", "vector": [0.1, 0.2]},
+        {"id": "b", "vector": [0.3, 0.4]},
+    ]
+
+    vectors = client.get_vectors(
+        "file-3f2a9c1e-0d4b-4c1a-9e1f-2b6d8c7a5e10", ["a", "b"]
+    )
+
+    assert vectors == {"a": [0.1, 0.2], "b": [0.3, 0.4]}
+    client.client.has_collection.assert_called_once_with(
+        collection_name="open_webui_file_3f2a9c1e_0d4b_4c1a_9e1f_2b6d8c7a5e10"
+    )
+    client.client.get.assert_called_once_with(
+        collection_name="open_webui_file_3f2a9c1e_0d4b_4c1a_9e1f_2b6d8c7a5e10",
+        ids=["a", "b"],
+        output_fields=["id", "vector"],
+    )
+
+
+def test_get_vectors_missing_collection():
+    client = mock_milvus_client()
+    client.client.has_collection.return_value = False
+
+    assert client.get_vectors("file-missing", ["a"]) is None
+    client.client.get.assert_not_called()
@@ -0,0 +1,89 @@
+import asyncio
+
+from open_webui.socket.utils import MessageEventStream
+
+
+def run_stream(steps):
+    """Run `steps(stream)` on a stream that holds content for a long time."""
+    events = []
+
+    async def emit(event):
+        events.append(event)
+
+    async def main():
+        await steps(MessageEventStream(emit, interval=60))
+
+    asyncio.run(main())
+    return events
+
+
+def content_event(content):
+    return {"type": "chat:completion", "data": {"content": content}}
+
+
+def delta_event(content):
+    return {
+        "type": "chat:completion",
+        "data": {"choices": [{"delta": {"content": content}}]},
+    }
+
+
+def test_held_content_is_sent_before_other_events():
+    status = {"type": "status", "data": {"description": "Searching"}}
+
+    async def steps(stream):
+        await stream.update_content("Hel")
+        await stream.update_content("Hello")
+        await stream.emit(status)
+
+    assert run_stream(steps) == [content_event("Hello"), status]
+
+
+def test_content_event_replaces_held_content():
+    final = {"type": "chat:completion", "data": {"content": "Hello!", "done": True}}
+
+    async def steps(stream):
+        await stream.update_content("Hello")
+        await stream.emit(final)
+        # Nothing is held anymore
+        await stream.flush()
+        await stream.update_content("Hello! Bye")
+        await stream.flush()
+
+    assert run_stream(steps) == [final, delta_event(" Bye")]
+
+
+def test_content_is_sent_whole_unless_it_was_appended_to():
+    async def steps(stream):
+        await stream.update_content("Hello")
+        await stream.flush()
+        await stream.update_content("Hello world")
+        await stream.flush()
+        await stream.update_content("Goodbye")
+        await stream.flush()
+        # Already sent
+        await stream.update_content("Goodbye")
+        await stream.flush()
+
+    assert run_stream(steps) == [
+        content_event("Hello"),
+        delta_event(" world"),
+        content_event("Goodbye"),
+    ]
+
+
+def test_replaced_message_is_sent_whole():
+    replace = {"type": "replace", "data": {"content": "Hi"}}
+
+    async def steps(stream):
+        await stream.update_content("Hello")
+        await stream.flush()
+        await stream.emit(replace)
+        await stream.update_content("Hello world")
+        await stream.flush()
+
+    assert run_stream(steps) == [
+        content_event("Hello"),
+        replace,
+        content_event("Hello world"),
+    ]
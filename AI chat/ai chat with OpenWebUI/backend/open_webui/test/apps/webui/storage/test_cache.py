@@ -0,0 +1,46 @@
+import sqlite3
+import time
+from contextlib import closing
+
+from open_webui.storage.cache import EVICTION_GRACE_PERIOD, StorageCache
+
+
+def add_copy(cache, path, size, accessed_at):
+    """Record a copy last used at `accessed_at`, before anything is evicted."""
+    path.write_bytes(b"x" * size)
+    cache.add(str(path), "v1")
+    with closing(sqlite3.connect(cache.index_path)) as conn, conn:
+        conn.execute(
+            "UPDATE entries SET accessed_at = ? WHERE path = ?",
+            (accessed_at, str(path)),
+        )
+
+
+def test_evict_skips_recently_used_copies(tmp_path):
+    cache = StorageCache(tmp_path / "index.db", max_size=0)
+    old = time.time() - EVICTION_GRACE_PERIOD - 10
+
+    add_copy(cache, tmp_path / "a", 40, old)
+    add_copy(cache, tmp_path / "b", 40, old + 1)
+    # Just returned by `get`, its caller may still be reading it
+    add_copy(cache, tmp_path / "c", 40, time.time())
+    cache.max_size = 100
+    cache.evict()
+
+    assert not (tmp_path / "a").exists()
+    assert (tmp_path / "b").exists()
+    assert (tmp_path / "c").exists()
+
+
+def test_evict_skips_copies_being_downloaded(tmp_path):
+    cache = StorageCache(tmp_path / "index.db", max_size=0)
+    old = time.time() - EVICTION_GRACE_PERIOD - 10
+
+    add_copy(cache, tmp_path / "a", 40, old)
+    add_copy(cache, tmp_path / "b", 40, old + 1)
+    cache.max_size = 50
+    with cache._download_lock(str(tmp_path / "a")):
+        cache.evict()
+
+    assert (tmp_path / "a").exists()
+    assert not (tmp_path / "b").exists()
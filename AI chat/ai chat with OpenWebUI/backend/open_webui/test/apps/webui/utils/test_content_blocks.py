@@ -0,0 +1,125 @@
+import random
+import re
+
+from open_webui.utils.content_blocks import ContentBlockSerializer, TagSearch
+
+
+def stream_content_blocks():
+    """Yield the content blocks of a message after each streamed change."""
+    blocks = [{"type": "text", "content": ""}]
+    for chunk in ["Let me ", "check.", "\n"]:
+        blocks[-1]["content"] += chunk
+        yield blocks
+
+    blocks.append(
+        {
+            "type": "reasoning",
+            "start_tag": "think",
+            "end_tag": "/think",
+            "content": "",
+        }
+    )
+    for chunk in ["First", " line\n", "> quoted\n", "\n", "last", " one"]:
+        blocks[-1]["content"] += chunk
+        yield blocks
+    blocks[-1]["duration"] = 3
+    yield blocks
+
+    blocks.append(
+        {
+            "type": "tool_calls",
+            "content": [
+                {
+                    "id": "call_1",
+                    "function": {"name": "search", "arguments": '{"q": "a & b"}'},
+                }
+            ],
+        }
+    )
+    yield blocks
+    blocks[-1]["results"] = [{"tool_call_id": "call_1", "content": "<found>"}]
+    yield blocks
+
+    blocks.append({"type": "text", "content": "Result:\n```"})
+    yield blocks
+    blocks.append(
+        {
+            "type": "code_interpreter",
+            "attributes": {"lang": "python"},
+            "content": "print(1)",
+        }
+    )
+    yield blocks
+    blocks[-1]["output"] = {"stdout": "1"}
+    yield blocks
+
+    blocks.append({"type": "text", "content": ""})
+    for chunk in ["Done", "."]:
+        blocks[-1]["content"] += chunk
+        yield blocks
+
+    # Blocks replaced rather than appended to
+    blocks[0] = {"type": "text", "content": "Let me look."}
+    yield blocks
+    del blocks[-2:]
+    yield blocks
+
+
+def test_serialize_matches_a_fresh_serializer():
+    for raw in [False, True]:
+        serializer = ContentBlockSerializer()
+        for blocks in stream_content_blocks():
+            assert serializer.serialize(blocks, raw) == (
+                ContentBlockSerializer().serialize(blocks, raw)
+            )
+
+
+def test_serialize_reasoning():
+    blocks = [
+        {
+            "type": "reasoning",
+            "start_tag": "think",
+            "end_tag": "/think",
+            "content": "",
+        }
+    ]
+    serializer = ContentBlockSerializer()
+    for chunk in ["a\n", ">b", "\n", "c"]:
+        blocks[0]["content"] += chunk
+        content = serializer.serialize(blocks)
+
+    assert content == (
+        '<details type="reasoning" done="false">\n'
+        "<summary>Thinking…</summary>\n"
+        "> a\n"
+        ">b\n"
+        "> c\n"
+        "</details>"
+    )
+    assert serializer.serialize(blocks, raw=True) == "<think>a\n>b\nc</think>"
+
+
+def test_tag_search_matches_a_full_search():
+    rng = random.Random(0)
+    tags = ["think", "reason", "code_interpreter"]
+    pieces = ["<", ">", "\n", " ", "/", "x", "think", "reason", 'a="1"']
+
+    for _ in range(200):
+        tag = rng.choice(tags)
+        patterns = [
+            (rf"<{re.escape(tag)}(\s.*?)?>", f"<{tag}"),
+            (rf"<{re.escape('/' + tag)}>", f"</{tag}>"),
+        ]
+
+        tag_search = TagSearch()
+        content = ""
+        for _ in range(60):
+            content += "".join(rng.choice(pieces) for _ in range(rng.randint(1, 4)))
+            for pattern, literal in patterns:
+                match = tag_search.search(pattern, literal, content)
+                expected = re.search(pattern, content)
+                assert (match and match.span()) == (expected and expected.span())
+
+            if rng.random() < 0.05:
+                # The content is not always only appended to
+                content = content[: rng.randint(0, len(content))]
@@ -1,4 +1,4 @@
-from typing import Optional, Union, List, Dict, Any
+from typing import Optional, Union, List, Dict, Any, Set
 from open_webui.models.users import Users, UserModel
 from open_webui.models.groups import Groups
 
@@ -111,21 +111,45 @@ def has_access(
     user_id: str,
     type: str = "write",
     access_control: Optional[dict] = None,
+    user_group_ids: Optional[Set[str]] = None,
 ) -> bool:
+    """
+    Pass `user_group_ids` when checking many resources for the same user so the
+    groups are looked up once.
+    """
     if access_control is None:
         return type == "read"
 
-    user_groups = Groups.get_groups_by_member_id(user_id)
-    user_group_ids = [group.id for group in user_groups]
+    if user_group_ids is None:
+        user_group_ids = Groups.get_group_ids_by_member_id(user_id)
     permission_access = access_control.get(type, {})
     permitted_group_ids = permission_access.get("group_ids", [])
     permitted_user_ids = permission_access.get("user_ids", [])
 
-    return user_id in permitted_user_ids or any(
-        group_id in permitted_group_ids for group_id in user_group_ids
+    return user_id in permitted_user_ids or not user_group_ids.isdisjoint(
+        permitted_group_ids
     )
 
 
+def get_accessible_model_ids(
+    user_id: str, model_ids: List[str], type: str = "read"
+) -> Set[str]:
+    """
+    Evaluate access to a whole list of models with one group lookup and one
+    model query. Models without a database entry are not accessible.
+    """
+    from open_webui.models.models import Models
+
+    user_group_ids = Groups.get_group_ids_by_member_id(user_id)
+
+    return {
+        model.id
+        for model in Models.get_models_by_ids(model_ids)
+        if user_id == model.user_id
+        or has_access(user_id, type, model.access_control, user_group_ids)
+    }
+
+
 # Get all users with access to a resource
 def get_users_with_access(
     type: str = "write", access_control: Optional[dict] = None
@@ -16,6 +16,7 @@ from typing import Optional, Union, List, Dict
 from opentelemetry import trace
 
 from open_webui.models.users import Users
+from open_webui.utils.user_activity import LAST_ACTIVE_WRITER
 
 from open_webui.constants import ERROR_MESSAGES
 from open_webui.env import (
@@ -218,7 +219,7 @@ def get_current_user(
         )
 
     if data is not None and "id" in data:
-        user = Users.get_user_by_id(data["id"])
+        user = Users.get_cached_user_by_id(data["id"])
         if user is None:
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
@@ -233,10 +234,9 @@ def get_current_user(
                 current_span.set_attribute("client.user.role", user.role)
                 current_span.set_attribute("client.auth.type", "jwt")
 
-            # Refresh the user's last active timestamp asynchronously
-            # to prevent blocking the request
-            if background_tasks:
-                background_tasks.add_task(Users.update_user_last_active_by_id, user.id)
+            # Refresh the user's last active timestamp; writes are batched
+            # and happen at most once per interval for each user
+            LAST_ACTIVE_WRITER.touch(user.id)
         return user
     else:
         raise HTTPException(
@@ -246,7 +246,7 @@ def get_current_user(
 
 
 def get_current_user_by_api_key(api_key: str):
-    user = Users.get_user_by_api_key(api_key)
+    user = Users.get_cached_user_by_api_key(api_key)
 
     if user is None:
         raise HTTPException(
@@ -262,7 +262,7 @@ def get_current_user_by_api_key(api_key: str):
             current_span.set_attribute("client.user.role", user.role)
             current_span.set_attribute("client.auth.type", "api_key")
 
-        Users.update_user_last_active_by_id(user.id)
+        LAST_ACTIVE_WRITER.touch(user.id)
 
     return user
 
@@ -0,0 +1,230 @@
+import html
+import json
+import re
+from typing import Optional
+
+
+def split_content_and_whitespace(content):
+    content_stripped = content.rstrip()
+    original_whitespace = (
+        content[len(content_stripped) :] if len(content) > len(content_stripped) else ""
+    )
+    return content_stripped, original_whitespace
+
+
+def is_opening_code_block(content):
+    backtick_segments = content.split("```")
+    # Even number of segments means the last backticks are opening a new block
+    return len(backtick_segments) > 1 and len(backtick_segments) % 2 == 0
+
+
+def quote_line(line: str) -> str:
+    return f"> {line}" if not line.startswith(">") else line
+
+
+class ContentBlockSerializer:
+    """
+    Serializes the content blocks of a streamed message into its content.
+
+    The content serialized up to each block is kept, so serializing the
+    blocks again only renders the blocks from the first one that changed (in
+    a stream, the last one). The quoted lines of a reasoning block are kept
+    too and only its new lines are quoted.
+    """
+
+    def __init__(self):
+        # Per `raw`, a (block, fingerprint, content up to the block) per block
+        self.rendered: dict[bool, list[tuple[dict, tuple, str]]] = {
+            False: [],
+            True: [],
+        }
+        # Per reasoning block id, (block, quoted source, quoted lines, any line)
+        self.quoted: dict[int, tuple[dict, str, str, bool]] = {}
+
+    @staticmethod
+    def fingerprint(block: dict) -> tuple:
+        if block["type"] == "text":
+            return ("text", block["content"])
+        elif block["type"] == "reasoning":
+            return (
+                "reasoning",
+                block["content"],
+                block.get("duration", None),
+                block.get("start_tag"),
+                block.get("end_tag"),
+            )
+        # Tool calls and code are small and changed in place
+        return (block["type"], json.dumps(block, default=str))
+
+    def serialize(self, content_blocks: list[dict], raw: bool = False) -> str:
+        rendered = self.rendered[raw]
+        content = ""
+
+        for idx, block in enumerate(content_blocks):
+            fingerprint = self.fingerprint(block)
+            if (
+                idx < len(rendered)
+                and rendered[idx][0] is block
+                and rendered[idx][1] == fingerprint
+            ):
+                content = rendered[idx][2]
+                continue
+
+            del rendered[idx:]
+            content = self.serialize_block(block, content, raw)
+            rendered.append((block, fingerprint, content))
+
+        del rendered[len(content_blocks) :]
+        return content.strip()
+
+    def _quote_reasoning(self, block: dict) -> str:
+        source = block["content"]
+
+        # Only the complete lines are kept, the last one may still grow
+        cached = self.quoted.get(id(block))
+        if cached is not None and cached[0] is block and source.startswith(cached[1]):
+            _, head, quoted, has_lines = cached
+        else:
+            head, quoted, has_lines = "", "", False
+
+        end = source.rfind("\n") + 1
+        if end > len(head):
+            lines = [quote_line(line) for line in source[len(head) : end].splitlines()]
+            quoted = "\n".join(([quoted] if has_lines else []) + lines)
+            has_lines = has_lines or bool(lines)
+            head = source[:end]
+            self.quoted[id(block)] = (block, head, quoted, has_lines)
+
+        tail = [quote_line(line) for line in source[end:].splitlines()]
+        return "\n".join(([quoted] if has_lines else []) + tail)
+
+    def serialize_block(self, block: dict, content: str, raw: bool = False) -> str:
+        """Append `block` to the content serialized so far."""
+        if block["type"] == "text":
+            content = f"{content}{block['content'].strip()}\n"
+        elif block["type"] == "tool_calls":
+            attributes = block.get("attributes", {})
+
+            tool_calls = block.get("content", [])
+            results = block.get("results", [])
+
+            if results:
+
+                tool_calls_display_content = ""
+                for tool_call in tool_calls:
+
+                    tool_call_id = tool_call.get("id", "")
+                    tool_name = tool_call.get("function", {}).get("name", "")
+                    tool_arguments = tool_call.get("function", {}).get("arguments", "")
+
+                    tool_result = None
+                    tool_result_files = None
+                    for result in results:
+                        if tool_call_id == result.get("tool_call_id", ""):
+                            tool_result = result.get("content", None)
+                            tool_result_files = result.get("files", None)
+                            break
+
+                    if tool_result:
+                        tool_calls_display_content = f'{tool_calls_display_content}\n<details type="tool_calls" done="true" id="{tool_call_id}" name="{tool_name}" arguments="{html.escape(json.dumps(tool_arguments))}" result="{html.escape(json.dumps(tool_result))}" files="{html.escape(json.dumps(tool_result_files)) if tool_result_files else ""}">\n<summary>Tool Executed</summary>\n</details>\n'
+                    else:
+                        tool_calls_display_content = f'{tool_calls_display_content}\n<details type="tool_calls" done="false" id="{tool_call_id}" name="{tool_name}" arguments="{html.escape(json.dumps(tool_arguments))}">\n<summary>Executing...</summary>\n</details>'
+
+                if not raw:
+                    content = f"{content}\n{tool_calls_display_content}\n\n"
+            else:
+                tool_calls_display_content = ""
+
+                for tool_call in tool_calls:
+                    tool_call_id = tool_call.get("id", "")
+                    tool_name = tool_call.get("function", {}).get("name", "")
+                    tool_arguments = tool_call.get("function", {}).get("arguments", "")
+
+                    tool_calls_display_content = f'{tool_calls_display_content}\n<details type="tool_calls" done="false" id="{tool_call_id}" name="{tool_name}" arguments="{html.escape(json.dumps(tool_arguments))}">\n<summary>Executing...</summary>\n</details>'
+
+                if not raw:
+                    content = f"{content}\n{tool_calls_display_content}\n\n"
+
+        elif block["type"] == "reasoning":
+            reasoning_display_content = self._quote_reasoning(block) if not raw else ""
+
+            reasoning_duration = block.get("duration", None)
+
+            if reasoning_duration is not None:
+                if raw:
+                    content = f'{content}\n<{block["start_tag"]}>{block["content"]}<{block["end_tag"]}>\n'
+                else:
+                    content = f'{content}\n<details type="reasoning" done="true" duration="{reasoning_duration}">\n<summary>Thought for {reasoning_duration} seconds</summary>\n{reasoning_display_content}\n</details>\n'
+            else:
+                if raw:
+                    content = f'{content}\n<{block["start_tag"]}>{block["content"]}<{block["end_tag"]}>\n'
+                else:
+                    content = f'{content}\n<details type="reasoning" done="false">\n<summary>Thinking…</summary>\n{reasoning_display_content}\n</details>\n'
+
+        elif block["type"] == "code_interpreter":
+            attributes = block.get("attributes", {})
+            output = block.get("output", None)
+            lang = attributes.get("lang", "")
+
+            content_stripped, original_whitespace = split_content_and_whitespace(
+                content
+            )
+            if is_opening_code_block(content_stripped):
+                # Remove trailing backticks that would open a new block
+                content = content_stripped.rstrip("`").rstrip() + original_whitespace
+            else:
+                # Keep content as is - either closing backticks or no backticks
+                content = content_stripped + original_whitespace
+
+            if output:
+                output = html.escape(json.dumps(output))
+
+                if raw:
+                    content = f'{content}\n<code_interpreter type="code" lang="{lang}">\n{block["content"]}\n</code_interpreter>\n```output\n{output}\n```\n'
+                else:
+                    content = f'{content}\n<details type="code_interpreter" done="true" output="{output}">\n<summary>Analyzed</summary>\n```{lang}\n{block["content"]}\n```\n</details>\n'
+            else:
+                if raw:
+                    content = f'{content}\n<code_interpreter type="code" lang="{lang}">\n{block["content"]}\n</code_interpreter>\n'
+                else:
+                    content = f'{content}\n<details type="code_interpreter" done="false">\n<summary>Analyzing...</summary>\n```{lang}\n{block["content"]}\n```\n</details>\n'
+
+        else:
+            block_content = str(block["content"]).strip()
+            content = f"{content}{block['type']}: {block_content}\n"
+
+        return content
+
+
+class TagSearch:
+    """
+    Searches tags in the content of a streamed message, which grows by a
+    chunk at a time, without scanning it from the start again on each chunk.
+
+    Tags are matched by a pattern starting with a literal (`<tag`) and that
+    spans at most one line break. When a previous search found nothing in a
+    prefix of the content, a match can only start at the last occurrence of
+    the literal near its last line, or at its very end.
+    """
+
+    def __init__(self):
+        # Per pattern, the last content it was not found in
+        self.searched: dict[str, str] = {}
+
+    def search(self, pattern: str, literal: str, content: str) -> Optional[re.Match]:
+        start = 0
+
+        searched = self.searched.get(pattern)
+        if searched is not None and content.startswith(searched):
+            line_start = max(0, searched.rfind("\n") - len(literal))
+            idx = searched.find(literal, line_start)
+            start = (
+                idx if idx != -1 else max(line_start, len(searched) - len(literal) + 1)
+            )
+
+        match = re.compile(pattern).search(content, start)
+        if match:
+            self.searched.pop(pattern, None)
+        else:
+            self.searched[pattern] = content
+        return match
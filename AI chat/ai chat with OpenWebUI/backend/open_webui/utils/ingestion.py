@@ -0,0 +1,239 @@
+import asyncio
+import logging
+import threading
+import time
+from typing import Callable, Optional
+
+from fastapi import FastAPI, Request
+
+from open_webui.models.files import FileModel, Files
+from open_webui.models.ingestion_jobs import (
+    IngestionJobModel,
+    IngestionJobResponse,
+    IngestionJobs,
+)
+from open_webui.models.users import Users
+from open_webui.routers.audio import transcribe
+from open_webui.routers.retrieval import ProcessFileForm, process_file
+from open_webui.socket.main import sio
+from open_webui.storage.provider import Storage
+from open_webui.env import (
+    FILE_INGESTION_MAX_ATTEMPTS,
+    FILE_INGESTION_WORKERS,
+    SRC_LOG_LEVELS,
+)
+
+log = logging.getLogger(__name__)
+log.setLevel(SRC_LOG_LEVELS["RAG"])
+
+
+# Seconds a worker waits for a job before it polls the table again; jobs
+# enqueued on this node wake the workers right away
+POLL_INTERVAL = 5
+
+# Seconds between two updates of a running job. A job that was not updated
+# for STALE_TIMEOUT seconds was abandoned by its node and is queued again.
+HEARTBEAT_INTERVAL = 15
+STALE_TIMEOUT = 4 * HEARTBEAT_INTERVAL
+
+
+class IngestionJobCancelled(Exception):
+    pass
+
+
+def is_cancelled(job: Optional[IngestionJobModel]) -> bool:
+    return job is None or job.status in ("cancelling", "cancelled")
+
+
+def process_uploaded_file(
+    request: Request,
+    file: FileModel,
+    user,
+    on_stage: Optional[Callable[[str], None]] = None,
+):
+    """Transcribe, extract and embed an uploaded file as its type requires."""
+    on_stage = on_stage or (lambda stage: None)
+    content_type = file.meta.get("content_type")
+
+    if content_type:
+        if content_type.startswith("audio/") or content_type in {"video/webm"}:
+            on_stage("transcribing")
+            file_path = Storage.get_file(file.path)
+            result = transcribe(request, file_path, file.meta.get("data", {}))
+
+            on_stage("processing")
+            process_file(
+                request,
+                ProcessFileForm(file_id=file.id, content=result.get("text", "")),
+                user=user,
+            )
+        elif (not content_type.startswith(("image/", "video/"))) or (
+            request.app.state.config.CONTENT_EXTRACTION_ENGINE == "external"
+        ):
+            on_stage("processing")
+            process_file(request, ProcessFileForm(file_id=file.id), user=user)
+    else:
+        log.info(
+            f"File type {content_type} is not provided, but trying to process anyway"
+        )
+        on_stage("processing")
+        process_file(request, ProcessFileForm(file_id=file.id), user=user)
+
+
+async def emit_job_event(job: IngestionJobModel):
+    await sio.emit(
+        "file-events",
+        {
+            "file_id": job.file_id,
+            "data": IngestionJobResponse(**job.model_dump()).model_dump(),
+        },
+        to=f"user:{job.user_id}",
+    )
+
+
+class IngestionQueue:
+    """
+    Persistent queue of file ingestion jobs.
+
+    Jobs are rows of `ingestion_job`, so they survive restarts and are shared
+    by all nodes; each node runs at most `workers` of them at once. A failed
+    job is retried with a backoff until it has been attempted `max_attempts`
+    times. Cancelling a running job marks it cancelling; the work is only
+    checked between stages, so it is cancelled when it reaches the next one
+    (or fails), and completed if it finishes first.
+    """
+
+    def __init__(self, workers: int, max_attempts: int):
+        self.workers = workers
+        self.max_attempts = max_attempts
+
+        self.loop: Optional[asyncio.AbstractEventLoop] = None
+        self.wakeup: Optional[asyncio.Event] = None
+
+    def enqueue(self, file_id: str, user_id: str) -> Optional[IngestionJobModel]:
+        job = IngestionJobs.insert_new_job(file_id, user_id)
+        if job and self.loop is not None:
+            # Uploads run in the thread pool, wake the workers from there
+            self.loop.call_soon_threadsafe(self.wakeup.set)
+        return job
+
+    async def run(self, app: FastAPI):
+        if self.workers <= 0:
+            return
+
+        self.loop = asyncio.get_running_loop()
+        self.wakeup = asyncio.Event()
+
+        # Jobs only need `request.app`
+        request = Request({"type": "http", "app": app, "headers": []})
+
+        await asyncio.gather(
+            self._requeue_stale_jobs(),
+            *[self._worker(request) for _ in range(self.workers)],
+        )
+
+    async def _requeue_stale_jobs(self):
+        while True:
+            try:
+                count = await asyncio.to_thread(
+                    IngestionJobs.requeue_stale_jobs, STALE_TIMEOUT, self.max_attempts
+                )
+                if count:
+                    log.info(f"Requeued {count} abandoned ingestion jobs")
+                    self.wakeup.set()
+            except Exception as e:
+                log.warning(f"Failed to requeue abandoned ingestion jobs: {e}")
+
+            await asyncio.sleep(STALE_TIMEOUT)
+
+    async def _worker(self, request: Request):
+        while True:
+            try:
+                self.wakeup.clear()
+                job = await asyncio.to_thread(IngestionJobs.claim_next_job)
+                if job is None:
+                    try:
+                        await asyncio.wait_for(self.wakeup.wait(), POLL_INTERVAL)
+                    except asyncio.TimeoutError:
+                        pass
+                    continue
+
+                await self._run_job(request, job)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                log.exception(f"Ingestion worker error: {e}")
+                await asyncio.sleep(POLL_INTERVAL)
+
+    async def _update_job(self, id: str, updated: dict) -> Optional[IngestionJobModel]:
+        job = await asyncio.to_thread(IngestionJobs.update_job_by_id, id, updated)
+        if job:
+            await emit_job_event(job)
+        return job
+
+    async def _run_job(self, request: Request, job: IngestionJobModel):
+        log.info(f"Running ingestion job {job.id} (attempt {job.attempts})")
+        await emit_job_event(job)
+
+        file = await asyncio.to_thread(Files.get_file_by_id, job.file_id)
+        user = await asyncio.to_thread(Users.get_user_by_id, job.user_id)
+        if not file or not user:
+            await self._update_job(
+                job.id, {"status": "failed", "error": "File or user not found"}
+            )
+            return
+
+        cancelled = threading.Event()
+
+        def on_stage(stage: str):
+            if cancelled.is_set():
+                raise IngestionJobCancelled()
+
+            updated = IngestionJobs.update_job_by_id(job.id, {"stage": stage})
+            if is_cancelled(updated):
+                raise IngestionJobCancelled()
+            asyncio.run_coroutine_threadsafe(emit_job_event(updated), self.loop)
+
+        task = asyncio.create_task(
+            asyncio.to_thread(process_uploaded_file, request, file, user, on_stage)
+        )
+        while True:
+            done, _ = await asyncio.wait({task}, timeout=HEARTBEAT_INTERVAL)
+            if done:
+                break
+
+            # Also keeps the job from being considered abandoned
+            current = await asyncio.to_thread(
+                IngestionJobs.update_job_by_id, job.id, {}
+            )
+            if is_cancelled(current):
+                cancelled.set()
+
+        try:
+            task.result()
+            await self._update_job(job.id, {"status": "completed", "error": None})
+        except IngestionJobCancelled:
+            log.info(f"Ingestion job {job.id} was cancelled")
+            await self._update_job(job.id, {"status": "cancelled"})
+        except Exception as e:
+            log.exception(f"Ingestion job {job.id} failed: {e}")
+            error = str(e.detail) if hasattr(e, "detail") else str(e)
+
+            current = await asyncio.to_thread(IngestionJobs.get_job_by_id, job.id)
+            if is_cancelled(current):
+                # Not retried, it was being cancelled
+                await self._update_job(job.id, {"status": "cancelled", "error": error})
+            elif job.attempts < self.max_attempts:
+                await self._update_job(
+                    job.id,
+                    {
+                        "status": "pending",
+                        "error": error,
+                        "run_at": int(time.time()) + min(10 * 2**job.attempts, 600),
+                    },
+                )
+            else:
+                await self._update_job(job.id, {"status": "failed", "error": error})
+
+
+INGESTION_QUEUE = IngestionQueue(FILE_INGESTION_WORKERS, FILE_INGESTION_MAX_ATTEMPTS)
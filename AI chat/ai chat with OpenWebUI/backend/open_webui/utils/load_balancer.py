@@ -0,0 +1,194 @@
+import hashlib
+import logging
+import random
+import time
+from typing import Callable, Optional
+
+from open_webui.env import (
+    OLLAMA_ROUTING_COOLDOWN,
+    OLLAMA_ROUTING_FAILURE_THRESHOLD,
+    OLLAMA_ROUTING_LOADED_TTL,
+    OLLAMA_ROUTING_STRATEGY,
+    SRC_LOG_LEVELS,
+)
+
+log = logging.getLogger(__name__)
+log.setLevel(SRC_LOG_LEVELS["OLLAMA"])
+
+
+# Weight of the newest sample in the latency moving average
+EWMA_ALPHA = 0.3
+
+
+class NodeState:
+    def __init__(self):
+        self.in_flight = 0
+        self.ewma_latency: Optional[float] = None
+        self.failures = 0
+        self.open_until = 0.0
+        self.requests = 0
+        self.errors = 0
+
+    def is_available(self, now: float) -> bool:
+        return self.open_until <= now
+
+    def cost(self) -> float:
+        # Unknown nodes are treated as fast so they get probed
+        return (self.ewma_latency or 0.0) * (self.in_flight + 1)
+
+
+class LoadBalancer:
+    """
+    Picks an upstream URL for a model among the nodes that serve it.
+
+    Nodes are tracked passively: callers report in-flight requests, latency
+    and failures, and a node that fails `failure_threshold` times in a row is
+    skipped for `cooldown` seconds (unless every candidate is tripped).
+
+    A node counts as having a model loaded for `loaded_ttl` seconds after it
+    was routed a request for it or reported it in /api/ps.
+    """
+
+    def __init__(
+        self,
+        strategy: str = "random",
+        failure_threshold: int = 3,
+        cooldown: float = 30.0,
+        loaded_ttl: float = 300.0,
+    ):
+        self.strategy = strategy
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown
+        self.loaded_ttl = loaded_ttl
+
+        self.nodes: dict[str, NodeState] = {}
+        # model -> {url: expiry}
+        self.loaded_models: dict[str, dict[str, float]] = {}
+
+        self.strategies: dict[str, Callable] = {
+            "random": self._select_random,
+            "least_outstanding": self._select_least_outstanding,
+            "ewma_latency": self._select_ewma_latency,
+            "loaded_model": self._select_loaded_model,
+            "consistent_hash": self._select_consistent_hash,
+        }
+
+        if self.strategy not in self.strategies:
+            log.warning(f"Unknown routing strategy '{strategy}', using 'random'")
+            self.strategy = "random"
+
+    def _get_node(self, url: str) -> NodeState:
+        if url not in self.nodes:
+            self.nodes[url] = NodeState()
+        return self.nodes[url]
+
+    def _select_random(self, model, urls, key):
+        return random.choice(urls)
+
+    def _select_least_outstanding(self, model, urls, key):
+        lowest = min(self._get_node(url).in_flight for url in urls)
+        urls = [url for url in urls if self._get_node(url).in_flight == lowest]
+        return self._select_ewma_latency(model, urls, key)
+
+    def _select_ewma_latency(self, model, urls, key):
+        lowest = min(self._get_node(url).cost() for url in urls)
+        return random.choice(
+            [url for url in urls if self._get_node(url).cost() == lowest]
+        )
+
+    def _select_loaded_model(self, model, urls, key):
+        now = time.monotonic()
+        loaded = self.loaded_models.get(model, {})
+        preferred = [url for url in urls if loaded.get(url, 0.0) > now]
+        return self._select_least_outstanding(model, preferred or urls, key)
+
+    def _select_consistent_hash(self, model, urls, key):
+        if not key:
+            return self._select_loaded_model(model, urls, key)
+
+        # Rendezvous hashing: the same key keeps landing on the same node, and
+        # only the keys of a removed node move when the candidate set changes.
+        return max(
+            urls,
+            key=lambda url: hashlib.sha256(f"{key}:{url}".encode()).digest(),
+        )
+
+    def select(self, model: str, urls: list[str], key: Optional[str] = None) -> str:
+        if len(urls) == 1:
+            return urls[0]
+
+        now = time.monotonic()
+        available = [url for url in urls if self._get_node(url).is_available(now)]
+
+        url = self.strategies[self.strategy](model, available or urls, key)
+        log.debug(f"Routing {model} to {url} ({self.strategy})")
+        return url
+
+    def acquire(self, url: str):
+        node = self._get_node(url)
+        node.in_flight += 1
+        node.requests += 1
+
+    def release(self, url: str):
+        node = self._get_node(url)
+        node.in_flight = max(node.in_flight - 1, 0)
+
+    def record_success(self, url: str, latency: float):
+        node = self._get_node(url)
+        node.failures = 0
+        node.open_until = 0.0
+        if node.ewma_latency is None:
+            node.ewma_latency = latency
+        else:
+            node.ewma_latency = EWMA_ALPHA * latency + (1 - EWMA_ALPHA) * (
+                node.ewma_latency
+            )
+
+    def record_failure(self, url: str):
+        node = self._get_node(url)
+        node.failures += 1
+        node.errors += 1
+        if node.failures >= self.failure_threshold:
+            log.warning(f"Upstream {url} failed {node.failures} times, skipping it")
+            node.open_until = time.monotonic() + self.cooldown
+
+    def mark_loaded(self, model: str, url: str):
+        self.loaded_models.setdefault(model, {})[url] = (
+            time.monotonic() + self.loaded_ttl
+        )
+
+    def set_loaded_models(self, loaded_models: dict[str, set[str]]):
+        expires_at = time.monotonic() + self.loaded_ttl
+        self.loaded_models = {
+            model: {url: expires_at for url in urls}
+            for model, urls in loaded_models.items()
+        }
+
+    def get_stats(self) -> dict:
+        now = time.monotonic()
+        return {
+            "strategy": self.strategy,
+            "nodes": {
+                url: {
+                    "in_flight": node.in_flight,
+                    "ewma_latency": node.ewma_latency,
+                    "failures": node.failures,
+                    "available": node.is_available(now),
+                    "requests": node.requests,
+                    "errors": node.errors,
+                }
+                for url, node in self.nodes.items()
+            },
+            "loaded_models": {
+                model: sorted(url for url, expiry in urls.items() if expiry > now)
+                for model, urls in self.loaded_models.items()
+            },
+        }
+
+
+OLLAMA_LOAD_BALANCER = LoadBalancer(
+    strategy=OLLAMA_ROUTING_STRATEGY,
+    failure_threshold=OLLAMA_ROUTING_FAILURE_THRESHOLD,
+    cooldown=OLLAMA_ROUTING_COOLDOWN,
+    loaded_ttl=OLLAMA_ROUTING_LOADED_TTL,
+)
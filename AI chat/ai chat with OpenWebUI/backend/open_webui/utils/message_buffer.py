@@ -0,0 +1,94 @@
+import logging
+import time
+from typing import Optional
+
+from open_webui.models.chats import Chats
+from open_webui.env import (
+    REALTIME_CHAT_SAVE_INTERVAL,
+    REALTIME_CHAT_SAVE_MAX_CHARS,
+    SRC_LOG_LEVELS,
+)
+
+log = logging.getLogger(__name__)
+log.setLevel(SRC_LOG_LEVELS["MAIN"])
+
+
+# Buffers with unsaved changes, flushed on shutdown
+ACTIVE_MESSAGE_BUFFERS: set["MessageWriteBuffer"] = set()
+
+
+class MessageWriteBuffer:
+    """
+    Write-behind buffer for a message that is being streamed into a chat.
+
+    Every update replaces the pending fields in memory; they are written to the
+    database with a single upsert once `interval` seconds have passed since the
+    last write, once `max_chars` characters of content are pending, when a new
+    content block starts, or when the buffer is flushed explicitly.
+    """
+
+    def __init__(
+        self,
+        chat_id: str,
+        message_id: str,
+        interval: float = REALTIME_CHAT_SAVE_INTERVAL,
+        max_chars: int = REALTIME_CHAT_SAVE_MAX_CHARS,
+    ):
+        self.chat_id = chat_id
+        self.message_id = message_id
+        self.interval = interval
+        self.max_chars = max_chars
+
+        self.pending: dict = {}
+        self.flushed_at = time.monotonic()
+        self.flushed_length = 0
+        self.block_count: Optional[int] = None
+
+    def update(self, message: dict, block_count: Optional[int] = None):
+        """
+        `block_count` is the number of content blocks the message currently
+        has; a change means a block boundary was crossed and forces a write.
+        """
+        self.pending.update(message)
+        ACTIVE_MESSAGE_BUFFERS.add(self)
+
+        boundary = block_count is not None and block_count != self.block_count
+        if block_count is not None:
+            self.block_count = block_count
+
+        content = self.pending.get("content")
+        pending_chars = (
+            len(content) - self.flushed_length if isinstance(content, str) else 0
+        )
+
+        if (
+            boundary
+            or pending_chars >= self.max_chars
+            or time.monotonic() - self.flushed_at >= self.interval
+        ):
+            self.flush()
+
+    def flush(self):
+        if not self.pending:
+            return
+
+        message, self.pending = self.pending, {}
+        ACTIVE_MESSAGE_BUFFERS.discard(self)
+
+        self.flushed_at = time.monotonic()
+        if isinstance(message.get("content"), str):
+            self.flushed_length = len(message["content"])
+
+        try:
+            Chats.upsert_message_to_chat_by_id_and_message_id(
+                self.chat_id, self.message_id, message
+            )
+        except Exception as e:
+            log.exception(
+                f"Failed to save message {self.message_id} of chat {self.chat_id}: {e}"
+            )
+
+
+def flush_message_buffers():
+    for buffer in list(ACTIVE_MESSAGE_BUFFERS):
+        buffer.flush()
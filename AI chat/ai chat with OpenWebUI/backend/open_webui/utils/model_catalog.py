@@ -0,0 +1,208 @@
+import asyncio
+import json
+import logging
+import random
+import time
+import uuid
+from typing import Awaitable, Callable, Optional
+
+from fastapi import FastAPI, Request
+
+from open_webui.env import (
+    ENABLE_FORWARD_USER_INFO_HEADERS,
+    MODEL_CATALOG_REFRESH_INTERVAL,
+    REDIS_SENTINEL_HOSTS,
+    REDIS_SENTINEL_PORT,
+    REDIS_URL,
+    SRC_LOG_LEVELS,
+)
+from open_webui.utils.redis import get_async_redis_connection, get_sentinels_from_env
+
+log = logging.getLogger(__name__)
+log.setLevel(SRC_LOG_LEVELS["MODELS"])
+
+
+MODEL_CATALOG_CHANNEL = "open-webui:model-catalog"
+
+# Identifies this worker so it can ignore its own pub/sub messages
+WORKER_ID = str(uuid.uuid4())
+
+MODEL_CATALOGS: dict[str, "ModelCatalog"] = {}
+
+_redis = None
+
+
+def get_catalog_redis():
+    global _redis
+    if REDIS_URL and _redis is None:
+        _redis = get_async_redis_connection(
+            REDIS_URL,
+            get_sentinels_from_env(REDIS_SENTINEL_HOSTS, REDIS_SENTINEL_PORT),
+        )
+    return _redis
+
+
+async def publish_model_catalog(name: str, models: Optional[dict]):
+    redis = get_catalog_redis()
+    if redis is None:
+        return
+
+    try:
+        await redis.publish(
+            MODEL_CATALOG_CHANNEL,
+            json.dumps({"worker": WORKER_ID, "name": name, "models": models}),
+        )
+    except Exception as e:
+        log.warning(f"Failed to publish {name} model catalog: {e}")
+
+
+class ModelCatalog:
+    """
+    Upstream model list served from memory and refreshed off the request path.
+
+    `fetch(request, user)` does the actual fan-out to the upstream servers and
+    `apply(app, models)` publishes the result to `app.state`. A fresh catalog
+    is returned as is; a stale one is returned while a single background
+    refresh runs; only a cold (or invalidated) catalog makes the caller wait.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        fetch: Callable[[Request, Optional[object]], Awaitable[dict]],
+        apply: Callable[[FastAPI, dict], None],
+        interval: float = MODEL_CATALOG_REFRESH_INTERVAL,
+    ):
+        self.name = name
+        self.fetch = fetch
+        self.apply = apply
+        self.interval = interval
+
+        self.models: Optional[dict] = None
+        self.updated_at = 0.0
+        # Bumped by invalidate() so that a refresh started before it does not
+        # put its (possibly outdated) result back
+        self.generation = 0
+        self._task: Optional[asyncio.Task] = None
+
+        MODEL_CATALOGS[name] = self
+
+    def get_age(self) -> float:
+        return time.monotonic() - self.updated_at
+
+    def is_stale(self) -> bool:
+        return self.get_age() >= self.interval
+
+    async def get(self, request: Request, user=None) -> dict:
+        # Forwarded user headers may make the upstream answer per user, so
+        # the shared catalog cannot be used.
+        if ENABLE_FORWARD_USER_INFO_HEADERS or self.interval <= 0:
+            models = await self.fetch(request, user)
+            self.apply(request.app, models)
+            return models
+
+        if self.models is None:
+            # Retry if the catalog was invalidated while refreshing
+            while self.models is None:
+                await self.refresh(request)
+        elif self.is_stale():
+            self._start_refresh(request)
+
+        # Callers replace top-level keys (e.g. after access filtering)
+        return {**self.models}
+
+    def _start_refresh(self, request: Request) -> asyncio.Task:
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._refresh(request))
+        return self._task
+
+    async def refresh(self, request: Request):
+        # Concurrent callers share the in-flight refresh; shield it so a
+        # cancelled request does not abort the refresh for everyone else.
+        await asyncio.shield(self._start_refresh(request))
+
+    async def _refresh(self, request: Request):
+        generation = self.generation
+        try:
+            models = await self.fetch(request, None)
+        except Exception as e:
+            log.exception(f"Failed to refresh {self.name} model catalog: {e}")
+            if self.models is None:
+                raise
+            return
+
+        if generation != self.generation:
+            log.debug(f"Dropping {self.name} model catalog fetched before invalidation")
+            return
+
+        self.set(request.app, models)
+        await publish_model_catalog(self.name, models)
+
+    def set(self, app: FastAPI, models: dict):
+        self.models = models
+        self.updated_at = time.monotonic()
+        self.apply(app, models)
+
+    async def invalidate(self, publish: bool = True):
+        self.models = None
+        self.updated_at = 0.0
+        self.generation += 1
+        # The next caller starts a new refresh instead of joining this one
+        self._task = None
+        if publish:
+            await publish_model_catalog(self.name, None)
+
+
+async def listen_model_catalog_updates(app: FastAPI):
+    redis = get_catalog_redis()
+    if redis is None:
+        return
+
+    pubsub = redis.pubsub()
+    await pubsub.subscribe(MODEL_CATALOG_CHANNEL)
+
+    try:
+        async for message in pubsub.listen():
+            if message["type"] != "message":
+                continue
+
+            try:
+                data = json.loads(message["data"])
+                if data.get("worker") == WORKER_ID:
+                    continue
+
+                catalog = MODEL_CATALOGS.get(data.get("name"))
+                if catalog is None:
+                    continue
+
+                if data.get("models") is None:
+                    await catalog.invalidate(publish=False)
+                else:
+                    catalog.set(app, data["models"])
+            except Exception as e:
+                log.warning(f"Invalid model catalog message: {e}")
+    finally:
+        await pubsub.close()
+
+
+async def periodic_model_catalog_refresh(app: FastAPI):
+    if MODEL_CATALOG_REFRESH_INTERVAL <= 0:
+        return
+
+    # Background refreshes only need `request.app`
+    request = Request({"type": "http", "app": app, "headers": []})
+
+    while True:
+        # Refresh at half the interval so requests rarely see a stale catalog.
+        # Jitter so that workers do not all refresh at the same moment; the
+        # first to finish publishes and the others find their catalog fresh.
+        await asyncio.sleep(
+            MODEL_CATALOG_REFRESH_INTERVAL / 2 * random.uniform(0.8, 1.0)
+        )
+
+        for catalog in MODEL_CATALOGS.values():
+            if catalog.models is not None and catalog.get_age() >= catalog.interval / 2:
+                try:
+                    await catalog.refresh(request)
+                except Exception as e:
+                    log.warning(f"Failed to refresh {catalog.name} models: {e}")
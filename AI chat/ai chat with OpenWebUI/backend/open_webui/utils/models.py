@@ -53,7 +53,8 @@ async def fetch_ollama_models(request: Request, user: UserModel = None):
 
 async def fetch_openai_models(request: Request, user: UserModel = None):
     openai_response = await openai.get_all_models(request, user=user)
-    return openai_response["data"]
+    # Copy the entries; the catalog is shared and the models get decorated below
+    return [{**model} for model in openai_response["data"]]
 
 
 async def get_all_base_models(request: Request, user: UserModel = None):
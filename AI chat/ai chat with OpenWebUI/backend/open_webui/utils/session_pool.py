@@ -0,0 +1,156 @@
+import asyncio
+import logging
+from typing import Optional
+from urllib.parse import urlparse
+
+import aiohttp
+
+from open_webui.env import (
+    AIOHTTP_CLIENT_DNS_CACHE_TTL,
+    AIOHTTP_CLIENT_KEEPALIVE_TIMEOUT,
+    AIOHTTP_CLIENT_POOL_LIMIT,
+    AIOHTTP_CLIENT_POOL_LIMIT_PER_HOST,
+    AIOHTTP_CLIENT_TIMEOUT,
+    SRC_LOG_LEVELS,
+)
+
+log = logging.getLogger(__name__)
+log.setLevel(SRC_LOG_LEVELS["MAIN"])
+
+
+# One long-lived ClientSession (and therefore one connection pool) per upstream
+# origin, so chat, embeddings and model listing share keep-alive connections
+# instead of paying a new TCP/TLS handshake on every call.
+_sessions: dict[str, aiohttp.ClientSession] = {}
+_stats: dict[str, dict] = {}
+_lock = asyncio.Lock()
+
+
+def get_upstream_key(url: str) -> str:
+    parsed_url = urlparse(url)
+    return f"{parsed_url.scheme}://{parsed_url.netloc}"
+
+
+def _get_upstream_stats(key: str) -> dict:
+    if key not in _stats:
+        _stats[key] = {
+            "requests": 0,
+            "errors": 0,
+            "in_flight": 0,
+            "connections_created": 0,
+            "connections_reused": 0,
+            "dns_cache_hits": 0,
+            "dns_cache_misses": 0,
+        }
+    return _stats[key]
+
+
+def _get_trace_config(key: str) -> aiohttp.TraceConfig:
+    stats = _get_upstream_stats(key)
+
+    async def on_request_start(session, ctx, params):
+        stats["requests"] += 1
+        stats["in_flight"] += 1
+
+    async def on_request_end(session, ctx, params):
+        stats["in_flight"] -= 1
+
+    async def on_request_exception(session, ctx, params):
+        stats["in_flight"] -= 1
+        stats["errors"] += 1
+
+    async def on_connection_create_end(session, ctx, params):
+        stats["connections_created"] += 1
+
+    async def on_connection_reuseconn(session, ctx, params):
+        stats["connections_reused"] += 1
+
+    async def on_dns_cache_hit(session, ctx, params):
+        stats["dns_cache_hits"] += 1
+
+    async def on_dns_cache_miss(session, ctx, params):
+        stats["dns_cache_misses"] += 1
+
+    trace_config = aiohttp.TraceConfig()
+    trace_config.on_request_start.append(on_request_start)
+    trace_config.on_request_end.append(on_request_end)
+    trace_config.on_request_exception.append(on_request_exception)
+    trace_config.on_connection_create_end.append(on_connection_create_end)
+    trace_config.on_connection_reuseconn.append(on_connection_reuseconn)
+    trace_config.on_dns_cache_hit.append(on_dns_cache_hit)
+    trace_config.on_dns_cache_miss.append(on_dns_cache_miss)
+    return trace_config
+
+
+def _create_session(key: str) -> aiohttp.ClientSession:
+    connector = aiohttp.TCPConnector(
+        limit=AIOHTTP_CLIENT_POOL_LIMIT,
+        limit_per_host=AIOHTTP_CLIENT_POOL_LIMIT_PER_HOST,
+        use_dns_cache=AIOHTTP_CLIENT_DNS_CACHE_TTL > 0,
+        ttl_dns_cache=AIOHTTP_CLIENT_DNS_CACHE_TTL or None,
+        keepalive_timeout=AIOHTTP_CLIENT_KEEPALIVE_TIMEOUT,
+    )
+    return aiohttp.ClientSession(
+        connector=connector,
+        trust_env=True,
+        timeout=aiohttp.ClientTimeout(total=AIOHTTP_CLIENT_TIMEOUT),
+        trace_configs=[_get_trace_config(key)],
+    )
+
+
+async def get_upstream_session(url: str) -> aiohttp.ClientSession:
+    """
+    Return the shared session for the upstream that serves `url`.
+
+    The session must not be closed by the caller; release the individual
+    responses instead so their connections go back to the pool.
+    """
+    key = get_upstream_key(url)
+
+    session = _sessions.get(key)
+    if session is None or session.closed:
+        async with _lock:
+            session = _sessions.get(key)
+            if session is None or session.closed:
+                log.debug(f"Creating upstream session for {key}")
+                session = _create_session(key)
+                _sessions[key] = session
+
+    return session
+
+
+async def close_upstream_sessions():
+    async with _lock:
+        sessions = list(_sessions.values())
+        _sessions.clear()
+
+    for session in sessions:
+        try:
+            await session.close()
+        except Exception as e:
+            log.warning(f"Failed to close upstream session: {e}")
+
+
+def get_upstream_stats() -> dict:
+    upstreams = {}
+    for key, stats in _stats.items():
+        session = _sessions.get(key)
+        upstreams[key] = {
+            **stats,
+            "open": session is not None and not session.closed,
+        }
+
+    return {
+        "limit": AIOHTTP_CLIENT_POOL_LIMIT,
+        "limit_per_host": AIOHTTP_CLIENT_POOL_LIMIT_PER_HOST,
+        "dns_cache_ttl": AIOHTTP_CLIENT_DNS_CACHE_TTL,
+        "keepalive_timeout": AIOHTTP_CLIENT_KEEPALIVE_TIMEOUT,
+        "upstreams": upstreams,
+    }
+
+
+async def release_response(response: Optional[aiohttp.ClientResponse]):
+    # Releasing (rather than closing) hands a fully read connection back to the
+    # pool; aiohttp still drops it if the body was not consumed.
+    if response:
+        response.release()
@@ -0,0 +1,203 @@
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from contextlib import closing
+from pathlib import Path
+from typing import AsyncIterator, Optional
+
+from open_webui.config import CACHE_DIR
+from open_webui.env import SPEECH_CACHE_MAX_SIZE_MB, SRC_LOG_LEVELS
+
+log = logging.getLogger(__name__)
+log.setLevel(SRC_LOG_LEVELS["AUDIO"])
+
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS entries (
+    name TEXT PRIMARY KEY,
+    size INTEGER,
+    created_at INTEGER,
+    accessed_at REAL,
+    hits INTEGER DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS entries_accessed_at_idx ON entries (accessed_at);
+CREATE TABLE IF NOT EXISTS stats (
+    hits INTEGER,
+    misses INTEGER,
+    evictions INTEGER
+);
+INSERT INTO stats SELECT 0, 0, 0 WHERE NOT EXISTS (SELECT 1 FROM stats);
+"""
+
+
+class SpeechCache:
+    """
+    Directory of synthesized speech, bounded to `max_size` bytes.
+
+    Every entry is recorded in a SQLite index (shared by all workers) with its
+    size and last access; once the directory outgrows `max_size`, the least
+    recently used entries are evicted. Fresh audio is streamed to the client
+    while it is written, see `stream`.
+    """
+
+    def __init__(self, directory: Path, max_size: int):
+        self.directory = directory
+        self.max_size = max_size
+
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.index_path = self.directory / "index.db"
+        self._lock = threading.Lock()
+
+        try:
+            with closing(self._connect()) as conn, conn:
+                conn.executescript(SCHEMA)
+                self._add_untracked_files(conn)
+        except Exception as e:
+            log.warning(f"Failed to open speech cache index: {e}")
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.index_path, timeout=30)
+        conn.execute("PRAGMA journal_mode=WAL")
+        return conn
+
+    def _add_untracked_files(self, conn: sqlite3.Connection):
+        # Audio cached before the index existed
+        tracked = {name for (name,) in conn.execute("SELECT name FROM entries")}
+        for path in self.directory.glob("*.mp3"):
+            if path.stem not in tracked:
+                stat = path.stat()
+                conn.execute(
+                    "INSERT INTO entries (name, size, created_at, accessed_at) VALUES (?, ?, ?, ?)",
+                    (path.stem, stat.st_size, int(stat.st_mtime), stat.st_mtime),
+                )
+
+    def get_key(self, body: bytes, engine: str, model: str) -> str:
+        return hashlib.sha256(
+            body + str(engine).encode("utf-8") + str(model).encode("utf-8")
+        ).hexdigest()
+
+    def get_path(self, key: str) -> Path:
+        return self.directory / f"{key}.mp3"
+
+    def get(self, key: str) -> Optional[Path]:
+        """Return the cached audio of `key`, recording the hit or miss."""
+        path = self.get_path(key)
+        hit = path.is_file()
+
+        try:
+            with closing(self._connect()) as conn, conn:
+                if hit:
+                    conn.execute(
+                        "UPDATE entries SET accessed_at = ?, hits = hits + 1 WHERE name = ?",
+                        (time.time(), key),
+                    )
+                    conn.execute("UPDATE stats SET hits = hits + 1")
+                else:
+                    conn.execute("UPDATE stats SET misses = misses + 1")
+        except Exception as e:
+            log.warning(f"Failed to update speech cache index: {e}")
+
+        return path if hit else None
+
+    def add(self, key: str, payload: Optional[dict] = None):
+        """Record audio written to `get_path(key)` and evict what no longer fits."""
+        path = self.get_path(key)
+        if payload is not None:
+            with open(self.directory / f"{key}.json", "w") as f:
+                json.dump(payload, f)
+
+        now = time.time()
+        try:
+            with closing(self._connect()) as conn, conn:
+                conn.execute(
+                    "INSERT OR REPLACE INTO entries (name, size, created_at, accessed_at) VALUES (?, ?, ?, ?)",
+                    (key, path.stat().st_size, int(now), now),
+                )
+            self.evict()
+        except Exception as e:
+            log.warning(f"Failed to update speech cache index: {e}")
+
+    def evict(self):
+        if self.max_size <= 0:
+            return
+
+        with self._lock, closing(self._connect()) as conn, conn:
+            (total,) = conn.execute(
+                "SELECT COALESCE(SUM(size), 0) FROM entries"
+            ).fetchone()
+            if total <= self.max_size:
+                return
+
+            evicted = []
+            for name, size in conn.execute(
+                "SELECT name, size FROM entries ORDER BY accessed_at"
+            ).fetchall():
+                if total <= self.max_size:
+                    break
+
+                for path in [self.get_path(name), self.directory / f"{name}.json"]:
+                    try:
+                        path.unlink(missing_ok=True)
+                    except OSError as e:
+                        log.warning(f"Failed to remove {path}: {e}")
+
+                evicted.append((name,))
+                total -= size or 0
+
+            conn.executemany("DELETE FROM entries WHERE name = ?", evicted)
+            conn.execute("UPDATE stats SET evictions = evictions + ?", (len(evicted),))
+            log.debug(f"Evicted {len(evicted)} entries from the speech cache")
+
+    async def stream(
+        self, key: str, payload: dict, chunks: AsyncIterator[bytes]
+    ) -> AsyncIterator[bytes]:
+        """
+        Yield `chunks` to the client while writing them to the cache.
+
+        The audio is written under a temporary name and only becomes an entry
+        once it is complete, so an interrupted synthesis is never served.
+        """
+        path = self.get_path(key)
+        tmp_path = path.with_name(f"{path.name}.{uuid.uuid4().hex}.tmp")
+
+        try:
+            with open(tmp_path, "wb") as f:
+                async for chunk in chunks:
+                    f.write(chunk)
+                    yield chunk
+
+            os.replace(tmp_path, path)
+            await asyncio.to_thread(self.add, key, payload)
+        finally:
+            if tmp_path.exists():
+                tmp_path.unlink()
+
+    def get_stats(self) -> dict:
+        with closing(self._connect()) as conn:
+            hits, misses, evictions = conn.execute(
+                "SELECT hits, misses, evictions FROM stats"
+            ).fetchone()
+            entries, size = conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM entries"
+            ).fetchone()
+
+        return {
+            "hits": hits,
+            "misses": misses,
+            "hit_rate": hits / (hits + misses) if hits + misses else None,
+            "evictions": evictions,
+            "entries": entries,
+            "size": size,
+            "max_size": self.max_size,
+        }
+
+
+SPEECH_CACHE = SpeechCache(
+    CACHE_DIR / "audio" / "speech", SPEECH_CACHE_MAX_SIZE_MB * 1024 * 1024
+)
@@ -0,0 +1,71 @@
+import asyncio
+import logging
+import threading
+import time
+
+from open_webui.models.users import Users
+from open_webui.env import SRC_LOG_LEVELS, USER_LAST_ACTIVE_UPDATE_INTERVAL
+
+log = logging.getLogger(__name__)
+log.setLevel(SRC_LOG_LEVELS["MODELS"])
+
+
+# Seconds between two flushes of the pending last_active_at updates
+FLUSH_INTERVAL = 5
+
+
+class LastActiveWriter:
+    """
+    Coalesces last_active_at updates.
+
+    A user is queued at most once per `interval` seconds, however many requests
+    they make; queued users are written together in one UPDATE by `flush`.
+    """
+
+    def __init__(self, interval: float = USER_LAST_ACTIVE_UPDATE_INTERVAL):
+        self.interval = interval
+
+        self.pending: set[str] = set()
+        self.queued_at: dict[str, float] = {}
+        self.lock = threading.Lock()
+
+    def touch(self, user_id: str):
+        if self.interval <= 0:
+            Users.update_user_last_active_by_id(user_id)
+            return
+
+        now = time.monotonic()
+        with self.lock:
+            if now - self.queued_at.get(user_id, float("-inf")) < self.interval:
+                return
+
+            self.queued_at[user_id] = now
+            self.pending.add(user_id)
+
+    def flush(self):
+        with self.lock:
+            pending, self.pending = self.pending, set()
+
+            # Forget users that have been inactive for a while
+            now = time.monotonic()
+            self.queued_at = {
+                user_id: queued_at
+                for user_id, queued_at in self.queued_at.items()
+                if now - queued_at < self.interval
+            }
+
+        if pending:
+            log.debug(f"Updating last_active_at of {len(pending)} users")
+            Users.update_users_last_active_by_ids(list(pending), int(time.time()))
+
+
+LAST_ACTIVE_WRITER = LastActiveWriter()
+
+
+async def periodic_last_active_flush():
+    while True:
+        await asyncio.sleep(FLUSH_INTERVAL)
+        try:
+            await asyncio.to_thread(LAST_ACTIVE_WRITER.flush)
+        except Exception as e:
+            log.warning(f"Failed to update last_active_at: {e}")
@@ -0,0 +1,110 @@
+import json
+import logging
+import threading
+import time
+from typing import Optional
+
+from open_webui.env import (
+    AUTH_USER_CACHE_TTL,
+    ENABLE_AUTH_USER_CACHE_REDIS,
+    REDIS_SENTINEL_HOSTS,
+    REDIS_SENTINEL_PORT,
+    REDIS_URL,
+    SRC_LOG_LEVELS,
+)
+from open_webui.utils.redis import get_redis_connection, get_sentinels_from_env
+
+log = logging.getLogger(__name__)
+log.setLevel(SRC_LOG_LEVELS["MODELS"])
+
+
+REDIS_KEY_PREFIX = "open-webui:user:"
+
+
+class UserCache:
+    """
+    Short-lived cache of users looked up on the authentication path.
+
+    Values are plain dicts that must not hold secrets such as API keys. They
+    are kept in memory for `ttl` seconds, or in `redis` when it is given so
+    that every worker sees an invalidation right away. Writes through
+    `UsersTable` invalidate the entry of the user; without Redis, other
+    workers may keep serving their copy (including a rotated API key) for up
+    to `ttl` seconds.
+    """
+
+    def __init__(self, ttl: float, redis=None):
+        self.ttl = ttl
+        self.redis = redis
+
+        self.entries: dict[str, tuple[float, dict]] = {}
+        self.lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[dict]:
+        if self.ttl <= 0:
+            return None
+
+        if self.redis is not None:
+            try:
+                value = self.redis.get(f"{REDIS_KEY_PREFIX}{key}")
+            except Exception as e:
+                log.warning(f"Failed to read user cache from Redis: {e}")
+                return None
+            return json.loads(value) if value is not None else None
+
+        now = time.monotonic()
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is not None:
+                if entry[0] > now:
+                    return entry[1]
+                del self.entries[key]
+
+        return None
+
+    def set(self, key: str, value: dict):
+        if self.ttl <= 0:
+            return
+
+        if self.redis is not None:
+            try:
+                self.redis.set(
+                    f"{REDIS_KEY_PREFIX}{key}",
+                    json.dumps(value),
+                    px=max(int(self.ttl * 1000), 1),
+                )
+            except Exception as e:
+                log.warning(f"Failed to write user cache to Redis: {e}")
+            return
+
+        now = time.monotonic()
+        with self.lock:
+            # Drop expired entries so users that went away don't pile up
+            if len(self.entries) >= 10000:
+                self.entries = {
+                    k: entry for k, entry in self.entries.items() if entry[0] > now
+                }
+            self.entries[key] = (now + self.ttl, value)
+
+    def invalidate(self, key: str):
+        with self.lock:
+            self.entries.pop(key, None)
+
+        if self.redis is not None:
+            try:
+                self.redis.delete(f"{REDIS_KEY_PREFIX}{key}")
+            except Exception as e:
+                log.warning(f"Failed to invalidate user cache in Redis: {e}")
+
+
+USER_CACHE = UserCache(
+    AUTH_USER_CACHE_TTL,
+    redis=(
+        get_redis_connection(
+            REDIS_URL,
+            get_sentinels_from_env(REDIS_SENTINEL_HOSTS, REDIS_SENTINEL_PORT),
+        )
+        if ENABLE_AUTH_USER_CACHE_REDIS and REDIS_URL
+        else None
+    ),
+)